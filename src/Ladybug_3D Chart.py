@@ -54,79 +54,16 @@ import math
 
 
 def checkConditionalStatement(annualHourlyData, conditionalStatement):
-        lb_preparation = sc.sticky["ladybug_Preparation"]()
-        indexList, listInfo = lb_preparation.separateList(annualHourlyData, lb_preparation.strToBeFound)
-        
-        letters = [chr(i) for i in xrange(ord('a'), ord('z')+1)]
-        # remove 'and' and 'or' from conditional statements
-        csCleaned = conditionalStatement.Replace('and', '')
-        csCleaned = csCleaned.Replace('or', '')
-        
-        # find the number of the lists that have assigned conditional statements
-        listNum = []
-        for count, let in enumerate(letters):
-            if csCleaned.find(let)!= -1: listNum.append(count)
-        
-        # check if all the conditions are actually applicable
-        for num in listNum:
-            if num>len(listInfo) - 1:
-                warning = 'A conditional statement is assigned for list number ' + `num + 1` + '  which is not existed!\n' + \
-                          'Please remove the letter "' + letters[num] + '" from the statements to solve this problem!\n' + \
-                          'Number of lists are ' + `len(listInfo)` + '. Please fix this issue and try again.'
-                          
-                print warning
-                ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
-                return -1, -1
-        
-        selList = []
-        [selList.append([]) for i in range(len(listInfo))]
-        startHour = listInfo[0][5]
-        endHour = listInfo[0][6]
-        
-        for i in range(len(listInfo)):
-            selList[i] = annualHourlyData[indexList[i]+7:indexList[i+1]]
-            if listInfo[i][5]!= startHour or  listInfo[i][6]!=endHour :
-                warning = 'Length of all the lists should be the same to apply conditional statemnets.' + \
-                          ' Please fix this issue and try again!\nList number '+ `i+1` + ' is the one that causes the issue.'
-                print warning
-                ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
-                return -1, -1
-        
-        # replace the right list in the conditional statement
-        statement = conditionalStatement.split(' ')
-        finalStatement = 'pattern = '
-        titleStatement = '...                         ...                         ...\n' +\
-                         'Conditional Selection Applied:\n'
+        lb_conditionalStatement = sc.sticky["ladybug_ConditionalStatement"]()
+        try:
+            titleStatement, patternList = lb_conditionalStatement.checkConditionalStatement(annualHourlyData, conditionalStatement, False)
+        except ValueError, e:
+            warning = str(e)
+            print warning
+            ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
+            return -1, -1
         
-        for statemntPart in statement:
-            statementCopy = str.Copy(statemntPart) # a copy to make a meaningful string
-            
-            if statemntPart!='and' and statemntPart!='or':
-                for num in listNum:
-                    toBeReplacedWith = 'selList[this][HOY]'.replace('this', `num`)
-                    titleToBeReplacedWith = listInfo[num][2]
-                    
-                    statemntPart = statemntPart.replace(letters[num], toBeReplacedWith, 20000)
-                    statementCopy = statementCopy.replace(letters[num], titleToBeReplacedWith, 20000)
-                    if statementCopy.find(letters[num])!=-1: break
-                    
-                titleStatement = titleStatement + ' ' + statementCopy
-            else:
-                
-                titleStatement = titleStatement + '\n' + statementCopy
-            finalStatement = finalStatement + ' ' + statemntPart
         print titleStatement
-        
-        # check for the pattern
-        patternList = []
-       
-        for HOY in range(8760):
-            try:
-                exec(finalStatement)
-                patternList.append(pattern)
-            except:
-                pass
-                
         return titleStatement, patternList
 
 def makeChart(values, xSize, xScale, yScale, zScale, patternList, basePoint, colors, yCount):
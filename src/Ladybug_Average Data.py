@@ -61,135 +61,16 @@ def main(annualHourlyData, analysisPeriod):
             checkData = False
         
         if checkData:
-            # separate data
-            indexList, listInfo = lb_preparation.separateList(hourlyData, lb_preparation.strToBeFound)
-        
-            #separate lists of lists
-            separatedLists = []
-            for i in range(len(indexList)-1):
-                selList = []
-                [selList.append(float(x)) for x in hourlyData[indexList[i]+7:indexList[i+1]]]
-                separatedLists.append(selList)
-        
-            # read analysis period
-            stMonth, stDay, stHour, endMonth, endDay, endHour = lb_preparation.readRunPeriod(analysisPeriod)
+            lb_aggregation = sc.sticky["ladybug_DataAggregation"]()
             
-            def average(list):
-                return sum(list)/len(list)
-        
-            selHourlyData =[];
-            selDailyData = []; avDailyData = []
-            selWeeklyData = []; avWeeklyData = []
-            selMonthlyData = []; avMonthlyData = []
-            for l in range(len(separatedLists)):
-                [selHourlyData.append(item) for item in listInfo[l][:4]]
-                selHourlyData.append('Hourly')
-                selHourlyData.append((stMonth, stDay, stHour))
-                selHourlyData.append((endMonth, endDay, endHour))
-                # select data
-                stAnnualHour = lb_preparation.date2Hour(stMonth, stDay, stHour)
-                endAnnualHour = lb_preparation.date2Hour(endMonth, endDay, endHour)
-                
-                # check it goes from the end of the year to the start of the year
-                if stAnnualHour < endAnnualHour:
-                    for i, item in enumerate(separatedLists[l][stAnnualHour-1:endAnnualHour]):
-                        if stHour-1 <= (i + stHour - 1)%24 <= endHour-1: selHourlyData.append(item)
-                    type = True
-                else:
-                    for i, item in enumerate(separatedLists[l][stAnnualHour-1:]):
-                        if stHour-1 <= (i + stHour - 1)%24 <= endHour-1: selHourlyData.append(item)
-                    for i, item in enumerate(separatedLists[l][:endAnnualHour]):
-                        if stHour-1 <= i %24 <= endHour-1: selHourlyData.append(item)
-                    type = False
-                
-                # add list informations
-                [selDailyData.append(item) for item in listInfo[l][:4]]
-                selDailyData.append('Daily-> averaged for each hour')
-                selDailyData.append((stMonth, stDay, stHour))
-                selDailyData.append((endMonth, endDay, endHour))
-                
-                [avDailyData.append(item) for item in listInfo[l][:4]]
-                avDailyData.append('Daily-> averaged')
-                avDailyData.append((stMonth, stDay, stHour))
-                avDailyData.append((endMonth, endDay, endHour))
-                
-                if type:
-                    for JD in range(lb_preparation.getJD(stMonth,stDay), lb_preparation.getJD(endMonth,endDay) + 1):
-                        dailyData = separatedLists[l][lb_preparation.getHour(JD, stHour)-1 : lb_preparation.getHour(JD, endHour)]
-                        avDailyData.append(average(dailyData))
-                        for hour in range(endHour - stHour + 1): selDailyData.append(dailyData[hour])
-                else:
-                    for JD in range(lb_preparation.getJD(stMonth,stDay), 365 + 1):
-                        dailyData = separatedLists[l][lb_preparation.getHour(JD, stHour)-1 : lb_preparation.getHour(JD, endHour)]
-                        avDailyData.append(average(dailyData))
-                        for hour in range(endHour - stHour + 1): selDailyData.append(dailyData[hour])
-                    
-                    for JD in range(1, lb_preparation.getJD(endMonth,endDay) +1):
-                        dailyData = separatedLists[l][lb_preparation.getHour(JD, stHour)-1 : lb_preparation.getHour(JD, endHour)]
-                        avDailyData.append(average(dailyData))
-                        for hour in range(endHour - stHour + 1): selDailyData.append(dailyData[hour])
-                
-
-                # average monthly
-                [selMonthlyData.append(item) for item in listInfo[l][:4]]
-                selMonthlyData.append('Monthly-> averaged for each hour')
-                selMonthlyData.append((stMonth, stDay, stHour))
-                selMonthlyData.append((endMonth, endDay, endHour))
-                
-                [avMonthlyData.append(item) for item in listInfo[l][:4]]
-                avMonthlyData.append('Monthly-> averaged')
-                avMonthlyData.append((stMonth, stDay, stHour))
-                avMonthlyData.append((endMonth, endDay, endHour))
-
-                monthDays = [0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31] 
-                if type:
-                    for month in range(stMonth, endMonth + 1):
-                        stJD = lb_preparation.getJD(month, 1)
-                        endJD = lb_preparation.getJD(month, monthDays[month])
-                        monthlyData = separatedLists[l][lb_preparation.getHour(stJD, stHour)-1 : lb_preparation.getHour(endJD , endHour)]
-                        selMonthly = []
-                        for i, item in enumerate(monthlyData):
-                            if stHour-1 <= (i + stHour -1)%24 <= endHour-1: selMonthly.append(item)
-                        
-                        avMonthlyData.append(average(selMonthly))
-                        
-                        for hour in range(endHour - stHour + 1):
-                            eachHourData = []
-                            for day in range(monthDays[month]):
-                                eachHourData.append(monthlyData[hour + (day * (endHour - stHour + 1))])
-                            selMonthlyData.append(average(eachHourData))
-                else:
-                    for month in range(stMonth, 12 + 1):
-                        stJD = lb_preparation.getJD(month, 1)
-                        endJD = lb_preparation.getJD(month, monthDays[month])
-                        
-                        #for item in 
-                        monthlyData = separatedLists[l][lb_preparation.getHour(stJD, stHour)-1 : lb_preparation.getHour(endJD , endHour)]
-                        selMonthly = []
-                        for i, item in enumerate(monthlyData):
-                            if stHour-1 <= (i + stHour -1)%24 <= endHour-1: selMonthly.append(item)
-                        
-                        avMonthlyData.append(average(selMonthly))
-                    
-                        for hour in range(endHour - stHour + 1):
-                            eachHourData = []
-                            for day in range(monthDays[month]):
-                                eachHourData.append(monthlyData[hour + (day * (endHour - stHour + 1))])
-                            selMonthlyData.append(average(eachHourData))
-                    
-                    for month in range(1, endMonth + 1):
-                        stJD = lb_preparation.getJD(month, 1)
-                        endJD = lb_preparation.getJD(month, monthDays[month])
-                        monthlyData = separatedLists[l][lb_preparation.getHour(stJD, stHour)-1 : lb_preparation.getHour(endJD , endHour)]
-                        avMonthlyData.append(average(monthlyData))
-                    
-                        for hour in range(endHour - stHour + 1):
-                            eachHourData = []
-                            for day in range(monthDays[month]):
-                                eachHourData.append(monthlyData[hour + (day * (endHour - stHour + 1))])
-                            selMonthlyData.append(average(eachHourData))
-                
-            return selHourlyData, avDailyData, selDailyData, selWeeklyData, selMonthlyData, avMonthlyData
+            # select data
+            selHourlyData = lb_preparation.selectHourlyData(hourlyData, analysisPeriod)
+            
+            # average data for each day, week and month of the analysis period
+            aggregatedData = lb_aggregation.aggregateData(hourlyData, analysisPeriod, "mean")
+            
+            return selHourlyData, aggregatedData["daily"], aggregatedData["dailyPerHour"], \
+                   aggregatedData["weeklyPerHour"], aggregatedData["monthlyPerHour"], aggregatedData["monthly"]
         elif _annualHourlyData[0] == "Connect Data Here!":
             print "Connect annualHourlyData from the importEPW component!"
             return -1
@@ -67,6 +67,7 @@ def main(coolingSetPoint, heatingSetPoint, hourlyDryBulbTemperature, useDailyAvr
             ghenv.Component.AddRuntimeMessage(w, warning)
             return -1
         lb_preparation = sc.sticky["ladybug_Preparation"]()
+        lb_degreeDays = sc.sticky["ladybug_DegreeDays"]()
         
         # copy the custom code here
         # check the input data
@@ -131,43 +132,15 @@ def main(coolingSetPoint, heatingSetPoint, hourlyDryBulbTemperature, useDailyAvr
                     annual_heatingDegDays.append('Annual')
                     [annual_heatingDegDays.append(item) for item in listInfo[l][5:7]]
                     
-                    hourlyTemperature = separatedLists[l]
+                    # degree days for the set points
+                    results = lb_degreeDays.degreeDays(separatedLists[l], [coolingSetPoint], [heatingSetPoint], useDailyAvrMethod == True)
                     
-                    for day in range (int(len(hourlyTemperature)/24)):
-                        # 7 is for thr first 7 members of the list which are information
-                        dayHourlyTemp = hourlyTemperature[(day * 24):((day+1)*24)]
-                        if useDailyAvrMethod == True:
-                            dayAvrTemp = sum(dayHourlyTemp)/len(dayHourlyTemp)
-                            if dayAvrTemp < heatingSetPoint:
-                                daily_heatingDegDays.append(heatingSetPoint - dayAvrTemp)
-                            else: daily_heatingDegDays.append(0)
-                            if coolingSetPoint < dayAvrTemp:
-                                daily_coolingDegDays.append(dayAvrTemp - coolingSetPoint)
-                            else: daily_coolingDegDays.append(0)
-                        else:
-                            minT = min(dayHourlyTemp)
-                            maxT = max(dayHourlyTemp)
-                            
-                            # heating degree days
-                            if minT > heatingSetPoint: daily_heatingDegDays.append(0)
-                            elif (maxT + minT)/2 > heatingSetPoint: daily_heatingDegDays.append((heatingSetPoint-minT)/4)
-                            elif maxT >= heatingSetPoint: daily_heatingDegDays.append((heatingSetPoint-minT)/2-(maxT-heatingSetPoint)/4)
-                            elif maxT < heatingSetPoint: daily_heatingDegDays.append(heatingSetPoint-(maxT+minT)/2)
-                            
-                            # cooling degree days
-                            if maxT < coolingSetPoint: daily_coolingDegDays.append(0)
-                            elif (maxT + minT)/2 < coolingSetPoint: daily_coolingDegDays.append((maxT-coolingSetPoint)/4)
-                            elif minT <= coolingSetPoint: daily_coolingDegDays.append((maxT-coolingSetPoint)/2 - (coolingSetPoint-minT)/4)
-                            elif minT > coolingSetPoint: daily_coolingDegDays.append((maxT + minT)/2 - coolingSetPoint)
-                    
-                    numOfDays = lb_preparation.numOfDays
-                    
-                    for month in range(len(numOfDays)- 1):
-                        monthly_heatingDegDays.append(sum(daily_heatingDegDays[numOfDays[month] + 7: numOfDays[month + 1]+ 7]))
-                        monthly_coolingDegDays.append(sum(daily_coolingDegDays[numOfDays[month] + 7: numOfDays[month + 1]+ 7]))
-                    
-                    annual_heatingDegDays.append(sum(monthly_heatingDegDays[7:]))
-                    annual_coolingDegDays.append(sum(monthly_coolingDegDays[7:]))
+                    daily_coolingDegDays.extend(results["cooling"]["daily"][0])
+                    daily_heatingDegDays.extend(results["heating"]["daily"][0])
+                    monthly_coolingDegDays.extend(results["cooling"]["monthly"][0])
+                    monthly_heatingDegDays.extend(results["heating"]["monthly"][0])
+                    annual_coolingDegDays.append(results["cooling"]["annual"][0])
+                    annual_heatingDegDays.append(results["heating"]["annual"][0])
                         
                     
                     
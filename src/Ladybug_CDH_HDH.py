@@ -74,6 +74,7 @@ def main(coolingSetPoint, heatingSetPoint, coolingSetBack, heatingSetBack, start
             ghenv.Component.AddRuntimeMessage(w, warning)
             return -1
         lb_preparation = sc.sticky["ladybug_Preparation"]()
+        lb_degreeDays = sc.sticky["ladybug_DegreeDays"]()
         
         # copy the custom code here
         # check the input data
@@ -152,30 +153,18 @@ def main(coolingSetPoint, heatingSetPoint, coolingSetBack, heatingSetBack, start
                 annual_heatingDegHours.append('Annual')
                 [annual_heatingDegHours.append(item) for item in listInfo[l][5:7]]
                 
-                hourlyTemperature = separatedLists[l]
+                # degree hours for the set points and set-backs
+                results = lb_degreeDays.degreeHours(separatedLists[l], [coolingSetPoint], [heatingSetPoint], [coolingSetBack], [heatingSetBack], \
+                                                    startOfWorkingHours, endOfWorkingHours)
                 
-                # for each hour based on hourly temperature data
-                for hour, temp in enumerate(hourlyTemperature):
-                    if float(temp) < heatingSetPoint:
-                        hourly_heatingDegHours.append(heatingSetPoint - float(temp))
-                    else: hourly_heatingDegHours.append(0)
-                    if coolingSetPoint < float(temp):
-                        hourly_coolingDegHours.append(float(temp) - coolingSetPoint)
-                    else: hourly_coolingDegHours.append(0)
-                
-                # for each day based on hourly degree hours
-                for day in range (int(len(hourlyTemperature)/24)):
-                    # 7 is for thr first 7 members of the list which are information
-                    daily_heatingDegHours.append(sum(hourly_heatingDegHours[(day * 24) + 7:((day+1)*24) + 7]))
-                    daily_coolingDegHours.append(sum(hourly_coolingDegHours[(day * 24) + 7:((day+1)*24) + 7]))
-                
-                numOfDays = lb_preparation.numOfDays
-                for month in range(len(numOfDays)- 1):
-                    monthly_heatingDegHours.append(sum(daily_heatingDegHours[numOfDays[month] + 7: numOfDays[month + 1]+ 7]))
-                    monthly_coolingDegHours.append(sum(daily_coolingDegHours[numOfDays[month] + 7: numOfDays[month + 1]+ 7]))
-                
-                annual_heatingDegHours.append(sum(monthly_heatingDegHours[7:]))
-                annual_coolingDegHours.append(sum(monthly_coolingDegHours[7:]))
+                hourly_coolingDegHours.extend(results["cooling"]["hourly"][0])
+                hourly_heatingDegHours.extend(results["heating"]["hourly"][0])
+                daily_coolingDegHours.extend(results["cooling"]["daily"][0])
+                daily_heatingDegHours.extend(results["heating"]["daily"][0])
+                monthly_coolingDegHours.extend(results["cooling"]["monthly"][0])
+                monthly_heatingDegHours.extend(results["heating"]["monthly"][0])
+                annual_coolingDegHours.append(results["cooling"]["annual"][0])
+                annual_heatingDegHours.append(results["heating"]["annual"][0])
                 
             return hourly_coolingDegHours, hourly_heatingDegHours, daily_coolingDegHours, daily_heatingDegHours, monthly_coolingDegHours, monthly_heatingDegHours, annual_coolingDegHours, annual_heatingDegHours
         elif hourlyDBTemp[0] == 'Connect temperature here':
@@ -136,47 +136,6 @@ def checkTheInputs(lb_preparation):
     return checkData, epwData, epwStr, calcLength, finalAirTemps, maxClo, maxCloTemp,  minClo, minCloTemp
 
 
-def getHOYs(hours, days, months, timeStep, lb_preparation, method = 0):
-    
-    if method == 1: stDay, endDay = days
-        
-    numberOfDaysEachMonth = lb_preparation.numOfDaysEachMonth
-    
-    if timeStep != 1: hours = rs.frange(hours[0], hours[-1] + 1 - 1/timeStep, 1/timeStep)
-    
-    HOYS = []
-    
-    for monthCount, m in enumerate(months):
-        # just a single day
-        if method == 1 and len(months) == 1 and stDay - endDay == 0:
-            days = [stDay]
-        # few days in a single month
-        
-        elif method == 1 and len(months) == 1:
-            days = range(stDay, endDay + 1)
-        
-        elif method == 1:
-            #based on analysis period
-            if monthCount == 0:
-                # first month
-                days = range(stDay, numberOfDaysEachMonth[monthCount] + 1)
-            elif monthCount == len(months) - 1:
-                # last month
-                days = range(1, lb_preparation.checkDay(endDay, m) + 1)
-            else:
-                #rest of the months
-                days = range(1, numberOfDaysEachMonth[monthCount] + 1)
-        
-        for d in days:
-            for h in hours:
-                h = lb_preparation.checkHour(float(h))
-                m  = lb_preparation.checkMonth(int(m))
-                d = lb_preparation.checkDay(int(d), m)
-                HOY = lb_preparation.date2Hour(m, d, h)
-                if HOY not in HOYS: HOYS.append(int(HOY))
-    
-    return HOYS
-
 def getHOYsBasedOnPeriod(analysisPeriod, timeStep, lb_preparation):
     
     stMonth, stDay, stHour, endMonth, endDay, endHour = lb_preparation.readRunPeriod(analysisPeriod, True, False)
@@ -186,12 +145,10 @@ def getHOYsBasedOnPeriod(analysisPeriod, timeStep, lb_preparation):
     else:
         months = range(stMonth, endMonth + 1)
     
-    # end hour shouldn't be included
-    hours  = range(stHour, endHour + 1)
-    
     days = stDay, endDay
     
-    HOYS = getHOYs(hours, days, months, timeStep, lb_preparation, method = 1)
+    HOYS = lb_preparation.getHOYsArray(((stMonth, stDay, stHour), (endMonth, endDay, endHour)), timeStep, sortHOYs = False)
+    HOYS = [int(HOY) for HOY in HOYS]
     
     return HOYS, months, days
 
@@ -421,8 +421,6 @@ def checkSkyResolution(skyResolution, allDataDict, analysisPeriod, latitude, lon
         allDataDict[path]["tempertureSun"] = []
     
     #Get all of the sun vectors for the analysis period.
-    sunVectors = []
-    sunUpHoys = []
     lb_sunpath.initTheClass(latitude, north, rc.Geometry.Point3d.Origin, 1, longitude, timeZone)
     if analysisPeriod != [(1,1,1), (12,31,24)]:
         HOYs, months, days = lb_preparation.getHOYsBasedOnPeriod(analysisPeriod, 1)
@@ -430,17 +428,14 @@ def checkSkyResolution(skyResolution, allDataDict, analysisPeriod, latitude, lon
         HOYs = range(8760)
     HOYStart = HOYs[0]
     
-    for hoy in HOYs:
-        d, m, h = lb_preparation.hour2Date(hoy, True)
-        m += 1
-        lb_sunpath.solInitOutput(m, d, h)
-        
-        if lb_sunpath.solAlt >= 0:
-            sunVec = lb_sunpath.sunReverseVectorCalc()
-            sunVectors.append(sunVec)
-            sunUpHoys.append(hoy)
-            for path in allDataDict:
-                allDataDict[path]["tempertureSun"].append(float(allDataDict[path]["temperture"][hoy-HOYStart]))
+    lb_sunPositionCache = sc.sticky["ladybug_SunPositionCache"]()
+    sunPositions = lb_sunPositionCache.getSunPositionsForHOYs(HOYs, latitude, longitude, timeZone, north)
+    sunUpIndices = [count for count, altitude in enumerate(sunPositions["altitude"]) if altitude >= 0]
+    sunVectors = lb_sunpath.sunVectors(sunPositions, True, sunUpIndices)
+    sunUpHoys = [HOYs[count] for count in sunUpIndices]
+    for hoy in sunUpHoys:
+        for path in allDataDict:
+            allDataDict[path]["tempertureSun"].append(float(allDataDict[path]["temperture"][hoy-HOYStart]))
     
     #Check to see if the user has requested the highest resolution and, if not, consolidate the sun vectors into sky patches.
     finalSunVecs = []
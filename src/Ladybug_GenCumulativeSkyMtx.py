@@ -7,7 +7,7 @@
 """
 This component uses Radiance's gendaymtx function to calculate the sky's radiation for each hour of the year. This is a necessary pre-step before doing radiation analysis with Rhino geometry or generating a radiation rose.
 
-The first time you use this component, you will need to be connected to the internet so that the component can download the "gendaymtx.exe" function to your system.
+The first time you use this component, you will need to be connected to the internet so that the component can download the "gendaymtx.exe" function to your system. If gendaymtx.exe can't be found or downloaded, the sky is calculated inside Ladybug with the same Perez model. This in-process sky isn't verified against gendaymtx yet and the component gives a warning when it is used.
 
 Gendaymtx is written by Ian Ashdown and Greg Ward. For more information, check the Radiance manual at:
 http://www.radiance-online.org/learning/documentation/manual-pages/pdfs/gendaymtx.pdf
@@ -19,11 +19,11 @@ Provided by Ladybug 0.0.58
         _epwFile: The output of the Ladybug Open EPW component or the file path location of the epw weather file on your system.
         _skyDensity_: Set to 0 to generate a Tregenza sky, which will divide up the sky dome with a coarse density of 145 sky patches.  Set to 1 to generate a Reinhart sky, which will divide up the sky dome using a very fine density of 580 sky patches.  Note that, while the Reinhart sky is more accurate, it will result in considerably longer calculation times.  Accordingly, the default is set to 0 for a Tregenza sky.
         workingDir_: An optional working directory in your system where the sky will be generated. Default is set to C:\Ladybug or C:\Users\yourUserName\AppData\Roaming\Ladybug.  The latter is used if you cannot write to the C:\ drive of your computer.  Any valid file path location can be connected.
-        useOldRes_: Set this to "True" if you have already run this component previously and you want to use the already-generated data for this weather file.
+        useOldRes_: Sky matrices are saved in a shared cache under Ladybug's default folder based on the content of the weather file, so an unchanged weather file is never recalculated and a modified weather file is always recalculated. Set this to "True" to import the .mtx results of gendaymtx.exe if they are already available in the working directory and the sky is not in the cache. These results are not added to the cache since they may belong to an older version of the weather file.
         _runIt: Set to "True" to run the component and generate a sky matrix.
     Returns:
         readMe!: ...
-        cumulativeSkyMtx: The result of the gendaymtx function. Use the selectSkyMtx component to select a desired sky matrix from this output for use in a radiation study, radition rose, or sky dome visualization.
+        cumulativeSkyMtx: The sky matrix of diffuse and direct radiation for each sky patch and hour. Use the selectSkyMtx component to select a desired sky matrix from this output for use in a radiation study, radition rose, or sky dome visualization.
 """
 
 ghenv.Component.Name = "Ladybug_GenCumulativeSkyMtx"
@@ -41,7 +41,6 @@ import scriptcontext as sc
 from clr import AddReference
 AddReference('Grasshopper')
 import Grasshopper.Kernel as gh
-from itertools import izip
 import shutil
 
 def date2Hour(month, day, hour):
@@ -51,34 +50,21 @@ def date2Hour(month, day, hour):
     JD = numOfDays[int(month)-1] + int(day)
     return (JD - 1) * 24 + hour
 
-def hour2Date(hour):
-    
-    monthList = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
-    numOfDays = [0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334, 365]
-    numOfHours = [24 * numOfDay for numOfDay in numOfDays]
-
-    for h in range(len(numOfHours)-1):
-        if hour <= numOfHours[h+1]: month = h + 1; break
-
-    if hour == 0: day = 1
-    elif (hour)%24 == 0: day = int((hour - numOfHours[h]) / 24)
-    else: day = int((hour - numOfHours[h]) / 24) + 1
-    
-    time = hour%24 + 0.5
-    
-    return str(day), str(month), str(time)
-
-def getRadiationValues(epw_file, analysisPeriod, weaFile):
+def getRadiationValues(epw_file, analysisPeriod, weaFile, lb_preparation):
     # start hour and end hour
     stHour = 0
     endHour = 8760
+    calendar = lb_preparation.calendarTable()
     epwfile = open(epw_file,"r")
     for lineCount, line in enumerate(epwfile):
         hour = lineCount - 8
-        if  int(stHour) <= hour <= int(endHour):
+        if  int(stHour) <= hour < int(endHour):
             dirRad = (line.split(',')[14])
             difRad = (line.split(',')[15])
-            day, month, time = hour2Date(hour)
+            # wea time is at the middle of the hour
+            day = str(calendar["days"][hour + 1])
+            month = str(calendar["months"][hour + 1])
+            time = str(calendar["hours"][hour + 1] - 0.5)
             weaFile.write(month + " " + day + " " + time + " " + dirRad + " " + difRad + "\n")
     epwfile.close()
     return weaFile
@@ -101,10 +87,50 @@ def epw2wea(weatherFile, analysisPeriod, lb_preparation):
     header = weaHeader(weatherFile, lb_preparation)
     weaFile = open(outputFile, 'w')
     weaFile.write(header)
-    weaFile = getRadiationValues(weatherFile, analysisPeriod, weaFile)
+    weaFile = getRadiationValues(weatherFile, analysisPeriod, weaFile, lb_preparation)
     weaFile.close()
     return outputFile
 
+def getGendaymtx(workingDir, lb_preparation):
+    """Path to gendaymtx.exe in the working directory. Returns None if it can't be copied or downloaded"""
+    gendaymtxFile = os.path.join(workingDir, 'gendaymtx.exe')
+    
+    if not os.path.isfile(gendaymtxFile):
+        # let's see if we can grab it from radiance folder
+        if os.path.isfile("c:/radiance/bin/gendaymtx.exe"):
+            # just copy this file
+            shutil.copyfile("c:/radiance/bin/gendaymtx.exe", gendaymtxFile)
+        else:
+            # download the file
+            lb_preparation.downloadGendaymtx(workingDir)
+    
+    #check if the file is there
+    if not os.path.isfile(gendaymtxFile) or  os.path.getsize(gendaymtxFile)< 15000 : return None
+    return gendaymtxFile
+
+def calculateSkyInProcess(epwFile, skyType, location):
+    warning = "gendaymtx.exe is not available. The sky is calculated inside Ladybug instead.\n" + \
+              "Check your internet connection or copy gendaymtx.exe to c:/radiance/bin and re-run the component to use gendaymtx."
+    print warning
+    ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
+    
+    print "Calculating the sky. It may take few seconds..."
+    # hours of the year are calculated in parallel
+    lb_skyMatrixScheduler = sc.sticky["ladybug_SkyMatrixScheduler"](progressCallback = printProgress)
+    lb_skyMatrixScheduler.addSky(epwFile, skyType, location = location)
+    skyMatrices = lb_skyMatrixScheduler.run()[0]
+    if skyMatrices is None:
+        warning = "Failed to calculate the sky: " + lb_skyMatrixScheduler.failedSkies[0][1]
+        print warning
+        ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
+        return -1
+    return skyMatrices
+
+def printProgress(finishedJobs, numOfJobs):
+    # print every 25 percent
+    if finishedJobs * 4 // numOfJobs != (finishedJobs - 1) * 4 // numOfJobs:
+        print `int(100 * finishedJobs / numOfJobs)` + "% of the sky is calculated."
+
 def main(epwFile, skyType, workingDir, useOldRes):
     # import the classes
     if sc.sticky.has_key('ladybug_release'):
@@ -128,21 +154,6 @@ def main(epwFile, skyType, workingDir, useOldRes):
         if workingDir == -1: return -2
         workingDrive = workingDir[0:1]
         
-        # GenCumulativeSky
-        gendaymtxFile = os.path.join(workingDir, 'gendaymtx.exe')
-        
-        if not os.path.isfile(gendaymtxFile):
-            # let's see if we can grab it from radiance folder
-            if os.path.isfile("c:/radiance/bin/gendaymtx.exe"):
-                # just copy this file
-                shutil.copyfile("c:/radiance/bin/gendaymtx.exe", gendaymtxFile)
-            else:
-                # download the file
-                lb_preparation.downloadGendaymtx(workingDir)
-        
-        #check if the file is there
-        if not os.path.isfile(gendaymtxFile) or  os.path.getsize(gendaymtxFile)< 15000 : return -3
-        
         ## check for epw file to be connected
         if epwFile != None and epwFile[-3:] == 'epw':
             # import data from epw file
@@ -152,8 +163,11 @@ def main(epwFile, skyType, workingDir, useOldRes):
             # make new folder for each city
             subWorkingDir = lb_preparation.makeWorkingDir(workingDir + "\\" + newLocName)
             print 'Current working directory is set to: ', subWorkingDir
-            # copy .epw file to sub-directory
-            weatherFileAddress = lb_preparation.copyFile(epwFile, subWorkingDir + "\\" + newLocName + '.epw')
+            # copy .epw file to sub-directory. always overwrite the copy so gendaymtx runs on
+            # the same content that the sky is cached for
+            weatherFileAddress = subWorkingDir + "\\" + newLocName + '.epw'
+            if os.path.normcase(os.path.abspath(epwFile)) != os.path.normcase(os.path.abspath(weatherFileAddress)):
+                shutil.copyfile(epwFile, weatherFileAddress)
             
             # create weaFile
             weaFile = epw2wea(weatherFileAddress, [], lb_preparation)
@@ -162,31 +176,67 @@ def main(epwFile, skyType, workingDir, useOldRes):
             outputFileDif = weaFile.replace(".wea", "_dif_" + `skyType` + ".mtx")
             outputFileDir = weaFile.replace(".wea", "_dir_" + `skyType` + ".mtx")
             
-            # check if the study is already ran for this weather file
-            if useOldRes and os.path.isfile(outputFileDif) and os.path.isfile(outputFileDir):
-                # ask the user if he wants to re-run the study
-                print "Sky matrix files for this epw file are already existed on your system.\n" + \
-                      "The component won't recalculate the sky and imports the available result.\n" + \
-                      "In case you don't want to use these files, set useOldRes input to False and re-run the study.\n" + \
-                      "If you found the lines above confusing just ignore it! It's all fine. =)\n"
-            else:
+            lb_skyMatrix = sc.sticky["ladybug_SkyMatrix"](skyType)
+            lb_skyMatrixCache = sc.sticky["ladybug_SkyMatrixCache"]()
+            location = [newLocName, lat, lngt, timeZone]
+            
+            # check if the sky is already calculated for this weather file
+            skyMatrices = lb_skyMatrixCache.getSkyMatrices(epwFile, lb_skyMatrix, location, "gendaymtx")
+            if skyMatrices is not None:
+                print "Sky matrix for this epw file is already calculated.\n" + \
+                      "The component won't recalculate the sky and imports the available result.\n"
+                return skyMatrices, newLocName, lat, lngt, timeZone
+            
+            importOldRes = useOldRes and os.path.isfile(outputFileDif) and os.path.isfile(outputFileDir)
+            if not importOldRes:
+                gendaymtxFile = getGendaymtx(workingDir, lb_preparation)
+                if gendaymtxFile is None:
+                    if not lb_skyMatrix.verifiedAgainstGendaymtx:
+                        warning = "Failed to find gendaymtx.exe. Check your internet connection or copy gendaymtx.exe\n" + \
+                                  "to c:/radiance/bin and re-run the component."
+                        print warning
+                        ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
+                        return -1
+                    skyMatrices = calculateSkyInProcess(epwFile, skyType, location)
+                    if skyMatrices == -1: return -1
+                    return skyMatrices, newLocName, lat, lngt, timeZone
+                
                 batchFile = weaFile.replace(".wea", ".bat")
                 command = "@echo off \necho.\n echo HELLO " + os.getenv("USERNAME").upper()+ "! " + \
                           "DO NOT CLOSE THIS WINDOW. \necho.\necho IT WILL BE CLOSED AUTOMATICALLY WHEN THE CALCULATION IS OVER!\n" + \
                           "echo.\necho AND MAY TAKE FEW MINUTES...\n" + \
                           "echo.\n" + \
                           "echo CALCULATING DIFFUSE COMPONENT OF THE SKY...\n" + \
-                          workingDir + "\\gendaymtx -m " + str(n) + " -s -O1 " + weaFile + "> " + outputFileDif + "\n" + \
+                          gendaymtxFile + " -m " + str(skyType) + " -s -O1 " + weaFile + "> " + outputFileDif + "\n" + \
                           "echo.\necho CALCULATING DIRECT COMPONENT OF THE SKY...\n" + \
-                          workingDir + "\\gendaymtx -m " + str(n) + " -d -O1 " + weaFile + "> " + outputFileDir
-                      
+                          gendaymtxFile + " -m " + str(skyType) + " -d -O1 " + weaFile + "> " + outputFileDir
+                
                 file = open(batchFile, 'w')
                 file.write(command)
                 file.close()
-        
+                
                 os.system(batchFile)
+            else:
+                print "Importing gendaymtx results from the working directory...\n" + \
+                      "These results may belong to an older version of the weather file so they won't be cached.\n" + \
+                      "Set useOldRes to False to recalculate the sky for the current weather file.\n"
+            
+            difMtx, failedDif = lb_skyMatrix.readMTX(outputFileDif)
+            dirMtx, failedDir = lb_skyMatrix.readMTX(outputFileDir)
+            failedHours = sorted(set(failedDif + failedDir))
+            if failedHours:
+                print "genDayMtx returns null Values for few hours. The study will run anyways." + \
+                      "\nMake sure that you are using an standard epw file." + \
+                      "\nThe failed hours are listed below in [Month/Day @Hour] format."
+                calendar = lb_preparation.calendarTable()
+                for hour in failedHours:
+                    day, month, time = str(calendar["days"][hour + 1]), str(calendar["months"][hour + 1]), str(calendar["hours"][hour + 1] - 0.5)
+                    print "Failed to read the results > " + month + "/" + day + " @" + time
+            if not importOldRes:
+                try: lb_skyMatrixCache.addSkyMatrices(epwFile, lb_skyMatrix, difMtx, dirMtx, location)
+                except Exception, e: print "Failed to write the sky matrix cache: " + `e`
             
-            return outputFileDif, outputFileDir, newLocName, lat, lngt, timeZone
+            return (difMtx, dirMtx), newLocName, lat, lngt, timeZone
             
         else:
             print "epwWeatherFile address is not a valid .epw file"
@@ -199,95 +249,6 @@ def main(epwFile, skyType, workingDir, useOldRes):
         ghenv.Component.AddRuntimeMessage(w, "You should first let the Ladybug fly...")
         return -1
         
-def readMTXFile(daylightMtxDif, daylightMtxDir, n, newLocName, lat, lngt, timeZone):
-    # All the patches on top high get the same values so maybe
-    # I should re-create the geometry 577 instead of 580
-    
-    skyPatchesDict = {1 : 145 + 1,
-                      2 : 580 - 3 + 1}
-    
-    numOfPatchesInEachRow = {1: [30, 30, 24, 24, 18, 12, 6, 1],
-                             2: [60, 60, 60, 60, 48, 48, 48, 48, 36, 36, 24, 24, 12, 12, 1]}
-                             
-    strConv = {1 : [0.0344199465, 0.0455168385, 0.0445221864, 0.0428934136, 0.0406730411, 0.0473984151, 0.0416418006, 0.0435449227],
-               2: [0.00921483254, 0.00612971396, 0.0121875626, 0.00905126163, 0.0119026242, 0.00974295956, 0.011436609, 0.00974713106, 0.0108025291, 0.0117312774, 0.0125224872, 0.0105335058, 0.0109255262, 0.0111894547, 0.0113221971]}
-    
-    numOfSkyPatches = skyPatchesDict[n]
-    
-    # create an empty dictionary
-    radValuesDict = {}
-    for skyPatch in range(numOfSkyPatches):
-        radValuesDict[skyPatch] = {}
-        
-    resFileDif = open(daylightMtxDif, "r") 
-    resFileDir = open(daylightMtxDir, "r") 
-    
-    def getValue(line):
-        R, G, B = line.split(' ')
-        value = (.265074126 * float(R) + .670114631 * float(G) + .064811243 * float(B)) * strConv[n][rowNumber]
-        return value
-        
-    lineCount = 0
-    extraHeadingLines = 0 # no heading
-    warnOff = False
-    failedHours = {}
-    for difLine, dirLine in izip(resFileDif, resFileDir):
-        # new version of gendaymtx genrates a header
-        # this is a check to make sure the component will work for both versions
-        if lineCount == 0 and difLine.startswith("#?RADIANCE"):
-            # the file has a header
-            extraHeadingLines = -8
-            
-        if lineCount + extraHeadingLines < 0:
-            # pass heading line
-            lineCount += 1
-            continue
-        
-        # these lines is an empty line to separate patches do let's pass them
-        hour = (lineCount + 1 + extraHeadingLines)% 8761
-        
-        if hour != 0:
-            patchNumber = int((lineCount + 1 + extraHeadingLines) /8761)
-            
-            #
-            for rowCount, patchCountInRow in enumerate(numOfPatchesInEachRow[n]):
-                if patchNumber <= sum(numOfPatchesInEachRow[n][:rowCount]):
-                    rowNumber = rowCount
-                    break
-            try:
-                difValue = getValue(difLine)
-                dirValue = getValue(dirLine)
-            
-            except Exception, e:
-                value = 0
-                if not warnOff:
-                    print "genDayMtx returns null Values for few hours. The study will run anyways." + \
-                          "\nMake sure that you are using an standard epw file." + \
-                          "\nThe failed hours are listed below in [Month/Day @Hour] format."
-                warnOff = True
-                day, month, time = hour2Date(hour - 1)
-                if hour-1 not in failedHours.keys():
-                    failedHours[hour-1] = [day, month, time]
-                    print "Failed to read the results > " + month + "/" + day + " @" + time
-                
-            try: radValuesDict[patchNumber][hour] = [difValue, dirValue]
-            except: print patchNumber, hour, value
-            
-        lineCount += 1
-    
-    resFileDif.close()
-    resFileDir.close()
-    
-    class SkyResultsCollection(object):
-        def __init__(self, valuesDict, locationName, lat, lngt, timeZone):
-            self.d = valuesDict
-            self.location = locationName
-            self.lat = lat
-            self.lngt = lngt
-            self.timeZone = timeZone
-        
-    return SkyResultsCollection(radValuesDict, newLocName, lat, lngt, timeZone)
-    
 if _runIt and _epwFile!=None:
     
     if _skyDensity_ == None: n = 1 #Tregenza Sky
@@ -295,20 +256,15 @@ if _runIt and _epwFile!=None:
     
     result = main(_epwFile, n, workingDir_, useOldRes_)
     w = gh.GH_RuntimeMessageLevel.Warning
-    if result== -3:
-        warning = 'Download failed!!! You need GenDayMtx.exe to use this component.' + \
-                '\nPlease check your internet connection, and try again!'
-        print warning
-        ghenv.Component.AddRuntimeMessage(w, warning)
-    elif result == -2:
+    if result == -2:
         warning = 'Working directory cannot be created! Please set workingDir to a new path'
         print warning
         ghenv.Component.AddRuntimeMessage(w, warning)
     elif result == -1:
         pass
     else:
-        daylightMtxDiffueFile, daylightMtxDirectFile, newLocName, lat, lngt, timeZone = result
-        cumulativeSkyMtx = readMTXFile(daylightMtxDiffueFile, daylightMtxDirectFile, n, newLocName, lat, lngt, timeZone)
+        (difMtx, dirMtx), newLocName, lat, lngt, timeZone = result
+        cumulativeSkyMtx = sc.sticky["ladybug_SkyResultsCollection"](n, difMtx, dirMtx, newLocName, lat, lngt, timeZone)
 else:
     warn = "Set runIt to True and connect a valid epw file address"
     print warn
@@ -54,7 +54,8 @@ import Grasshopper.Kernel as gh
 
 def main(_epw_file):
     # import the classes
-    if sc.sticky.has_key('ladybug_release'):        try:
+    if sc.sticky.has_key('ladybug_release'):
+        try:
             if not sc.sticky['ladybug_release'].isCompatible(ghenv.Component): return -1
         except:
             warning = "You need a newer version of Ladybug to use this compoent." + \
@@ -65,6 +66,7 @@ def main(_epw_file):
             ghenv.Component.AddRuntimeMessage(w, warning)
             return -1
         lb_preparation = sc.sticky["ladybug_Preparation"]()
+        lb_epwFile = sc.sticky["ladybug_EPWFile"]
         
         if not os.path.isfile(_epw_file):
             warningM = "Failed to find the file: " + str(_epw_file)
@@ -73,8 +75,11 @@ def main(_epw_file):
             ghenv.Component.AddRuntimeMessage(w, warningM)
             return -1
         
-        locationData = lb_preparation.epwLocation(_epw_file)
-        weatherData = lb_preparation.epwDataReader(_epw_file, locationData[0])
+        # every output is returned since connecting a new output later won't solve the component again.
+        # all the columns are read in one pass or from the binary cache of the file
+        epw = lb_epwFile(_epw_file)
+        locationData = epw.location
+        weatherData = epw.legacyLists()
         
         return locationData, weatherData
     
@@ -630,64 +630,27 @@ def runAnalyses(testPoints, ptsNormals, meshSrfAreas, analysisSrfs, contextSrfs,
     
     return radResults, totalRadResults, listInfo, intersectionMtx
 
-def getHourlySky(daylightMtxDict, HOY):
+def getHourlySky(skyResults, HOY):
     # for presentation
     lb_preparation = sc.sticky["ladybug_Preparation"]()
     stDate = lb_preparation.hour2Date(HOY, 1)
     analysisP = ((stDate[1]+1, stDate[0], stDate[2]-1),(stDate[1]+1, stDate[0], stDate[2]))
     
-    hourlyMtx = []
-    for patchNumber in daylightMtxDict.keys():
-        # first patch is the ground
-        if patchNumber!=0:
-            hourlyMtx.append(daylightMtxDict[patchNumber][HOY])
+    # first patch is the ground and is not included
+    hourlyMtx = skyResults.hourlyValues(HOY)
     return hourlyMtx, analysisP
 
-def getCumulativeSky(daylightMtxDict, runningPeriod):
+def getCumulativeSky(skyResults, runningPeriod):
     
     lb_preparation = sc.sticky["ladybug_Preparation"]()
     
-    def selectHourlyData(dataList, analysisPeriodOrHOY):
-        # read analysis period
-        stMonth, stDay, stHour, endMonth, endDay, endHour = lb_preparation.readRunPeriod(analysisPeriodOrHOY, False)
-        
-        selHourlyData =[];
-        
-        # select data
-        stAnnualHour = lb_preparation.date2Hour(stMonth, stDay, stHour)
-        endAnnualHour = lb_preparation.date2Hour(endMonth, endDay, endHour)
-        
-        # check it goes from the end of the year to the start of the year
-        if stAnnualHour < endAnnualHour:
-            for i, item in enumerate(dataList[stAnnualHour-1:endAnnualHour+1]):
-                if stHour-1 <= (i + stHour - 1)%24 <= endHour-1: selHourlyData.append(item)
-            type = True
-        else:
-            for i, item in enumerate(dataList[stAnnualHour-1:]):
-                if stHour-1 <= (i + stHour - 1)%24 <= endHour-1: selHourlyData.append(item)
-            for i, item in enumerate(dataList[:endAnnualHour + 1]):
-                if stHour-1 <= i %24 <= endHour-1: selHourlyData.append(item)
-            type = False
-        
-        return selHourlyData
-    
-    HOYS = selectHourlyData(range(8760), runningPeriod)
+    # index of the selected hours is HOY - 1
+    HOYS = lb_preparation.analysisPeriodIndices(runningPeriod)
     
+    # continuous hours are added up using the cumulative sums of the collection
     hourlyMtx = []
-    for patchNumber in daylightMtxDict.keys():
-        if patchNumber!=0:
-            cumulativeDifValue = 0
-            cumulativeDirValue = 0
-            # adding upp the values
-            try:
-                for HOY in HOYS:
-                    difValue, dirValue = daylightMtxDict[patchNumber][HOY + 1]
-                    cumulativeDifValue += difValue
-                    cumulativeDirValue += dirValue 
-            except Exception, e:
-                print `e`
-                
-            hourlyMtx.append([cumulativeDifValue/1000, cumulativeDirValue/1000])
+    for cumulativeDifValue, cumulativeDirValue in skyResults.sumHours(HOYS):
+        hourlyMtx.append([cumulativeDifValue/1000, cumulativeDirValue/1000])
     
     return hourlyMtx
 
@@ -810,19 +773,16 @@ def main(method, radTemp, mannequinMesh, groundMesh, contextSrfs, groundR, cloA,
     
     #Calculate the sun-up hours of the year to help make things faster down the road.
     lb_sunpath.initTheClass(float(latitude), northAngle, rc.Geometry.Point3d.Origin, 100, float(longitude), float(timeZone))
-    altitudes = []
+    lb_sunPositionCache = sc.sticky["ladybug_SunPositionCache"]()
+    altitudes = lb_sunPositionCache.getSunPositionsForHOYs(HOYS, latitude, longitude, timeZone, northAngle)["altitude"]
     finalWinTransmiss = []
     for hour in HOYS:
-        d, m, t = lb_preparation.hour2Date(hour, True)
-        lb_sunpath.solInitOutput(m+1, d, t)
-        altitude = lb_sunpath.solAlt
-        altitudes.append(altitude)
         finalWinTransmiss.append(winTrans[hour-1])
     
     #Process the cumulative sky into an initial selected sky.
     skyMtxLists = []
-    if periodMethod == 0: skyMtxLists = getCumulativeSky(cumSkyMtx.d, analysisPeriodOrHOY)
-    else: skyMtxLists, analysisPeriodTxt = getHourlySky(cumSkyMtx.d, analysisPeriodOrHOY)
+    if periodMethod == 0: skyMtxLists = getCumulativeSky(cumSkyMtx, analysisPeriodOrHOY)
+    else: skyMtxLists, analysisPeriodTxt = getHourlySky(cumSkyMtx, analysisPeriodOrHOY)
     
     #Set a unit for the analysis.
     if len(HOYS) == 1: unit = 'Wh'
@@ -898,7 +858,7 @@ def main(method, radTemp, mannequinMesh, groundMesh, contextSrfs, groundR, cloA,
                 if count != len(HOYS)-1: lastVal = 1
                 else: lastVal = 0
                 if altitudes[count] > 0 or altitudes[count-1] > 0 or altitudes[count+lastVal] > 0:
-                    skyMtxLists, _analysisPeriodOrHOY_ = getHourlySky(cumSkyMtx.d, hour)
+                    skyMtxLists, _analysisPeriodOrHOY_ = getHourlySky(cumSkyMtx, hour)
                     selSkyMatrix = prepareLBList(skyMtxLists, _analysisPeriodOrHOY_, location, unit, False, False)
                     
                     indexList, listInfo = lb_preparation.separateList(selSkyMatrix, lb_preparation.strToBeFound)
@@ -953,7 +913,7 @@ def main(method, radTemp, mannequinMesh, groundMesh, contextSrfs, groundR, cloA,
                 if count != len(HOYS)-1: lastVal = 1
                 else: lastVal = 0
                 if altitudes[count] > 0 or altitudes[count-1] > 0 or altitudes[count+lastVal] > 0:
-                    skyMtxLists, _analysisPeriodOrHOY_ = getHourlySky(cumSkyMtx.d, HOYS[count])
+                    skyMtxLists, _analysisPeriodOrHOY_ = getHourlySky(cumSkyMtx, HOYS[count])
                     selSkyMatrix = prepareLBList(skyMtxLists, _analysisPeriodOrHOY_, location, unit, False, False)
                     
                     indexList, listInfo = lb_preparation.separateList(selSkyMatrix, lb_preparation.strToBeFound)
@@ -1114,19 +1074,14 @@ def mainSimple(radTemp, mannequinMesh, context, groundR, cloA, winTrans, analysi
     
     #Calculate the sun-up hours of the year in order to understand whether the context geometry will block the sun.
     lb_sunpath.initTheClass(float(latitude), northAngle, rc.Geometry.Point3d.Origin, 100, float(longitude), float(timeZone))
-    altitudes = []
-    azimuths = []
-    sunVectors = []
-    for hour in HOYS:
-        d, m, t = lb_preparation.hour2Date(hour, True)
-        lb_sunpath.solInitOutput(m+1, d, t)
-        altitude = lb_sunpath.solAlt
-        altitudes.append(altitude)
-        azimuths.append(lb_sunpath.solAz)
-        if altitude > 0:
-            sunVec = lb_sunpath.sunReverseVectorCalc()
-            sunVectors.append(sunVec)
-        else: sunVectors.append(None)
+    lb_sunPositionCache = sc.sticky["ladybug_SunPositionCache"]()
+    sunPositions = lb_sunPositionCache.getSunPositionsForHOYs(HOYS, latitude, longitude, timeZone, northAngle)
+    altitudes = sunPositions["altitude"]
+    azimuths = sunPositions["azimuth"]
+    sunUpIndices = [count for count, altitude in enumerate(altitudes) if altitude > 0]
+    sunVectors = [None] * len(altitudes)
+    for count, sunVec in zip(sunUpIndices, lb_sunpath.sunVectors(sunPositions, True, sunUpIndices)):
+        sunVectors[count] = sunVec
     
     #Compute all of the outputs.
     def nonParallelMRTCalc():
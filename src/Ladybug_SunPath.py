@@ -20,7 +20,7 @@ Provided by Ladybug 0.0.58
         _day_: A number between 1 and 31 (or a list of numbers) that represent days(s) of the month to position sun sphere(s) on the sun path.  The default is 21, which signifies the 21st of the month (when solstices and equinoxes occur).
         _month_: A number between 1 and 12 (or a list of numbers) that represent months(s) of the year to position sun sphere(s) on the sun path.  The default is 12, which signifies December.
         _timeStep_: The number of timesteps per hour in the sun path. This number should be smaller than 60 and divisible by 60. The default is set to 1 such that one sun sphere and one sun vector is generated for each hour.
-                  Note that a linear interpolation will be used to generate curves and suns for timeSteps greater than 1.
+                  Note that an interpolation between the hours will be used to generate curves and suns for timeSteps greater than 1.
         analysisPeriod_: An optional analysis period from the Analysis Period component.  Inputs here will override the hour, day, and month inputs above.
         ---------------- : ...
         _centerPt_: Input a point here to change the location of the sun path in the Rhino scene.  The default is set to the Rhino model origin (0,0,0).
@@ -75,77 +75,16 @@ from Grasshopper import DataTree
 from Grasshopper.Kernel.Data import GH_Path
 
 def checkConditionalStatement(annualHourlyData, conditionalStatement):
-        lb_preparation = sc.sticky["ladybug_Preparation"]()
-        indexList, listInfo = lb_preparation.separateList(annualHourlyData, lb_preparation.strToBeFound)
-        
-        letters = [chr(i) for i in xrange(ord('a'), ord('z')+1)]
-        # remove 'and' and 'or' from conditional statements
-        csCleaned = conditionalStatement.replace('and', '',20000)
-        csCleaned = csCleaned.replace('or', '',20000)
-        
-        # find the number of the lists that have assigned conditional statements
-        listNum = []
-        for count, let in enumerate(letters):
-            if csCleaned.find(let)!= -1: listNum.append(count)
-        
-        # check if all the conditions are actually applicable
-        for num in listNum:
-            if num>len(listInfo) - 1:
-                warning = 'A conditional statement is assigned for list number ' + `num + 1` + '  which is not existed!\n' + \
-                          'Please remove the letter "' + letters[num] + '" from the statements to solve this problem!\n' + \
-                          'Number of lists are ' + `len(listInfo)` + '. Please fix this issue and try again.'
-                          
-                print warning
-                ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
-                return -1, -1
-        
-        selList = []
-        [selList.append([]) for i in range(len(listInfo))]
-        for i in range(len(listInfo)):
-            selList[i] = annualHourlyData[indexList[i]+7:indexList[i+1]]
-            if listInfo[i][4]!='Hourly' or listInfo[i][5]!=(1,1,1) or  listInfo[i][6]!=(12,31,24) or len(selList[i])!=8760:
-                warning = 'At least one of the input data lists is not a valid ladybug hourly data! Please fix this issue and try again!\n List number = '+ `i+1`
-                print warning
-                ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
-                return -1, -1
-        
-        # replace the right list in the conditional statement
-        statement = conditionalStatement.split(' ')
-        finalStatement = 'pattern = '
-        titleStatement = '...                         ...                         ...\n' +\
-                         'Conditional Selection Applied:\n'
-        
-        for statemntPart in statement:
-            statementCopy = str.Copy(statemntPart) # a copy to make a meaningful string
-            
-            if statemntPart!='and' and statemntPart!='or':
-                for num in listNum:
-                    toBeReplacedWith = 'selList[this][HOY]'.replace('this', `num`)
-                    titleToBeReplacedWith = listInfo[num][2]
-                    
-                    statemntPart = statemntPart.replace(letters[num], toBeReplacedWith, 20000)
-                    statementCopy = statementCopy.replace(letters[num], titleToBeReplacedWith, 20000)
-                    if statementCopy.find(letters[num])!=-1: break
-                    
-                titleStatement = titleStatement + ' ' + statementCopy
-            else:
-                
-                titleStatement = titleStatement + '\n' + statementCopy
-            finalStatement = finalStatement + ' ' + statemntPart
-        print titleStatement
-        
-        # check for the pattern
-        patternList = []
+        lb_conditionalStatement = sc.sticky["ladybug_ConditionalStatement"]()
         try:
-            for HOY in range(8760):
-                exec(finalStatement)
-                patternList.append(pattern)
-        except Exception,e:
-            warning = 'There is an error in the conditional statement:\n' + `e`
+            titleStatement, patternList = lb_conditionalStatement.checkConditionalStatement(annualHourlyData, conditionalStatement, True)
+        except ValueError, e:
+            warning = str(e)
             print warning
             ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
             return -1, -1
         
+        print titleStatement
         return titleStatement, patternList
 
 
@@ -187,6 +126,8 @@ def getHOYs(hours, days, months, timeStep, lb_preparation, method = 0):
             newHour = hours[-1] + step
     
     HOYS = []
+    # set of generated HOYs to avoid searching the list
+    uniqueHOYS = set()
     
     for monthCount, m in enumerate(months):
         # just a single day
@@ -215,7 +156,9 @@ def getHOYs(hours, days, months, timeStep, lb_preparation, method = 0):
                 m  = lb_preparation.checkMonth(int(m))
                 d = lb_preparation.checkDay(int(d), m)
                 HOY = lb_preparation.date2Hour(m, d, h)
-                if HOY not in HOYS: HOYS.append(HOY)
+                if HOY not in uniqueHOYS:
+                    uniqueHOYS.add(HOY)
+                    HOYS.append(HOY)
     
     return HOYS
 
@@ -231,12 +174,11 @@ def getHOYsBasedOnPeriod(analysisPeriod, timeStep, lb_preparation):
     else:
         months = range(stMonth, endMonth + 1)
     
-    # end hour shouldn't be included
-    hours  = range(stHour, endHour)
-    
     days = stDay, endDay
     
-    HOYS = getHOYs(hours, days, months, timeStep, lb_preparation, method = 1)
+    # end hour shouldn't be included
+    HOYS = lb_preparation.getHOYsArray(((stMonth, stDay, stHour), (endMonth, endDay, endHour)), timeStep, \
+                                       sortHOYs = False, includeEndHour = False).tolist()
     
     return HOYS, months, days
     
@@ -369,13 +311,26 @@ def main(latitude, longitude, timeZone, elevation, north, hour, day, month, time
             # count total sun up hours
             SUH = 0
             
-            for HOY in HOYs:
+            # get the sun positions for all the hours at once. they are calculated once for each site
+            if timeStep == 1:
+                lb_sunPositionCache = sc.sticky["ladybug_SunPositionCache"]()
+                sunPositionsData = lb_sunPositionCache.getSunPositionsForHOYs(HOYs, latitude, longitude, timeZone, northAngle, timeStep)
+            else:
+                # sub-hourly positions are interpolated between the hours instead of calculating the whole year
+                sunPositionsData = {"altitude": [], "azimuth": []}
+                for positions in lb_sunpath.iterSunPositions(HOYs, fields = ("altitude", "azimuth")):
+                    sunPositionsData["altitude"].extend(positions["altitude"])
+                    sunPositionsData["azimuth"].extend(positions["azimuth"])
+            
+            for count, HOY in enumerate(HOYs):
+                if sunPositionsData["altitude"][count] < 0: continue
+                SUH += 1
+                
                 d, m, h = lb_preparation.hour2Date(HOY, True)
                 m += 1
-                lb_sunpath.solInitOutput(m, d, h)
-                
-                if lb_sunpath.solAlt >= 0: SUH += 1
-                if lb_sunpath.solAlt >= 0 and patternList[int(round(lb_preparation.date2Hour(m, d, h)))]:
+                if patternList[int(round(lb_preparation.date2Hour(m, d, h)))]:
+                    lb_sunpath.solAlt = sunPositionsData["altitude"][count]
+                    lb_sunpath.solAz = sunPositionsData["azimuth"][count]
                     sunSphere, sunVector, sunPoint = lb_sunpath.sunPosPt(sunSc)
                     # find the hour of the year
                     sunUpHours.append(lb_preparation.date2Hour(m, d, h))
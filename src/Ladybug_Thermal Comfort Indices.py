@@ -695,38 +695,26 @@ def actualSensationModel(Ta, ws, rh, S):
     return ASV, effectASV, comfortable
 
 
-def noaaSolarCalculator(latitude, longitude, timeZone, month, day, hour):
+def noaaSolarCalculator(latitude, longitude, timeZone, HOYs):
     # by NOAA Earth System Research Laboratory
-    # NOAA defines longitude and time zone as positive to the west:
-    timeZone = -timeZone
-    longitude = -longitude
-    DOY = int(lb_preparation.getJD(month, day))
-    minute = 0  # default
-    sc = 0  # default
-    gamma = (2*math.pi)/365*(DOY-1+((hour-12)/24))
-    eqtime = 229.18*(0.000075 + 0.001868*math.cos(gamma) - 0.032077*math.sin(gamma) - 0.014615*math.cos(2*gamma) - 0.040849*math.sin(2*gamma))
-    declAngle = 0.006918 - 0.399912*math.cos(gamma) + 0.070257*math.sin(gamma) - 0.006758*math.cos(2*gamma) + 0.000907*math.sin(2*gamma) - 0.002697*math.cos(3*gamma) + 0.00148*math.sin(3*gamma)
-    time_offset = eqtime-4*longitude+60*timeZone
-    tst = hour *60 + minute + sc / 60 + time_offset
-    solarHangle = (tst / 4) - 180
-    
-    # solar zenith angle
-    solarZenithR = math.acos(math.sin(math.radians(latitude)) * math.sin(declAngle) + math.cos(math.radians(latitude)) * math.cos(declAngle) * math.cos(math.radians(solarHangle)))
-    solarZenithD = math.degrees(solarZenithR)
-    if solarZenithD > 90:
-        solarZenithD = 90
-    elif solarZenithD < 0:
-        solarZenithD = 0
-    
-    # solar altitude angle
-    solarAltitudeD = 90 - solarZenithD
-
-    # solar azimuth angle
-    solarAzimuthR = - (math.sin(math.radians(latitude)) * math.cos(solarZenithR) - math.sin(declAngle)) / (math.cos(math.radians(latitude)) * math.sin(solarZenithR))
-    solarAzimuthR = math.acos(solarAzimuthR)
-    solarAzimuthD = math.degrees(solarAzimuthR)
-    
-    return solarZenithD, solarAzimuthD, solarAltitudeD
+    # positions are shared with the other Ladybug components through ladybug_SunPositionCache
+    sunPositions = sc.sticky["ladybug_SunPositionCache"]().getSunPositionsForHOYs(HOYs, latitude, longitude, timeZone)
+    
+    solarZenithsD = []; solarAzimuthsD = []; solarAltitudesD = []
+    for solAlt, solAz in zip(sunPositions["altitude"], sunPositions["azimuth"]):
+        # solar zenith angle
+        solarZenithD = 90 - math.degrees(solAlt)
+        if solarZenithD > 90:
+            solarZenithD = 90
+        elif solarZenithD < 0:
+            solarZenithD = 0
+        solarZenithsD.append(solarZenithD)
+        # solar altitude angle
+        solarAltitudesD.append(90 - solarZenithD)
+        # solar azimuth angle
+        solarAzimuthsD.append(math.degrees(solAz))
+    
+    return solarZenithsD, solarAzimuthsD, solarAltitudesD
 
 
 def solarRadiationNudeMan(Kglob, hSl):
@@ -1459,6 +1447,9 @@ if (_comfortIndex != None) and _comfortIndex in range(15):
                 HRrates = heartRates(age, gender)
                 dehydrationRiskRates = DehydrationRiskRates(acclimated_)
                 comfortIndexValue, comfortIndexCategory, comfortableOrNot, outputNickNames, outputDescriptions = createHeaders(_comfortIndex, _dryBulbTemperature, dewPointTemperature_, _relativeHumidity, windSpeed_, globalHorizontalRadiation_, totalSkyCover_, HRrates, dehydrationRiskRates, locationName)
+                if _comfortIndex in [5, 6, 11, 14]:
+                    # calculate the sun positions once for all the hours
+                    solarZenithsD, solarAzimuthsD, solarAltitudesD = noaaSolarCalculator(latitude, longitude, timeZone, HOYs)
                 for i,hoy in enumerate(HOYs):
                     if _comfortIndex == 0:
                         hi,cat,cnc = heatIndex(TaL[int(hoy)-1], rhL[int(hoy)-1]);  comfortIndexValue.append(hi);  comfortIndexCategory.append(cat);  comfortableOrNot.append(cnc)
@@ -1478,7 +1469,7 @@ if (_comfortIndex != None) and _comfortIndex in range(15):
                         ColdExtremeCategory = -4
                     elif _comfortIndex == 5:
                         Tground = groundTemperature(TaL[int(hoy)-1], NL[int(hoy)-1])
-                        solarZenithD, solarAzimuthD, solarAltitudeD = noaaSolarCalculator(latitude, longitude, timeZone, months[i], days[i], hours[i])
+                        solarAltitudeD = solarAltitudesD[i]
                         Rprim = solarRadiationNudeMan(SRL[int(hoy)-1], solarAltitudeD)
                         vapourPressure = VapourPressure(TaL[int(hoy)-1], rhL[int(hoy)-1])
                         mrt = meanRadiantTemperature(TaL[int(hoy)-1], Tground, Rprim, vapourPressure)
@@ -1486,7 +1477,7 @@ if (_comfortIndex != None) and _comfortIndex in range(15):
                         HotExtremeCategory = 5
                     elif _comfortIndex == 6:
                         Tground = groundTemperature(TaL[int(hoy)-1], NL[int(hoy)-1])
-                        solarZenithD, solarAzimuthD, solarAltitudeD = noaaSolarCalculator(latitude, longitude, timeZone, months[i], days[i], hours[i])
+                        solarAltitudeD = solarAltitudesD[i]
                         Rprim = solarRadiationNudeMan(SRL[int(hoy)-1], solarAltitudeD)
                         vapourPressure = VapourPressure(TaL[int(hoy)-1], rhL[int(hoy)-1])
                         mrt = meanRadiantTemperature(TaL[int(hoy)-1], Tground, Rprim, vapourPressure)
@@ -1511,7 +1502,7 @@ if (_comfortIndex != None) and _comfortIndex in range(15):
                         ColdExtremeCategory = -2
                     elif _comfortIndex == 11:
                         Tground = groundTemperature(TaL[int(hoy)-1], NL[int(hoy)-1])
-                        solarZenithD, solarAzimuthD, solarAltitudeD = noaaSolarCalculator(latitude, longitude, timeZone, months[i], days[i], hours[i])
+                        solarAltitudeD = solarAltitudesD[i]
                         Rprim = solarRadiationNudeMan(SRL[int(hoy)-1], solarAltitudeD)
                         vapourPressure = VapourPressure(TaL[int(hoy)-1], rhL[int(hoy)-1])
                         mrt = meanRadiantTemperature(TaL[int(hoy)-1], Tground, Rprim, vapourPressure);  comfortIndexValue.append(mrt)
@@ -1525,7 +1516,7 @@ if (_comfortIndex != None) and _comfortIndex in range(15):
                         HotExtremeCategory = 3
                     elif _comfortIndex == 14:
                         Tground = groundTemperature(TaL[int(hoy)-1], NL[int(hoy)-1])
-                        solarZenithD, solarAzimuthD, solarAltitudeD = noaaSolarCalculator(latitude, longitude, timeZone, months[i], days[i], hours[i])
+                        solarAltitudeD = solarAltitudesD[i]
                         Rprim = solarRadiationNudeMan(SRL[int(hoy)-1], solarAltitudeD)
                         vapourPressure = VapourPressure(TaL[int(hoy)-1], rhL[int(hoy)-1])
                         mrt = meanRadiantTemperature(TaL[int(hoy)-1], Tground, Rprim, vapourPressure)
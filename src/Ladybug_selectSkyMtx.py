@@ -40,64 +40,27 @@ from Grasshopper import DataTree
 from Grasshopper.Kernel.Data import GH_Path
 
 
-def getHourlySky(daylightMtxDict, HOY):
+def getHourlySky(skyResults, HOY):
     # for presentation
     lb_preparation = sc.sticky["ladybug_Preparation"]()
     stDate = lb_preparation.hour2Date(HOY, 1)
     analysisP = ((stDate[1]+1, stDate[0], stDate[2]-1),(stDate[1]+1, stDate[0], stDate[2]))
     
-    hourlyMtx = []
-    for patchNumber in daylightMtxDict.keys():
-        # first patch is the ground
-        if patchNumber!=0:
-            hourlyMtx.append(daylightMtxDict[patchNumber][HOY])
+    # first patch is the ground and is not included
+    hourlyMtx = skyResults.hourlyValues(HOY)
     return hourlyMtx, analysisP
-    
-def getCumulativeSky(daylightMtxDict, runningPeriod):
+
+def getCumulativeSky(skyResults, runningPeriod):
     
     lb_preparation = sc.sticky["ladybug_Preparation"]()
     
-    def selectHourlyData(dataList, analysisPeriod):
-        # read analysis period
-        stMonth, stDay, stHour, endMonth, endDay, endHour = lb_preparation.readRunPeriod(analysisPeriod, False)
-        
-        selHourlyData =[];
-        
-        # select data
-        stAnnualHour = lb_preparation.date2Hour(stMonth, stDay, stHour)
-        endAnnualHour = lb_preparation.date2Hour(endMonth, endDay, endHour)
-        
-        # check it goes from the end of the year to the start of the year
-        if stAnnualHour < endAnnualHour:
-            for i, item in enumerate(dataList[stAnnualHour-1:endAnnualHour+1]):
-                if stHour-1 <= (i + stHour - 1)%24 <= endHour-1: selHourlyData.append(item)
-            type = True
-        else:
-            for i, item in enumerate(dataList[stAnnualHour-1:]):
-                if stHour-1 <= (i + stHour - 1)%24 <= endHour-1: selHourlyData.append(item)
-            for i, item in enumerate(dataList[:endAnnualHour + 1]):
-                if stHour-1 <= i %24 <= endHour-1: selHourlyData.append(item)
-            type = False
-        
-        return selHourlyData
-    
-    HOYS = selectHourlyData(range(8760), runningPeriod)
+    # index of the selected hours is HOY - 1
+    HOYS = lb_preparation.analysisPeriodIndices(runningPeriod)
     
+    # continuous hours are added up using the cumulative sums of the collection
     hourlyMtx = []
-    for patchNumber in daylightMtxDict.keys():
-        if patchNumber!=0:
-            cumulativeDifValue = 0
-            cumulativeDirValue = 0
-            # adding upp the values
-            try:
-                for HOY in HOYS:
-                    difValue, dirValue = daylightMtxDict[patchNumber][HOY + 1]
-                    cumulativeDifValue += difValue
-                    cumulativeDirValue += dirValue 
-            except Exception, e:
-                print `e`
-                
-            hourlyMtx.append([cumulativeDifValue/1000, cumulativeDirValue/1000])
+    for cumulativeDifValue, cumulativeDirValue in skyResults.sumHours(HOYS):
+        hourlyMtx.append([cumulativeDifValue/1000, cumulativeDirValue/1000])
     
     return hourlyMtx
 
@@ -153,10 +116,10 @@ def isLadybugFlying():
 
 skyMtxLists = []
 if _cumulativeSkyMtx and HOY_ and isLadybugFlying:
-    skyMtxLists, _analysisPeriod_ = getHourlySky(_cumulativeSkyMtx.d, HOY_)
+    skyMtxLists, _analysisPeriod_ = getHourlySky(_cumulativeSkyMtx, HOY_)
     unit = 'Wh/m2'
 elif _cumulativeSkyMtx and isLadybugFlying:
-    skyMtxLists = getCumulativeSky(_cumulativeSkyMtx.d, _analysisPeriod_)
+    skyMtxLists = getCumulativeSky(_cumulativeSkyMtx, _analysisPeriod_)
     unit = 'kWh/m2'
 
 selectedSkyMtx = []
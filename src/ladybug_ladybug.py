@@ -41,15 +41,22 @@ import scriptcontext as sc
 from clr import AddReference
 import Grasshopper.Kernel as gh
 import math
+import operator
 import shutil
 import sys
 import os
 import System.Threading.Tasks as tasks
 import System
 import time
-from itertools import chain
+from itertools import chain, islice, izip
+from collections import OrderedDict
+from bisect import bisect_left, bisect_right
+from array import array
 import datetime
 import urllib
+import hashlib
+import json
+import threading
 
 PI = math.pi
 letItFly = True
@@ -355,12 +362,92 @@ class Preparation(object):
         elif day > 31: day = 31
         return day
     
+    # calendar tables are calculated once for each time-step and year length
+    calendarTables = {}
+    hourStrings = []
+    
+    def calendarTable(self, timeStep = 1, leapYear = False, startWeekday = 0):
+        """
+        Lookup tables of the calendar.
+        Returns a dictionary of arrays for "months", "days", "hours", "doys" and "weekdays"
+        where index i is for HOY i / timeStep. Index 0 is the same as the last hour of the year.
+        "dayMonths" and "dayDays" give month and day for each day of the year (index 0 is not used).
+        Weekdays start from Monday = 0 and startWeekday is the weekday of January 1st.
+        """
+        key = (timeStep, leapYear, startWeekday)
+        if key in self.calendarTables: return self.calendarTables[key]
+        
+        numOfDaysEachMonth = list(self.numOfDaysEachMonth)
+        if leapYear: numOfDaysEachMonth[1] = 29
+        
+        dayMonths = array('i', [0]); dayDays = array('i', [0])
+        for monthCount, numOfDay in enumerate(numOfDaysEachMonth):
+            dayMonths.extend([monthCount + 1] * numOfDay)
+            dayDays.extend(range(1, numOfDay + 1))
+        numOfDaysInYear = len(dayMonths) - 1
+        
+        stepsPerDay = 24 * timeStep
+        dayHours = [float(step) / timeStep for step in range(1, stepsPerDay + 1)]
+        months = array('i'); days = array('i'); hours = array('d'); doys = array('i'); weekdays = array('i')
+        # the last hour of the year for HOY 0
+        for doy in [numOfDaysInYear] + range(1, numOfDaysInYear + 1):
+            if months: numOfSteps = stepsPerDay
+            else: numOfSteps = 1
+            months.extend([dayMonths[doy]] * numOfSteps)
+            days.extend([dayDays[doy]] * numOfSteps)
+            doys.extend([doy] * numOfSteps)
+            weekdays.extend([(startWeekday + doy - 1) % 7] * numOfSteps)
+            if numOfSteps == 1: hours.append(24)
+            else: hours.extend(dayHours)
+        
+        table = {"months": months, "days": days, "hours": hours, "doys": doys, "weekdays": weekdays,
+                 "dayMonths": dayMonths, "dayDays": dayDays}
+        self.calendarTables[key] = table
+        return table
+    
+    def hoys2Dates(self, HOYs, timeStep = 1, leapYear = False):
+        """
+        Convert a list of HOYs to months, days and hours using the calendar table.
+        HOYs are rounded to the closest time-step.
+        """
+        table = self.calendarTable(timeStep, leapYear)
+        numOfSteps = len(table["months"]) - 1
+        indices = [int(round(HOY * timeStep)) % numOfSteps for HOY in HOYs]
+        months, days, hours = table["months"], table["days"], table["hours"]
+        return [months[i] for i in indices], [days[i] for i in indices], [hours[i] for i in indices]
+    
+    def dates2Hoys(self, months, days, hours, leapYear = False):
+        """Convert lists of months, days and hours to HOYs using cumulative month offsets"""
+        numOfDays = list(self.numOfDays)
+        if leapYear: numOfDays = numOfDays[:2] + [numOfDay + 1 for numOfDay in numOfDays[2:]]
+        return array('d', [(numOfDays[int(month) - 1] + int(day) - 1) * 24 + hour \
+                           for month, day, hour in zip(months, days, hours)])
+    
     def hour2Date(self, hour, alternate = False):
         numOfDays = [0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334, 365]
         numOfHours = [24 * numOfDay for numOfDay in numOfDays]
         #print hour/24
         if hour%8760==0 and not alternate: return `31`+ ' ' + 'DEC' + ' 24:00'
         elif hour%8760==0: return 31, 11, 24
+        
+        if 0 < hour < 8760:
+            # look it up in the calendar table
+            table = self.calendarTable()
+            doy = int(math.ceil(hour / 24.0))
+            month, day = table["dayMonths"][doy], table["dayDays"][doy]
+            if alternate:
+                time = hour%24
+                if time == 0: time = 24
+                return day, month - 1, time
+            if hour == int(hour):
+                if not self.hourStrings:
+                    hourStrings = [`table["days"][HOY]` + ' ' + self.monthList[table["months"][HOY] - 1] + ' ' + \
+                                   `int(table["hours"][HOY])` + ':00' for HOY in range(8761)]
+                    self.hourStrings.extend(hourStrings)
+                return self.hourStrings[int(hour)]
+            minutes = `int(round((hour - math.floor(hour)) * 60))`
+            if len(minutes) == 1: minutes = '0' + minutes
+            return `day` + ' ' + self.monthList[month - 1] + ' ' + `int(hour%24)` + ':' + minutes
     
         for h in range(len(numOfHours)-1):
             if hour <= numOfHours[h+1]: month = self.monthList[h]; break
@@ -411,43 +498,68 @@ class Preparation(object):
                 try: return rc.Geometry.Point3d(cenPt)
                 except: return rc.Geometry.Point3d.Origin
     
-    def selectHourlyData(self, hourlyData, analysisPeriod):
-        # separate data
-        indexList, listInfo = self.separateList(hourlyData, self.strToBeFound)
+    # indices of analysis periods for each time-step
+    periodIndicesCache = {}
+    periodIndicesCacheSize = 32
     
-        #separate lists of lists
-        separatedLists = []
-        for i in range(len(indexList)-1):
-            selList = []
-            [selList.append(float(x)) for x in hourlyData[indexList[i]+7:indexList[i+1]]]
-            separatedLists.append(selList)
+    def analysisPeriodIndices(self, analysisPeriod, timeStep = 1):
+        """
+        Indices of the values of an annual list that are inside an analysis period.
+        For hourly data index is HOY - 1. Hours out of start and end hour of each day are excluded
+        and periods that pass the end of the year wrap around from January.
+        Indices are cached for each period and time-step so they can be applied to any number of lists.
+        """
+        stMonth, stDay, stHour, endMonth, endDay, endHour = self.readRunPeriod(analysisPeriod, False)
+        key = (stMonth, stDay, stHour, endMonth, endDay, endHour, timeStep)
+        if key in self.periodIndicesCache: return self.periodIndicesCache[key]
+        
+        stAnnualHour = self.date2Hour(stMonth, stDay, stHour)
+        endAnnualHour = self.date2Hour(endMonth, endDay, endHour)
+        
+        # index of selected hours in each day
+        dayHours = [hour for hour in range(24) if stHour-1 <= hour <= endHour-1]
+        
+        # check it goes from the end of the year to the start of the year
+        if stAnnualHour <= endAnnualHour:
+            days = range(int(stAnnualHour-1) // 24, int(endAnnualHour-1) // 24 + 1)
+            hourRange = stAnnualHour-1, endAnnualHour-1
+        else:
+            days = range(int(stAnnualHour-1) // 24, 365) + range(0, int(endAnnualHour-1) // 24 + 1)
+            hourRange = None
+        
+        indices = array('i')
+        for day in days:
+            for hour in dayHours:
+                HOY = day * 24 + hour
+                if hourRange and not hourRange[0] <= HOY <= hourRange[1]: continue
+                elif not hourRange and endAnnualHour-1 < HOY < stAnnualHour-1: continue
+                indices.extend(range(HOY * timeStep, (HOY + 1) * timeStep))
+        
+        if len(self.periodIndicesCache) >= self.periodIndicesCacheSize: self.periodIndicesCache.clear()
+        self.periodIndicesCache[key] = indices
+        return indices
     
+    def selectHourlyData(self, hourlyData, analysisPeriod):
+        # separate data
+        if isinstance(hourlyData, DataCollection): dataCollections = [hourlyData]
+        else: dataCollections = DataCollection.fromList(hourlyData)
+        
         # read analysis period
         stMonth, stDay, stHour, endMonth, endDay, endHour = self.readRunPeriod(analysisPeriod)
+        indices = self.analysisPeriodIndices(analysisPeriod)
         
         selHourlyData =[];
         
-        for l in range(len(separatedLists)):
-            [selHourlyData.append(item) for item in listInfo[l][:4]]
-            selHourlyData.append('Hourly')
+        for dataCollection in dataCollections:
+            selHourlyData.extend(dataCollection.header.toList()[:5])
+            selHourlyData[-1] = 'Hourly'
             selHourlyData.append((stMonth, stDay, stHour))
             selHourlyData.append((endMonth, endDay, endHour))
             # select data
-            stAnnualHour = self.date2Hour(stMonth, stDay, stHour)
-            endAnnualHour = self.date2Hour(endMonth, endDay, endHour)
-            
-            # check it goes from the end of the year to the start of the year
-            if stAnnualHour < endAnnualHour:
-                for i, item in enumerate(separatedLists[l][stAnnualHour-1:endAnnualHour]):
-                    if stHour-1 <= (i + stHour - 1)%24 <= endHour-1: selHourlyData.append(item)
-                type = True
-            else:
-                for i, item in enumerate(separatedLists[l][stAnnualHour-1:]):
-                    if stHour-1 <= (i + stHour - 1)%24 <= endHour-1: selHourlyData.append(item)
-                
-                for i, item in enumerate(separatedLists[l][:endAnnualHour]):
-                    if stHour-1 <= i %24 <= endHour-1: selHourlyData.append(item)
-                type = False
+            values = dataCollection.buffer
+            start = dataCollection.start
+            numOfValues = len(dataCollection)
+            selHourlyData.extend([values[start + i] for i in indices if i < numOfValues])
         
         return selHourlyData
     
@@ -461,6 +573,8 @@ class Preparation(object):
         if timeStep != 1: hours = rs.frange(hours[0], hours[-1] + 1 - 1/timeStep, 1/timeStep)
         
         HOYS = []
+        # set of generated HOYs to avoid searching the list
+        uniqueHOYS = set()
         
         for monthCount, m in enumerate(months):
             # just a single day
@@ -489,7 +603,9 @@ class Preparation(object):
                     m  = self.checkMonth(int(m))
                     d = self.checkDay(int(d), m)
                     HOY = self.date2Hour(m, d, h)
-                    if HOY not in HOYS: HOYS.append(int(HOY))
+                    if HOY not in uniqueHOYS:
+                        uniqueHOYS.add(HOY)
+                        HOYS.append(int(HOY))
         
         return HOYS
     
@@ -503,15 +619,39 @@ class Preparation(object):
         else:
             months = range(stMonth, endMonth + 1)
         
-        # end hour shouldn't be included
-        hours  = range(stHour, endHour+1)
-        
         days = stDay, endDay
         
-        HOYS = self.getHOYs(hours, days, months, timeStep, method = 1)
+        HOYS = self.getHOYsArray(((stMonth, stDay, stHour), (endMonth, endDay, endHour)), timeStep, sortHOYs = False)
+        if timeStep == 1: HOYS = [int(HOY) for HOY in HOYS]
+        else: HOYS = HOYS.tolist()
         
         return HOYS, months, days
     
+    def getHOYsArray(self, analysisPeriod, timeStep = 1, sortHOYs = True, includeEndHour = True):
+        """
+        Return unique HOYs of an analysis period as an array('d').
+        Day of the year for start and end are calculated from cumulative month offsets and
+        the hours are generated for each day without checking every month, day and hour.
+        If sortHOYs is False, HOYs of periods that pass the end of the year start from the
+        start month instead of January.
+        if includeEndHour is False hours stop one time-step before the end hour.
+        """
+        stMonth, stDay, stHour, endMonth, endDay, endHour = self.readRunPeriod(analysisPeriod, False)
+        stMonth, endMonth = self.checkMonth(int(stMonth)), self.checkMonth(int(endMonth))
+        stJD = self.getJD(stMonth, self.checkDay(int(stDay), stMonth))
+        endJD = self.getJD(endMonth, self.checkDay(int(endDay), endMonth))
+        
+        if stJD <= endJD: JDs = range(stJD, endJD + 1)
+        elif sortHOYs: JDs = range(1, endJD + 1) + range(stJD, 366)
+        else: JDs = range(stJD, 366) + range(1, endJD + 1)
+        
+        # hours of a single day
+        numOfSteps = int(round((endHour - stHour) * timeStep))
+        if includeEndHour: numOfSteps += 1
+        dayHours = [stHour + float(step) / timeStep for step in range(numOfSteps)]
+        
+        return array('d', [(JD - 1) * 24 + hour for JD in JDs for hour in dayHours])
+    
     
     
     def readLegendParameters(self, legendPar, getCenter = True):
@@ -680,25 +820,59 @@ class Preparation(object):
             #print 'GenCumulativeSky.exe is already available at ', workingDir + \
             #'\nPlease make sure you are using the latest version of GenCumulativeSky.exe'
 
+    def seriesLength(self, headerList):
+        """Guess number of values after a header based on frequency and analysis period. Returns None if it can't"""
+        try:
+            frequency = headerList[4]
+            stMonth, stDay, stHour = headerList[5]
+            endMonth, endDay, endHour = headerList[6]
+            stJD, endJD = self.getJD(stMonth, stDay), self.getJD(endMonth, endDay)
+            if endJD >= stJD: numOfDays = endJD - stJD + 1
+            else: numOfDays = 365 - stJD + 1 + endJD
+            if frequency == 'Hourly' and stHour <= endHour: return numOfDays * (endHour - stHour + 1)
+            elif frequency == 'Daily': return numOfDays
+            elif frequency == 'Monthly': return (endMonth - stMonth) % 12 + 1
+        except:
+            pass
+        return None
+    
     def separateList(self, list, key):
             indexList = []; listInfo = [];
-            for item in range(len(list)):
-                if list[item] == key:
+            try: firstItem = list.index(key)
+            except ValueError: firstItem = None
+            if firstItem is not None:
+                # jump from each header to the next one based on the number of values of its frequency
+                # and analysis period. the jumps are only used if the last series ends at the end of the
+                # list and there is no other key in the list so a shorter series can't skip a header
+                item = firstItem
+                while item < len(list) and list[item] == key:
                     indexList.append(item)
-                    listInfo.append(list[item : item+7])
+                    seriesLength = self.seriesLength(list[item : item+7])
+                    if seriesLength is None: break
+                    item += 7 + seriesLength
+                if item != len(list) or list.count(key) != len(indexList):
+                    # look for all the keys
+                    indexList = [firstItem]
+                    while True:
+                        try: indexList.append(list.index(key, indexList[-1] + 1))
+                        except ValueError: break
+                listInfo = [list[item : item+7] for item in indexList]
+            
             # in case of numbers with no str information
             if len(indexList) == 0:
                 indexList = [-7, len(list)];
                 listInfo = [[key, 'somewhere','someData', 'someUnits', 'someTimeStep',(1, 1, 1),(12, 31, 24)]]
             else:
                 indexList.append(len(list))
-                
+            
             return indexList, listInfo
-
+    
     ## read epw file
     def epwLocation(self, epw_file):
-        epwfile = open(epw_file,"r")
-        headline = epwfile.readline()
+        headline = EPWCache().readHeader(epw_file)[0]
+        return self.epwLocationFromHeader(headline)
+    
+    def epwLocationFromHeader(self, headline):
         csheadline = headline.split(',')
         while 1>0: #remove empty cells from the end of the list if any
             try: float(csheadline[-1]); break
@@ -718,7 +892,6 @@ class Preparation(object):
             lngt+',     !Longitude\n' + \
             timeZone+',     !Time Zone\n' + \
             elev + ';       !Elevation'
-        epwfile.close
         return locName, lat, lngt, timeZone, elev, locationString
 
     def separateHeader(self, inputList):
@@ -743,85 +916,45 @@ class Preparation(object):
     
     def groundTempData(self, epw_file, location = 'Somewhere!', Depth = 'Not entered!'):
         
-        epwfile = open(epw_file,"r")
+        # 4th line of the epw contains groundtemp data
+        groundline = EPWCache().readHeader(epw_file)[3]
+        return self.groundTempDataFromHeader(groundline, location, True)
+    
+    def groundTempDataFromHeader(self, groundline, location = 'Somewhere!', report = False):
         
         groundtemp1st = [self.strToBeFoundgt, location, 'Depth' , 'Ground temperature', 'C', 'Monthly', (1, 1, 1), (12, 31, 24)];
         groundtemp2nd = [self.strToBeFoundgt, location, 'Depth' , 'Ground temperature', 'C', 'Monthly', (1, 1, 1), (12, 31, 24)];
         groundtemp3rd = [self.strToBeFoundgt, location, 'Depth' , 'Ground temperature', 'C', 'Monthly', (1, 1, 1), (12, 31, 24)];
-
-        lnum = 1 # Line number
         
-        with epwfile as i:
-            for line in i: 
-                if lnum == 3: 
-                    
-                    groundtemp = epwfile.readline().split(',') ## Adding line from epw to file as a string then splitting it along , this line in the epw contains groundtemp data
-                    print 'Ground temperature data contains monthly average temperatures at ' + groundtemp[1] + ' different depths ' + groundtemp[2] + ' meters (1st)' + groundtemp[18]+ ' meters (2nd)'+groundtemp[34]+'meters (3rd)respectively'
-                          
-                    
-                    def func(seq): ## Function that converts strings to floats if possible if not returns the original 
-                        for x in seq:
-                            try:
-                                yield float(x)
-                            except ValueError:
-                                yield x
-                 
-                    groundtemp1st.extend(func(groundtemp[6:18])) ## Need to use func and not just float as it is a list using float() won't work
-                    groundtemp2nd.extend(func(groundtemp[22:34]))
-                    groundtemp3rd.extend(func(groundtemp[38:50]))
-                    
-                    self.depthData(groundtemp1st,float(groundtemp[2])) ## Referring to the depthData function 
-                    self.depthData(groundtemp2nd,float(groundtemp[18])) ## In each groundtemp list changing 'Depth' index to each datasets corresponding depth in the epw
-                    self.depthData(groundtemp3rd,float(groundtemp[34]))
-                    
-                else:
-                    pass
-                lnum += 1
-                
+        groundtemp = groundline.split(',') ## Splitting the line along , 
+        if report: print 'Ground temperature data contains monthly average temperatures at ' + groundtemp[1] + ' different depths ' + groundtemp[2] + ' meters (1st)' + groundtemp[18]+ ' meters (2nd)'+groundtemp[34]+'meters (3rd)respectively'
+        
+        def func(seq): ## Function that converts strings to floats if possible if not returns the original 
+            for x in seq:
+                try:
+                    yield float(x)
+                except ValueError:
+                    yield x
+        
+        groundtemp1st.extend(func(groundtemp[6:18])) ## Need to use func and not just float as it is a list using float() won't work
+        groundtemp2nd.extend(func(groundtemp[22:34]))
+        groundtemp3rd.extend(func(groundtemp[38:50]))
+        
+        self.depthData(groundtemp1st,float(groundtemp[2])) ## Referring to the depthData function 
+        self.depthData(groundtemp2nd,float(groundtemp[18])) ## In each groundtemp list changing 'Depth' index to each datasets corresponding depth in the epw
+        self.depthData(groundtemp3rd,float(groundtemp[34]))
+        
         return groundtemp1st,groundtemp2nd,groundtemp3rd
     
     
     strToBeFound = 'key:location/dataType/units/frequency/startsAt/endsAt'
     
-    def epwDataReader(self, epw_file, location = 'Somewhere!'):
-        # weather data
-        dbTemp = [self.strToBeFound, location, 'Dry Bulb Temperature', 'C', 'Hourly', (1, 1, 1), (12, 31, 24)];
-        dewPoint = [self.strToBeFound, location, 'Dew Point Temperature', 'C', 'Hourly', (1, 1, 1), (12, 31, 24)];
-        RH = [self.strToBeFound, location, 'Relative Humidity', '%', 'Hourly', (1, 1, 1), (12, 31, 24)]
-        windSpeed = [self.strToBeFound, location, 'Wind Speed', 'm/s', 'Hourly', (1, 1, 1), (12, 31, 24)];
-        windDir = [self.strToBeFound, location, 'Wind Direction', 'degrees', 'Hourly', (1, 1, 1), (12, 31, 24)];
-        dirRad = [self.strToBeFound, location, 'Direct Normal Radiation', 'Wh/m2', 'Hourly', (1, 1, 1), (12, 31, 24)];
-        difRad = [self.strToBeFound, location, 'Diffuse Horizontal Radiation', 'Wh/m2', 'Hourly', (1, 1, 1), (12, 31, 24)];
-        glbRad = [self.strToBeFound, location, 'Global Horizontal Radiation', 'Wh/m2', 'Hourly', (1, 1, 1), (12, 31, 24)];
-        dirIll = [self.strToBeFound, location, 'Direct Normal Illuminance', 'lux', 'Hourly', (1, 1, 1), (12, 31, 24)];
-        difIll = [self.strToBeFound, location, 'Diffuse Horizontal Illuminance', 'lux', 'Hourly', (1, 1, 1), (12, 31, 24)];
-        glbIll = [self.strToBeFound, location, 'Global Horizontal Illuminance', 'lux', 'Hourly', (1, 1, 1), (12, 31, 24)];
-        cloudCov = [self.strToBeFound, location, 'Total Cloud Cover', 'tenth', 'Hourly', (1, 1, 1), (12, 31, 24)];
-        rainDepth = [self.strToBeFound, location, 'Liquid Precipitation Depth', 'mm', 'Hourly', (1, 1, 1), (12, 31, 24)];
-        barPress = [self.strToBeFound, location, 'Barometric Pressure', 'Pa', 'Hourly', (1, 1, 1), (12, 31, 24)];
-        epwfile = open(epw_file,"r")
-        lnum = 1 # line number
-        for line in epwfile:
-            if lnum > 8:
-                dbTemp.append(float(line.split(',')[6]))
-                dewPoint.append(float(line.split(',')[7]))
-                RH.append(float(line.split(',')[8]))
-                barPress.append(float(line.split(',')[9]))
-                windSpeed.append(float(line.split(',')[21]))
-                windDir.append(float(line.split(',')[20]))
-                dirRad.append(float(line.split(',')[14]))
-                difRad.append(float(line.split(',')[15]))
-                glbRad.append(float(line.split(',')[13]))
-                dirIll.append(float(line.split(',')[17]))
-                difIll.append(float(line.split(',')[18]))
-                glbIll.append(float(line.split(',')[16]))
-                cloudCov.append(float(line.split(',')[22]))
-                try:
-                    if float(line.split(',')[33])!=999: rainDepth.append(float(line.split(',')[33]))
-                    else: rainDepth.append(0.0)
-                except: pass
-            lnum += 1
-        return dbTemp, dewPoint, RH, windSpeed, windDir, dirRad, difRad, glbRad, dirIll, difIll, glbIll, cloudCov, rainDepth, barPress
+    def epwDataReader(self, epw_file, location = 'Somewhere!', useCache = True):
+        # read the columns once and convert them to the legacy header-prefixed lists
+        epwReader = EPWReader()
+        if useCache: header, columns = EPWCache().readColumns(epw_file, epwReader.legacyFieldIndices())
+        else: header, columns = epwReader.readColumns(epw_file, epwReader.legacyFieldIndices())
+        return epwReader.toLegacyLists(columns, location)
     
     ##### Start of Gencumulative Sky
     def removeBlank(self, str):
@@ -1295,6 +1428,1292 @@ class Preparation(object):
     (-0.180057,0.103956,0.978148),(0.0,0.0,1)]
 
 
+class EPWReader(object):
+    """
+    Columnar reader for .epw files. Each data row is split only once and the values
+    are written to preallocated array('d') columns for all 35 fields of the file.
+    Field names, units and missing values are borrowed from "Auxiliary EnergyPlus Programs".
+    """
+    # (field name, units, missing value)
+    fields = [('Year', 'yr', None), ('Month', 'month', None), ('Day', 'day', None),
+              ('Hour', 'hr', None), ('Minute', 'min', None),
+              ('Data Source and Uncertainty Flags', None, None),
+              ('Dry Bulb Temperature', 'C', 99.9), ('Dew Point Temperature', 'C', 99.9),
+              ('Relative Humidity', '%', 999), ('Atmospheric Station Pressure', 'Pa', 999999),
+              ('Extraterrestrial Horizontal Radiation', 'Wh/m2', 9999),
+              ('Extraterrestrial Direct Normal Radiation', 'Wh/m2', 9999),
+              ('Horizontal Infrared Radiation Intensity', 'Wh/m2', 9999),
+              ('Global Horizontal Radiation', 'Wh/m2', 9999), ('Direct Normal Radiation', 'Wh/m2', 9999),
+              ('Diffuse Horizontal Radiation', 'Wh/m2', 9999), ('Global Horizontal Illuminance', 'lux', 999999),
+              ('Direct Normal Illuminance', 'lux', 999999), ('Diffuse Horizontal Illuminance', 'lux', 999999),
+              ('Zenith Luminance', 'Cd/m2', 9999), ('Wind Direction', 'degrees', 999),
+              ('Wind Speed', 'm/s', 999), ('Total Sky Cover', 'tenth', 99), ('Opaque Sky Cover', 'tenth', 99),
+              ('Visibility', 'km', 9999), ('Ceiling Height', 'm', 99999),
+              ('Present Weather Observation', None, 9), ('Present Weather Codes', None, 999999999),
+              ('Precipitable Water', 'mm', 999), ('Aerosol Optical Depth', 'thousandths', 0.999),
+              ('Snow Depth', 'cm', 999), ('Days Since Last Snowfall', 'day', 99), ('Albedo', None, 999),
+              ('Liquid Precipitation Depth', 'mm', 999), ('Liquid Precipitation Quantity', 'hr', 99)]
+    
+    # text field that can't be stored in a float array
+    flagsField = 5
+    
+    # (field index, legacy name, legacy units) in the order that epwDataReader returns them
+    legacyFields = [(6, 'Dry Bulb Temperature', 'C'), (7, 'Dew Point Temperature', 'C'),
+                    (8, 'Relative Humidity', '%'), (21, 'Wind Speed', 'm/s'),
+                    (20, 'Wind Direction', 'degrees'), (14, 'Direct Normal Radiation', 'Wh/m2'),
+                    (15, 'Diffuse Horizontal Radiation', 'Wh/m2'), (13, 'Global Horizontal Radiation', 'Wh/m2'),
+                    (17, 'Direct Normal Illuminance', 'lux'), (18, 'Diffuse Horizontal Illuminance', 'lux'),
+                    (16, 'Global Horizontal Illuminance', 'lux'), (22, 'Total Cloud Cover', 'tenth'),
+                    (33, 'Liquid Precipitation Depth', 'mm'), (9, 'Barometric Pressure', 'Pa')]
+    
+    def fieldIndex(self, fieldName):
+        """Return the index of a field based on its name or index"""
+        if isinstance(fieldName, int): return fieldName
+        for count, field in enumerate(self.fields):
+            if field[0].lower() == fieldName.lower(): return count
+        for count, name, units in self.legacyFields:
+            if name.lower() == fieldName.lower(): return count
+        raise ValueError("%s is not a valid epw field!" % fieldName)
+    
+    def legacyFieldIndices(self):
+        return [fieldIndex for fieldIndex, name, units in self.legacyFields]
+    
+    def readLines(self, epw_file):
+        """Return the 8 header lines and the data lines of an epw file"""
+        with open(epw_file, "r") as epwfile:
+            lines = epwfile.readlines()
+        # remove empty lines from the end of the file if any
+        while len(lines) > 8 and not lines[-1].strip(): lines.pop()
+        return lines[:8], lines[8:]
+    
+    def parseRows(self, rows, fieldIndices = None):
+        """
+        Split each row once and fill the columns.
+        Returns a list of 35 columns. Columns that are not in fieldIndices are None.
+        """
+        if fieldIndices is None: fieldIndices = range(len(self.fields))
+        numOfRows = len(rows)
+        
+        columns = [None] * len(self.fields)
+        numColumns = []
+        for fieldIndex in fieldIndices:
+            if fieldIndex == self.flagsField:
+                columns[fieldIndex] = [''] * numOfRows
+            else:
+                columns[fieldIndex] = array('d', [0.0]) * numOfRows
+                missing = self.fields[fieldIndex][2]
+                if missing is None: missing = 0
+                numColumns.append((fieldIndex, columns[fieldIndex], float(missing)))
+        
+        flags = columns[self.flagsField]
+        
+        for rowCount, line in enumerate(rows):
+            values = line.split(',')
+            for fieldIndex, column, missing in numColumns:
+                try: column[rowCount] = float(values[fieldIndex])
+                except (ValueError, IndexError): column[rowCount] = missing
+            if flags is not None: flags[rowCount] = values[self.flagsField]
+        
+        return columns
+    
+    def readColumns(self, epw_file, fieldIndices = None):
+        """Read an epw file and return the header lines and the data columns"""
+        header, rows = self.readLines(epw_file)
+        return header, self.parseRows(rows, fieldIndices)
+    
+    def dataPeriod(self, header):
+        """
+        Read DATA PERIODS line of the header.
+        Returns number of records per hour, start (month, day) and end (month, day)
+        """
+        dataPeriods = header[7].split(',')
+        try: recordsPerHour = int(dataPeriods[2])
+        except: recordsPerHour = 1
+        try:
+            stMonth, stDay = [int(x) for x in dataPeriods[5].split('/')[:2]]
+            endMonth, endDay = [int(x) for x in dataPeriods[6].split('/')[:2]]
+        except:
+            stMonth, stDay, endMonth, endDay = 1, 1, 12, 31
+        return recordsPerHour, (stMonth, stDay), (endMonth, endDay)
+    
+    def isLeapYear(self, year):
+        year = int(year)
+        return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    
+    def chunkHOYs(self, columns):
+        """
+        Calculate hour of the year for every row of a chunk from year, month, day, hour and minute columns.
+        Leap years add February 29th to the year so hours can go up to 8784.
+        """
+        numOfDays = [0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334]
+        years, months, days, hours, minutes = columns[:5]
+        HOYs = array('d', [0.0]) * len(months)
+        for row in range(len(months)):
+            month = int(months[row])
+            JD = numOfDays[month - 1] + int(days[row])
+            if month > 2 and self.isLeapYear(years[row]): JD += 1
+            minute = minutes[row] or 60
+            HOYs[row] = (JD - 1) * 24 + hours[row] - 1 + minute / 60.0
+        return HOYs
+    
+    def iterChunks(self, epw_file, fieldIndices = None, chunkSize = 8760):
+        """
+        Read an epw file chunk by chunk with constant memory.
+        Nothing is assumed about the number of rows so it works for sub-hourly, leap year and
+        multi-year files. Year, month, day, hour and minute columns are always included.
+        Yields the index of the first row of the chunk and the columns of that chunk.
+        
+        Usage:
+            for startRow, columns in EPWReader().iterChunks(epw_file, [6]):
+                HOYs = EPWReader().chunkHOYs(columns)
+                dbTemp = columns[6]
+        """
+        if fieldIndices is None: fieldIndices = range(len(self.fields))
+        fieldIndices = sorted(set(list(fieldIndices) + [0, 1, 2, 3, 4]))
+        
+        with open(epw_file, "r") as epwfile:
+            for lineCount in range(8): epwfile.readline()
+            startRow = 0
+            while True:
+                lines = list(islice(epwfile, chunkSize))
+                if not lines: break
+                rows = [line for line in lines if line.strip()]
+                if not rows: continue
+                yield startRow, self.parseRows(rows, fieldIndices)
+                startRow += len(rows)
+    
+    def toLegacyLists(self, columns, location = 'Somewhere!', legacyIndices = None):
+        """
+        Convert the columns to the header-prefixed lists that epwDataReader used to return.
+        Lists that are not in legacyIndices will be None.
+        """
+        legacyLists = []
+        for legacyIndex, (fieldIndex, name, units) in enumerate(self.legacyFields):
+            if legacyIndices is not None and legacyIndex not in legacyIndices:
+                legacyLists.append(None)
+                continue
+            values = columns[fieldIndex].tolist()
+            if fieldIndex == 33:
+                # missing precipitation is considered as no rain
+                values = [0.0 if value == 999 else value for value in values]
+            legacyLists.append([Preparation.strToBeFound, location, name, units, 'Hourly', (1, 1, 1), (12, 31, 24)] + values)
+        return tuple(legacyLists)
+
+
+class EPWCache(object):
+    """
+    Binary cache for parsed .epw files.
+    Parsed columns are saved as an .lbw file under Ladybug's default folder so reopening
+    an unchanged weather file only reads the binary columns back and doesn't parse the text.
+    A cache file is valid as long as path, size and modified time (or content hash) of the
+    epw file match. The least recently used files are removed once the size of the cache
+    folder passes maxSize.
+    
+    .lbw layout: one line of json info, the 8 header lines of the epw file and then
+    every numerical column as a block of doubles.
+    """
+    version = 1
+    
+    def __init__(self, cacheFolder = None, maxSize = 200 * 1024 * 1024):
+        if not cacheFolder: cacheFolder = os.path.join(sc.sticky["Ladybug_DefaultFolder"], "epwCache")
+        self.cacheFolder = cacheFolder
+        self.maxSize = maxSize
+        self.epwReader = EPWReader()
+    
+    def cacheFile(self, epw_file):
+        pathKey = hashlib.md5(os.path.normcase(os.path.abspath(epw_file))).hexdigest()
+        return os.path.join(self.cacheFolder, pathKey + ".lbw")
+    
+    def contentHash(self, epw_file):
+        md5 = hashlib.md5()
+        with open(epw_file, "rb") as epwfile:
+            for chunk in iter(lambda: epwfile.read(1048576), ''):
+                md5.update(chunk)
+        return md5.hexdigest()
+    
+    def readInfo(self, cacheFile):
+        """Return the json info of a cache file and the position that epw header starts"""
+        with open(cacheFile, "rb") as lbwfile:
+            infoLine = lbwfile.readline()
+        return json.loads(infoLine), len(infoLine)
+    
+    def validInfo(self, epw_file):
+        """Return the info of cache file for this epw file if it is still valid. Otherwise returns None"""
+        cacheFile = self.cacheFile(epw_file)
+        if not os.path.isfile(cacheFile): return None
+        try:
+            info, infoSize = self.readInfo(cacheFile)
+            epwStat = os.stat(epw_file)
+            if info["version"] != self.version or info["size"] != epwStat.st_size: return None
+            if info["mtime"] != epwStat.st_mtime:
+                # the file has been touched. check the content before giving up on the cache
+                if info["hash"] != self.contentHash(epw_file): return None
+                info["mtime"] = epwStat.st_mtime
+                info["touched"] = True
+        except:
+            return None
+        
+        info["dataStart"] = infoSize + info["headerSize"]
+        return info
+    
+    def readHeader(self, epw_file):
+        """Return the 8 header lines of an epw file. Use the cache if it's available"""
+        info = self.validInfo(epw_file)
+        if info is not None:
+            with open(self.cacheFile(epw_file), "rb") as lbwfile:
+                lbwfile.seek(info["dataStart"] - info["headerSize"])
+                return lbwfile.read(info["headerSize"]).splitlines(True)
+        
+        with open(epw_file, "r") as epwfile:
+            return [epwfile.readline() for lineCount in range(8)]
+    
+    def loadColumns(self, epw_file, info, fieldIndices = None):
+        columns = [None] * len(self.epwReader.fields)
+        numOfRows = info["numOfRows"]
+        cacheFile = self.cacheFile(epw_file)
+        with open(cacheFile, "rb") as lbwfile:
+            header = lbwfile.read(info["dataStart"])[-info["headerSize"]:].splitlines(True)
+            for count, fieldIndex in enumerate(info["fields"]):
+                if fieldIndices is not None and fieldIndex not in fieldIndices: continue
+                column = array('d')
+                lbwfile.seek(info["dataStart"] + count * numOfRows * column.itemsize)
+                column.fromfile(lbwfile, numOfRows)
+                if info["byteorder"] != sys.byteorder: column.byteswap()
+                columns[fieldIndex] = column
+        
+        # keep track of the recently used files for eviction
+        try: os.utime(cacheFile, None)
+        except: pass
+        
+        return header, columns
+    
+    def save(self, epw_file, header, columns):
+        """Write the columns to the cache folder. Columns should include all the numerical fields"""
+        if not os.path.isdir(self.cacheFolder): os.makedirs(self.cacheFolder)
+        
+        epwStat = os.stat(epw_file)
+        fields = [fieldIndex for fieldIndex, column in enumerate(columns) \
+                  if column is not None and fieldIndex != self.epwReader.flagsField]
+        headerStr = "".join(header)
+        info = {"version": self.version,
+                "path": os.path.abspath(epw_file),
+                "size": epwStat.st_size,
+                "mtime": epwStat.st_mtime,
+                "hash": self.contentHash(epw_file),
+                "numOfRows": len(columns[fields[0]]),
+                "fields": fields,
+                "byteorder": sys.byteorder,
+                "headerSize": len(headerStr)}
+        
+        cacheFile = self.cacheFile(epw_file)
+        tempFile = cacheFile + ".tmp"
+        with open(tempFile, "wb") as lbwfile:
+            lbwfile.write(json.dumps(info) + "\n")
+            lbwfile.write(headerStr)
+            for fieldIndex in fields:
+                columns[fieldIndex].tofile(lbwfile)
+        
+        if os.path.isfile(cacheFile): os.remove(cacheFile)
+        os.rename(tempFile, cacheFile)
+        
+        self.evict()
+    
+    def evict(self):
+        """Remove the least recently used cache files until the folder is smaller than maxSize"""
+        cacheFiles = []
+        for f in os.listdir(self.cacheFolder):
+            if not f.endswith(".lbw"): continue
+            # files can be removed by another thread in the meantime
+            try: fileStat = os.stat(os.path.join(self.cacheFolder, f))
+            except OSError: continue
+            cacheFiles.append((fileStat.st_mtime, fileStat.st_size, os.path.join(self.cacheFolder, f)))
+        cacheFiles.sort()
+        totalSize = sum([size for mtime, size, cacheFile in cacheFiles])
+        
+        # never remove the most recent file
+        while totalSize > self.maxSize and len(cacheFiles) > 1:
+            mtime, size, cacheFile = cacheFiles.pop(0)
+            totalSize -= size
+            try: os.remove(cacheFile)
+            except: pass
+    
+    def clear(self):
+        if not os.path.isdir(self.cacheFolder): return
+        for f in os.listdir(self.cacheFolder):
+            if f.endswith(".lbw"): os.remove(os.path.join(self.cacheFolder, f))
+    
+    def readColumns(self, epw_file, fieldIndices = None):
+        """
+        Same as EPWReader.readColumns but reads the columns from cache if the file is
+        already parsed. Returns the header lines and the columns.
+        """
+        if fieldIndices is not None and self.epwReader.flagsField in fieldIndices:
+            # flags are text and aren't cached
+            return self.epwReader.readColumns(epw_file, fieldIndices)
+        
+        info = self.validInfo(epw_file)
+        if info is not None:
+            try:
+                if info.get("touched"):
+                    # same content with a new modified time. rewrite the cache with the new time
+                    header, columns = self.loadColumns(epw_file, info)
+                    self.save(epw_file, header, columns)
+                    info = self.validInfo(epw_file)
+                return self.loadColumns(epw_file, info, fieldIndices)
+            except: pass
+        
+        # parse all the numerical fields so the cache can be used for any request later
+        numFields = [fieldIndex for fieldIndex in range(len(self.epwReader.fields)) \
+                     if fieldIndex != self.epwReader.flagsField]
+        header, columns = self.epwReader.readColumns(epw_file, numFields)
+        try: self.save(epw_file, header, columns)
+        except Exception, e:
+            # cache is optional. just let the user know
+            print "Failed to write the epw cache: " + `e`
+        
+        if fieldIndices is not None:
+            columns = [column if fieldIndex in fieldIndices else None \
+                       for fieldIndex, column in enumerate(columns)]
+        return header, columns
+
+
+class EPWFile(object):
+    """
+    Lazy access to weather data of an epw file.
+    The header is parsed once and each column is decoded the first time it is requested.
+    Several fields that are requested together are read in a single scan.
+    
+    Usage:
+        epw = EPWFile(epw_file)
+        dbTemp, RH = epw.getFields(['Dry Bulb Temperature', 'Relative Humidity'])
+    """
+    def __init__(self, epw_file, useCache = True):
+        self.epw_file = epw_file
+        self.useCache = useCache
+        self.epwReader = EPWReader()
+        if useCache:
+            self.header = EPWCache().readHeader(epw_file)
+        else:
+            with open(epw_file, "r") as epwfile:
+                self.header = [epwfile.readline() for lineCount in range(8)]
+        self.location = Preparation().epwLocationFromHeader(self.header[0])
+        self.columns = [None] * len(self.epwReader.fields)
+    
+    @property
+    def locName(self):
+        return self.location[0]
+    
+    def getFields(self, fieldNames):
+        """Return the columns for a list of field names or indices"""
+        fieldIndices = [self.epwReader.fieldIndex(fieldName) for fieldName in fieldNames]
+        newIndices = [fieldIndex for fieldIndex in set(fieldIndices) if self.columns[fieldIndex] is None]
+        
+        if newIndices:
+            if self.useCache: header, columns = EPWCache().readColumns(self.epw_file, newIndices)
+            else: header, columns = self.epwReader.readColumns(self.epw_file, newIndices)
+            for fieldIndex in newIndices:
+                self.columns[fieldIndex] = columns[fieldIndex]
+        
+        return [self.columns[fieldIndex] for fieldIndex in fieldIndices]
+    
+    def getField(self, fieldName):
+        return self.getFields([fieldName])[0]
+    
+    def legacyLists(self, legacyIndices = None):
+        """
+        Return header-prefixed lists in the same order as Preparation.epwDataReader.
+        Only the lists in legacyIndices are read and the rest will be None.
+        """
+        if legacyIndices is None: legacyIndices = range(len(self.epwReader.legacyFields))
+        self.getFields([self.epwReader.legacyFields[legacyIndex][0] for legacyIndex in legacyIndices])
+        return self.epwReader.toLegacyLists(self.columns, self.locName, legacyIndices)
+
+
+class EPWCollection(object):
+    """
+    Import a list or a folder of epw files at once.
+    Files are imported in parallel and location, hourly data and ground temperatures of
+    each file come out of a single read. Results are indexed by location name.
+    
+    Usage:
+        epwCollection = EPWCollection("c:\\ladybug\\weatherFiles")
+        for locName in epwCollection.locNames:
+            dbTemp = epwCollection.getField(locName, 'Dry Bulb Temperature')
+    """
+    def __init__(self, epwFiles, parallel = True, useCache = True):
+        if isinstance(epwFiles, basestring):
+            if os.path.isdir(epwFiles):
+                epwFiles = [os.path.join(epwFiles, f) for f in sorted(os.listdir(epwFiles)) \
+                            if f.lower().endswith(".epw")]
+            else:
+                epwFiles = [epwFiles]
+        self.epwFiles = list(epwFiles)
+        self.useCache = useCache
+        self.data = {}
+        self.locNames = []
+        self.failedFiles = []
+        self.importFiles(parallel)
+    
+    def importFile(self, epw_file):
+        """Read an epw file once and return location, ground temperatures and data columns"""
+        if self.useCache:
+            header, columns = EPWCache().readColumns(epw_file)
+        else:
+            epwReader = EPWReader()
+            header, columns = epwReader.readColumns(epw_file, [fieldIndex for fieldIndex in range(len(epwReader.fields)) \
+                                                               if fieldIndex != epwReader.flagsField])
+        
+        lb_preparation = Preparation()
+        location = lb_preparation.epwLocationFromHeader(header[0])
+        try: groundTemperatures = lb_preparation.groundTempDataFromHeader(header[3], location[0])
+        except: groundTemperatures = []
+        
+        return {"epwFile": epw_file,
+                "location": location,
+                "groundTemperatures": groundTemperatures,
+                "columns": columns}
+    
+    def importFiles(self, parallel = True):
+        results = [None] * len(self.epwFiles)
+        
+        def importFileByIndex(i):
+            try: results[i] = self.importFile(self.epwFiles[i])
+            except Exception, e: results[i] = e
+        
+        if parallel:
+            tasks.Parallel.ForEach(range(len(self.epwFiles)), importFileByIndex)
+        else:
+            for i in range(len(self.epwFiles)): importFileByIndex(i)
+        
+        for epw_file, result in zip(self.epwFiles, results):
+            if not isinstance(result, dict):
+                self.failedFiles.append((epw_file, `result`))
+                continue
+            # add the file number to locations with the same name
+            locName = result["location"][0]
+            count = 2
+            while locName in self.data:
+                locName = result["location"][0] + "_" + `count`
+                count += 1
+            self.data[locName] = result
+            self.locNames.append(locName)
+    
+    def __len__(self):
+        return len(self.locNames)
+    
+    def __getitem__(self, locName):
+        return self.data[locName]
+    
+    def getField(self, locName, fieldName):
+        return self.data[locName]["columns"][EPWReader().fieldIndex(fieldName)]
+    
+    def legacyLists(self, locName):
+        """Return the lists of Preparation.epwDataReader for a location"""
+        return EPWReader().toLegacyLists(self.data[locName]["columns"], locName)
+
+
+class LBHeader(object):
+    """
+    Header of Ladybug data lists
+    key, location, data type, units, frequency, starts at and ends at
+    """
+    def __init__(self, location = 'somewhere', dataType = 'someData', units = 'someUnits', \
+                 frequency = 'someTimeStep', startsAt = (1, 1, 1), endsAt = (12, 31, 24), key = None):
+        if key is None: key = Preparation.strToBeFound
+        self.key = key
+        self.location = location
+        self.dataType = dataType
+        self.units = units
+        self.frequency = frequency
+        self.startsAt = startsAt
+        self.endsAt = endsAt
+    
+    @classmethod
+    def fromList(cls, headerList):
+        key, location, dataType, units, frequency, startsAt, endsAt = headerList[:7]
+        return cls(location, dataType, units, frequency, startsAt, endsAt, key)
+    
+    def toList(self):
+        return [self.key, self.location, self.dataType, self.units, self.frequency, self.startsAt, self.endsAt]
+    
+    def __repr__(self):
+        return "%s: %s (%s) %s - %s" % (self.location, self.dataType, self.units, `self.startsAt`, `self.endsAt`)
+
+
+class DataCollection(object):
+    """
+    A header and an array('d') of values that can replace the header-prefixed lists.
+    Slicing returns a view to the same buffer so values are not copied until they are needed.
+    Collections can be converted to and from the legacy lists without losing any data.
+    
+    Usage:
+        dbTemp = DataCollection.fromList(dryBulbTemperature)[0]
+        january = dbTemp[:744]
+        dryBulbTemperature = dbTemp.toList()
+    """
+    def __init__(self, values = None, header = None, start = 0, stop = None, hasHeader = True):
+        if values is None: values = array('d')
+        elif not isinstance(values, array): values = array('d', values)
+        if header is None: header = LBHeader()
+        if stop is None: stop = len(values)
+        self.buffer = values
+        self.header = header
+        self.start = start
+        self.stop = stop
+        self.hasHeader = hasHeader
+    
+    @classmethod
+    def fromList(cls, legacyList, key = None):
+        """Return a list of data collections for a header-prefixed list of one or several data series"""
+        if key is None: key = Preparation.strToBeFound
+        indexList, listInfo = Preparation().separateList(legacyList, key)
+        dataCollections = []
+        for i in range(len(indexList)-1):
+            values = array('d', [float(x) for x in legacyList[indexList[i]+7:indexList[i+1]]])
+            dataCollections.append(cls(values, LBHeader.fromList(listInfo[i]), hasHeader = indexList[i] >= 0))
+        return dataCollections
+    
+    def toList(self):
+        """Return the legacy list of this collection"""
+        values = self.buffer[self.start:self.stop].tolist()
+        if not self.hasHeader: return values
+        return self.header.toList() + values
+    
+    def toArray(self):
+        """Return a copy of values as an array('d')"""
+        if self.start == 0 and self.stop == len(self.buffer): return array('d', self.buffer)
+        return self.buffer[self.start:self.stop]
+    
+    def __len__(self):
+        return self.stop - self.start
+    
+    def __iter__(self):
+        buffer = self.buffer
+        for i in xrange(self.start, self.stop):
+            yield buffer[i]
+    
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                # a view to the same buffer
+                return DataCollection(self.buffer, self.header, self.start + start, self.start + max(start, stop), self.hasHeader)
+            # indices of a reversed slice can be -1 so they can't be shifted by self.start
+            return DataCollection(self.buffer[self.start:self.stop][key], self.header, hasHeader = self.hasHeader)
+        
+        if key < 0: key += len(self)
+        if not 0 <= key < len(self): raise IndexError("DataCollection index out of range")
+        return self.buffer[self.start + key]
+    
+    def __repr__(self):
+        return "DataCollection: %s [%d values]" % (`self.header`, len(self))
+
+
+class DataAggregation(object):
+    """
+    Daily, weekly and monthly statistics of hourly data for an analysis period.
+    Selected hours are reshaped to one row for each day once and all the statistics are
+    calculated from the rows. Weeks are every 7 days from the start of the analysis period
+    and months are the days of the same month in a row so periods that wrap around the end
+    of the year are supported.
+    
+    Usage:
+        lb_aggregation = sc.sticky["ladybug_DataAggregation"]()
+        results = lb_aggregation.aggregate(values, analysisPeriod)
+        dailyMax = results["daily"]["max"]
+        avrMonthlyPerHour = results["monthlyPerHour"]["mean"]
+    """
+    timePeriods = ("daily", "weekly", "monthly")
+    statistics = ("mean", "min", "max", "sum")
+    
+    # text that is used in the header of the results
+    statisticNames = {"mean": "averaged", "min": "minimum", "max": "maximum", "sum": "total"}
+    
+    def reshape(self, values, analysisPeriod):
+        """Return day of the year (1-365) and the values of the selected hours for each day of the analysis period"""
+        lb_preparation = Preparation()
+        stMonth, stDay, stHour, endMonth, endDay, endHour = lb_preparation.readRunPeriod(analysisPeriod, False)
+        indices = lb_preparation.analysisPeriodIndices(analysisPeriod)
+        hoursPerDay = endHour - stHour + 1
+        if hoursPerDay < 1 or not indices: return [], []
+        
+        doys = [indices[i] // 24 + 1 for i in xrange(0, len(indices), hoursPerDay)]
+        selValues = [float(values[i]) for i in indices]
+        rows = [selValues[i:i + hoursPerDay] for i in xrange(0, len(selValues), hoursPerDay)]
+        return doys, rows
+    
+    def groupRows(self, doys, timePeriod):
+        """Return start and end of the rows for each day, week or month"""
+        if timePeriod == "daily":
+            return [(i, i + 1) for i in range(len(doys))]
+        elif timePeriod == "weekly":
+            return [(i, min(i + 7, len(doys))) for i in range(0, len(doys), 7)]
+        elif timePeriod == "monthly":
+            dayMonths = Preparation().calendarTable()["dayMonths"]
+            groups = []
+            for i, doy in enumerate(doys):
+                if i == 0 or dayMonths[doy] != dayMonths[doys[i-1]] or doy != doys[i-1] + 1:
+                    groups.append([i, i + 1])
+                else: groups[-1][1] = i + 1
+            return [tuple(group) for group in groups]
+        raise ValueError("timePeriod should be daily, weekly or monthly not " + `timePeriod`)
+    
+    def aggregate(self, values, analysisPeriod = None, statistics = None):
+        """
+        Calculate the statistics for an hourly list of 8760 values.
+        Returns a dictionary of "daily", "weekly", "monthly", "dailyPerHour", "weeklyPerHour" and
+        "monthlyPerHour" results where each one is a dictionary of "mean", "min", "max" and "sum" lists.
+        PerHour results have one value for each selected hour of the day for each time period.
+        """
+        if statistics is None: statistics = self.statistics
+        doys, rows = self.reshape(values, analysisPeriod)
+        hoursPerDay = len(rows[0]) if rows else 0
+        
+        # statistics of each day
+        dailyStatistics = {}
+        if "sum" in statistics or "mean" in statistics: dailyStatistics["sum"] = [sum(row) for row in rows]
+        if "min" in statistics: dailyStatistics["min"] = [min(row) for row in rows]
+        if "max" in statistics: dailyStatistics["max"] = [max(row) for row in rows]
+        
+        functions = {"sum": sum, "min": min, "max": max}
+        results = {}
+        for timePeriod in self.timePeriods:
+            groups = self.groupRows(doys, timePeriod)
+            
+            results[timePeriod] = {}
+            results[timePeriod + "PerHour"] = {}
+            for statistic in statistics:
+                if statistic == "mean":
+                    results[timePeriod]["mean"] = [sum(dailyStatistics["sum"][st:end]) / ((end - st) * hoursPerDay) for st, end in groups]
+                else:
+                    results[timePeriod][statistic] = [functions[statistic](dailyStatistics[statistic][st:end]) for st, end in groups]
+                
+                if timePeriod == "daily":
+                    # values of each hour of the day
+                    results["dailyPerHour"][statistic] = list(chain.from_iterable(rows))
+                elif statistic == "mean":
+                    results[timePeriod + "PerHour"]["mean"] = [sum(hourValues) / len(hourValues) \
+                        for st, end in groups for hourValues in zip(*rows[st:end])]
+                else:
+                    results[timePeriod + "PerHour"][statistic] = [functions[statistic](hourValues) \
+                        for st, end in groups for hourValues in zip(*rows[st:end])]
+        
+        return results
+    
+    def aggregateData(self, hourlyData, analysisPeriod = None, statistic = "mean"):
+        """
+        Aggregate all the lists of ladybug hourly data.
+        Returns a dictionary of ladybug lists with header for the same keys as aggregate.
+        """
+        if statistic not in self.statistics:
+            raise ValueError("statistic should be one of " + `self.statistics` + " not " + `statistic`)
+        
+        lb_preparation = Preparation()
+        stMonth, stDay, stHour, endMonth, endDay, endHour = lb_preparation.readRunPeriod(analysisPeriod, False)
+        
+        aggregatedData = {}
+        for dataCollection in DataCollection.fromList(hourlyData):
+            results = self.aggregate(dataCollection.toArray(), analysisPeriod, [statistic])
+            for key in results.keys():
+                if key.endswith("PerHour"):
+                    frequency = key[:-len("PerHour")].capitalize() + "-> " + self.statisticNames[statistic] + " for each hour"
+                else:
+                    frequency = key.capitalize() + "-> " + self.statisticNames[statistic]
+                
+                header = dataCollection.header.toList()[:4] + [frequency, (stMonth, stDay, stHour), (endMonth, endDay, endHour)]
+                aggregatedData.setdefault(key, []).extend(header + results[key][statistic])
+        
+        return aggregatedData
+
+
+class DegreeDays(object):
+    """
+    Cooling and heating degree-hours and degree-days for several base temperatures (set points) at once.
+    Temperatures of each day are sorted once with their running sums so degree-hours of each
+    set point are found with a binary search instead of checking all the hours again for each set point.
+    Set points are used during the working hours and set-backs are used for the rest of the day.
+    
+    Usage:
+        lb_degreeDays = sc.sticky["ladybug_DegreeDays"]()
+        results = lb_degreeDays.degreeHours(hourlyTemperature, coolingSetPoints = range(20, 30))
+        annualCDH = results["cooling"]["annual"] # one value for each set point
+    """
+    def workingHours(self, startOfWorkingHours = 0, endOfWorkingHours = 23):
+        """Return working hours and the rest of the hours of the day (0-23)"""
+        startOfWorkingHours = int(startOfWorkingHours); endOfWorkingHours = int(endOfWorkingHours)
+        if startOfWorkingHours <= endOfWorkingHours:
+            working = range(startOfWorkingHours, endOfWorkingHours + 1)
+        else:
+            # working hours pass midnight
+            working = range(startOfWorkingHours, 24) + range(0, endOfWorkingHours + 1)
+        return working, [hour for hour in range(24) if hour not in working]
+    
+    def sortedDays(self, hourlyTemperature, hours):
+        """Sorted temperatures of the hours for each day with the running sums"""
+        days = []
+        for day in xrange(len(hourlyTemperature) // 24):
+            temperatures = sorted([float(hourlyTemperature[day * 24 + hour]) for hour in hours])
+            runningSums = [0]
+            for temperature in temperatures: runningSums.append(runningSums[-1] + temperature)
+            days.append((temperatures, runningSums))
+        return days
+    
+    def sumDegreeHours(self, temperatures, runningSums, setPoint, cooling = True):
+        """Degree-hours of sorted temperatures of a day for a set point"""
+        if cooling:
+            i = bisect_right(temperatures, setPoint)
+            return (runningSums[-1] - runningSums[i]) - (len(temperatures) - i) * setPoint
+        else:
+            i = bisect_left(temperatures, setPoint)
+            return i * setPoint - runningSums[i]
+    
+    def monthlyAndAnnual(self, dailyValues):
+        numOfDays = Preparation().numOfDays
+        monthly = [sum(dailyValues[numOfDays[month]:numOfDays[month + 1]]) for month in range(12)]
+        return monthly, sum(monthly)
+    
+    def degreeHours(self, hourlyTemperature, coolingSetPoints = [], heatingSetPoints = [], coolingSetBacks = None, heatingSetBacks = None, \
+                    startOfWorkingHours = 0, endOfWorkingHours = 23, hourly = True):
+        """
+        Calculate degree-hours for lists of cooling and heating set points.
+        Set-backs should have the same length as set points and are used out of the working hours (0-23).
+        Returns a dictionary with "cooling" and "heating" keys where each one is a dictionary of
+        "hourly", "daily", "monthly" and "annual" results with one item for each set point.
+        Set hourly to False if you don't need the hourly results.
+        """
+        if coolingSetBacks is None: coolingSetBacks = coolingSetPoints
+        if heatingSetBacks is None: heatingSetBacks = heatingSetPoints
+        if len(coolingSetBacks) != len(coolingSetPoints) or len(heatingSetBacks) != len(heatingSetPoints):
+            raise ValueError("Number of set-backs should be the same as number of set points.")
+        
+        working, offHours = self.workingHours(startOfWorkingHours, endOfWorkingHours)
+        workingDays = self.sortedDays(hourlyTemperature, working)
+        offDays = self.sortedDays(hourlyTemperature, offHours)
+        temperatures = [float(temperature) for temperature in hourlyTemperature]
+        workingHour = [hour in working for hour in range(24)]
+        
+        results = {}
+        for key, cooling, setPoints, setBacks in (("cooling", True, coolingSetPoints, coolingSetBacks), \
+                                                  ("heating", False, heatingSetPoints, heatingSetBacks)):
+            results[key] = {"hourly": [], "daily": [], "monthly": [], "annual": []}
+            for setPoint, setBack in zip(setPoints, setBacks):
+                setPoint = float(setPoint); setBack = float(setBack)
+                daily = [self.sumDegreeHours(workingDay[0], workingDay[1], setPoint, cooling) + \
+                         self.sumDegreeHours(offDay[0], offDay[1], setBack, cooling) \
+                         for workingDay, offDay in zip(workingDays, offDays)]
+                monthly, annual = self.monthlyAndAnnual(daily)
+                
+                if hourly:
+                    hourlySetPoints = [setPoint if isWorking else setBack for isWorking in workingHour]
+                    if cooling:
+                        hourlyValues = [temperature - hourlySetPoints[hour % 24] if temperature > hourlySetPoints[hour % 24] else 0 \
+                                        for hour, temperature in enumerate(temperatures)]
+                    else:
+                        hourlyValues = [hourlySetPoints[hour % 24] - temperature if temperature < hourlySetPoints[hour % 24] else 0 \
+                                        for hour, temperature in enumerate(temperatures)]
+                    results[key]["hourly"].append(hourlyValues)
+                
+                results[key]["daily"].append(daily)
+                results[key]["monthly"].append(monthly)
+                results[key]["annual"].append(annual)
+        
+        return results
+    
+    def degreeDays(self, hourlyTemperature, coolingSetPoints = [], heatingSetPoints = [], useDailyAvrMethod = False):
+        """
+        Calculate degree-days for lists of cooling and heating set points.
+        By default degree-days are calculated from minimum and maximum temperature of each day
+        (http://www.vesma.com/ddd/ddcalcs.htm). Set useDailyAvrMethod to True to use the average temperature of each day.
+        Returns a dictionary with "cooling" and "heating" keys where each one is a dictionary of
+        "daily", "monthly" and "annual" results with one item for each set point.
+        """
+        temperatures = [float(temperature) for temperature in hourlyTemperature]
+        days = [temperatures[day * 24:(day + 1) * 24] for day in xrange(len(temperatures) // 24)]
+        minTs = [min(dayTemps) for dayTemps in days]
+        maxTs = [max(dayTemps) for dayTemps in days]
+        avrTs = [sum(dayTemps)/len(dayTemps) for dayTemps in days]
+        
+        def coolingDegDay(setPoint, minT, maxT, avrT):
+            if useDailyAvrMethod: return avrT - setPoint if setPoint < avrT else 0
+            if maxT < setPoint: return 0
+            elif (maxT + minT)/2 < setPoint: return (maxT-setPoint)/4
+            elif minT <= setPoint: return (maxT-setPoint)/2 - (setPoint-minT)/4
+            else: return (maxT + minT)/2 - setPoint
+        
+        def heatingDegDay(setPoint, minT, maxT, avrT):
+            if useDailyAvrMethod: return setPoint - avrT if avrT < setPoint else 0
+            if minT > setPoint: return 0
+            elif (maxT + minT)/2 > setPoint: return (setPoint-minT)/4
+            elif maxT >= setPoint: return (setPoint-minT)/2-(maxT-setPoint)/4
+            else: return setPoint-(maxT+minT)/2
+        
+        results = {}
+        for key, degreeDay, setPoints in (("cooling", coolingDegDay, coolingSetPoints), ("heating", heatingDegDay, heatingSetPoints)):
+            results[key] = {"daily": [], "monthly": [], "annual": []}
+            for setPoint in setPoints:
+                setPoint = float(setPoint)
+                daily = [degreeDay(setPoint, minT, maxT, avrT) for minT, maxT, avrT in zip(minTs, maxTs, avrTs)]
+                monthly, annual = self.monthlyAndAnnual(daily)
+                results[key]["daily"].append(daily)
+                results[key]["monthly"].append(monthly)
+                results[key]["annual"].append(annual)
+        
+        return results
+
+
+class RunningStatistics(object):
+    """
+    Count, mean, variance, minimum and maximum of a stream of values in one pass (Welford's method).
+    Statistics of separate streams can be merged so chunks can be calculated separately.
+    """
+    def __init__(self, values = None):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        if values is not None: self.update(values)
+    
+    def update(self, values):
+        count, mean, m2 = self.count, self.mean, self.m2
+        minV, maxV = self.min, self.max
+        for value in values:
+            value = float(value)
+            count += 1
+            delta = value - mean
+            mean += delta / count
+            m2 += delta * (value - mean)
+            if minV is None or value < minV: minV = value
+            if maxV is None or value > maxV: maxV = value
+        self.count, self.mean, self.m2 = count, mean, m2
+        self.min, self.max = minV, maxV
+        return self
+    
+    def merge(self, other):
+        """Add the statistics of another stream to this one"""
+        if other.count == 0: return self
+        if self.count == 0:
+            self.count, self.mean, self.m2, self.min, self.max = other.count, other.mean, other.m2, other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+    
+    @property
+    def variance(self):
+        """Population variance"""
+        if self.count == 0: return None
+        return self.m2 / self.count
+    
+    @property
+    def standardDeviation(self):
+        if self.count == 0: return None
+        return math.sqrt(self.variance)
+    
+    def __repr__(self):
+        return "RunningStatistics: count = %d, mean = %s, std = %s, min = %s, max = %s" % \
+               (self.count, `self.mean`, `self.standardDeviation`, `self.min`, `self.max`)
+
+
+class TDigest(object):
+    """
+    Approximate quantiles of a stream of values with a merging t-digest (Dunning).
+    Values are kept as a limited number of weighted centroids which are small near the
+    tails so extreme percentiles such as 0.4% and 99.6% stay accurate.
+    Memory depends on the compression and not on the number of values.
+    
+    Usage:
+        digest = TDigest()
+        for startRow, columns in EPWReader().iterChunks(epw_file, [6]): digest.update(columns[6])
+        print digest.quantile(0.996)
+    """
+    def __init__(self, compression = 200, values = None):
+        self.compression = compression
+        self.bufferSize = 5 * compression
+        self.means = []
+        self.weights = []
+        self.buffer = []
+        self.count = 0
+        self.min = None
+        self.max = None
+        if values is not None: self.update(values)
+    
+    def k(self, q):
+        """scale function that makes the centroids smaller at the tails"""
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+    
+    def update(self, values, weight = 1):
+        for value in values:
+            value = float(value)
+            self.buffer.append((value, weight))
+            self.count += weight
+            if self.min is None or value < self.min: self.min = value
+            if self.max is None or value > self.max: self.max = value
+            if len(self.buffer) >= self.bufferSize: self.compress()
+        return self
+    
+    def merge(self, other):
+        """Add the centroids of another digest to this one"""
+        other.compress()
+        for mean, weight in zip(other.means, other.weights):
+            self.buffer.append((mean, weight))
+        self.count += other.count
+        if other.min is not None:
+            if self.min is None or other.min < self.min: self.min = other.min
+            if self.max is None or other.max > self.max: self.max = other.max
+        self.compress()
+        return self
+    
+    def compress(self):
+        """Merge the buffered values with the centroids"""
+        if not self.buffer: return
+        centroids = sorted(zip(self.means, self.weights) + self.buffer)
+        self.buffer = []
+        
+        total = float(sum([weight for mean, weight in centroids]))
+        means = []; weights = []
+        curMean, curWeight = centroids[0]
+        cumulative = 0
+        kLower = self.k(0)
+        for mean, weight in centroids[1:]:
+            if self.k(min((cumulative + curWeight + weight) / total, 1)) - kLower <= 1:
+                curMean += (mean - curMean) * weight / (curWeight + weight)
+                curWeight += weight
+            else:
+                means.append(curMean); weights.append(curWeight)
+                cumulative += curWeight
+                kLower = self.k(cumulative / total)
+                curMean, curWeight = mean, weight
+        means.append(curMean); weights.append(curWeight)
+        self.means, self.weights = means, weights
+    
+    def quantile(self, q):
+        """Approximate value for quantile q (0-1)"""
+        self.compress()
+        if not self.means: return None
+        if q <= 0: return self.min
+        if q >= 1: return self.max
+        
+        index = q * self.count
+        # position of the center of each centroid
+        cumulative = 0
+        centers = []
+        for weight in self.weights:
+            centers.append(cumulative + weight / 2.0)
+            cumulative += weight
+        
+        if index <= centers[0]:
+            return self.min + (self.means[0] - self.min) * index / centers[0]
+        if index >= centers[-1]:
+            return self.means[-1] + (self.max - self.means[-1]) * (index - centers[-1]) / (self.count - centers[-1])
+        
+        i = bisect_right(centers, index) - 1
+        return self.means[i] + (self.means[i+1] - self.means[i]) * (index - centers[i]) / (centers[i+1] - centers[i])
+
+
+class Histogram(object):
+    """
+    Fixed-bin histogram that can be filled with a stream of values.
+    Values out of the range are counted in below and above. The upper bound is included in the last bin.
+    """
+    def __init__(self, lowerBound, upperBound, numOfBins = 10, values = None):
+        if upperBound <= lowerBound: raise ValueError("upperBound should be larger than lowerBound.")
+        self.lowerBound = float(lowerBound)
+        self.upperBound = float(upperBound)
+        self.numOfBins = int(numOfBins)
+        self.binWidth = (self.upperBound - self.lowerBound) / self.numOfBins
+        self.counts = [0] * self.numOfBins
+        self.below = 0
+        self.above = 0
+        if values is not None: self.update(values)
+    
+    def update(self, values):
+        counts = self.counts
+        lowerBound, upperBound, binWidth, numOfBins = self.lowerBound, self.upperBound, self.binWidth, self.numOfBins
+        for value in values:
+            if value < lowerBound: self.below += 1
+            elif value > upperBound: self.above += 1
+            else: counts[min(int((value - lowerBound) / binWidth), numOfBins - 1)] += 1
+        return self
+    
+    def merge(self, other):
+        if (other.lowerBound, other.upperBound, other.numOfBins) != (self.lowerBound, self.upperBound, self.numOfBins):
+            raise ValueError("Only histograms with the same bins can be merged.")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.below += other.below
+        self.above += other.above
+        return self
+    
+    @property
+    def binEdges(self):
+        return [self.lowerBound + i * self.binWidth for i in range(self.numOfBins)] + [self.upperBound]
+    
+    def percentages(self):
+        """Percentage of all the values in each bin"""
+        total = sum(self.counts) + self.below + self.above
+        if total == 0: return [0] * self.numOfBins
+        return [100.0 * count / total for count in self.counts]
+
+
+class Statistics(object):
+    """
+    Percentiles, histograms and design conditions of hourly data.
+    Exact percentiles sort a copy of the values. Set exact to False for long multi-year or
+    sub-hourly series to use a t-digest that reads the values only once without a sorted copy.
+    
+    Usage:
+        lb_statistics = sc.sticky["ladybug_Statistics"]()
+        summary = lb_statistics.describe(dryBulbTemperature[7:])
+        heating99_6 = summary["percentiles"][0.4]
+    """
+    # percentiles of ASHRAE design conditions
+    designPercentiles = (0.4, 1, 2, 50, 98, 99, 99.6)
+    
+    def percentile(self, sortedValues, percent):
+        """Percentile of sorted values with linear interpolation between the closest ranks"""
+        if not sortedValues: return None
+        position = (len(sortedValues) - 1) * percent / 100.0
+        lower = int(math.floor(position))
+        upper = min(lower + 1, len(sortedValues) - 1)
+        return sortedValues[lower] + (sortedValues[upper] - sortedValues[lower]) * (position - lower)
+    
+    def percentiles(self, values, percentiles = designPercentiles, exact = True, compression = 200):
+        """Return a dictionary of percentile (0-100) and value"""
+        if exact:
+            sortedValues = sorted([float(value) for value in values])
+            return dict([(percent, self.percentile(sortedValues, percent)) for percent in percentiles])
+        digest = TDigest(compression, values)
+        return dict([(percent, digest.quantile(percent / 100.0)) for percent in percentiles])
+    
+    def describe(self, values, percentiles = designPercentiles, exact = True, histogramRange = None, numOfBins = 10):
+        """
+        Summary of the values in a dictionary of "count", "mean", "standardDeviation", "min", "max",
+        "percentiles" and "histogram". Values can be any iterable and are read only once when exact is False.
+        If histogramRange (lowerBound, upperBound) is not provided the histogram is between min and max
+        which needs the values to be kept in memory.
+        """
+        running = RunningStatistics()
+        histogram = None
+        if exact or histogramRange is None:
+            values = [float(value) for value in values]
+            running.update(values)
+            percentileValues = self.percentiles(values, percentiles, exact)
+            if histogramRange is None and running.count and running.max > running.min:
+                histogramRange = running.min, running.max
+            if histogramRange is not None:
+                histogram = Histogram(histogramRange[0], histogramRange[1], numOfBins, values)
+        else:
+            digest = TDigest()
+            histogram = Histogram(histogramRange[0], histogramRange[1], numOfBins)
+            # read the values only once
+            for chunk in self.chunks(values):
+                running.update(chunk)
+                digest.update(chunk)
+                histogram.update(chunk)
+            percentileValues = dict([(percent, digest.quantile(percent / 100.0)) for percent in percentiles])
+        
+        return self.summary(running, percentileValues, histogram)
+    
+    def summary(self, running, percentileValues, histogram):
+        return {"count": running.count, "mean": running.mean, "standardDeviation": running.standardDeviation,
+                "min": running.min, "max": running.max, "percentiles": percentileValues, "histogram": histogram}
+    
+    def chunks(self, values, chunkSize = 8760):
+        """Split an iterable to lists of chunkSize values"""
+        values = iter(values)
+        while True:
+            chunk = list(islice(values, chunkSize))
+            if not chunk: break
+            yield chunk
+    
+    def describeEPWField(self, epw_file, fieldIndex = 6, percentiles = designPercentiles, histogramRange = None, numOfBins = 10):
+        """
+        Summary of one field of an epw file that is read chunk by chunk.
+        Works for multi-year and sub-hourly files with constant memory. See describe for the results.
+        """
+        running = RunningStatistics()
+        digest = TDigest()
+        histogram = None
+        if histogramRange is not None: histogram = Histogram(histogramRange[0], histogramRange[1], numOfBins)
+        
+        for startRow, columns in EPWReader().iterChunks(epw_file, [fieldIndex]):
+            running.update(columns[fieldIndex])
+            digest.update(columns[fieldIndex])
+            if histogram is not None: histogram.update(columns[fieldIndex])
+        
+        percentileValues = dict([(percent, digest.quantile(percent / 100.0)) for percent in percentiles])
+        return self.summary(running, percentileValues, histogram)
+    
+    def designConditions(self, dryBulbTemperature, exact = True):
+        """
+        Heating and cooling design dry bulb temperatures for an annual hourly list of dry bulb temperature.
+        Heating 99.6% and 99% are exceeded for 99.6% and 99% of the hours and
+        cooling 0.4%, 1% and 2% are exceeded for 0.4%, 1% and 2% of the hours.
+        """
+        values = self.percentiles(dryBulbTemperature, (0.4, 1, 98, 99, 99.6), exact)
+        return {"heating99.6": values[0.4], "heating99": values[1],
+                "cooling0.4": values[99.6], "cooling1": values[99], "cooling2": values[98]}
+
+
+class ConditionalStatement(object):
+    """
+    Conditional statements such as "a>25 and b<80" to select hours of the input data.
+    Letters a to z refer to the data lists in the order that they are connected.
+    The statement is checked and compiled once and is evaluated for all the hours together
+    instead of running exec for each hour. Evaluated patterns are cached for the data so the
+    statement is not evaluated again when only the other inputs of the component change.
+    
+    Usage:
+        lb_conditionalStatement = sc.sticky["ladybug_ConditionalStatement"]()
+        titleStatement, patternList = lb_conditionalStatement.checkConditionalStatement(annualHourlyData, conditionalStatement)
+    """
+    letters = [chr(i) for i in xrange(ord('a'), ord('z')+1)]
+    
+    # compiled statements
+    compiledStatements = {}
+    compiledStatementsSize = 64
+    
+    # evaluated patterns keyed by the statement and the data (least recently used first)
+    patternCache = OrderedDict()
+    patternCacheSize = 16
+    
+    def normalizeStatement(self, conditionalStatement):
+        """remove extra spaces and line breaks from the statement"""
+        return " ".join(conditionalStatement.strip().split())
+    
+    def compileStatement(self, conditionalStatement):
+        """
+        Compile the statement and return the code to evaluate it and the number of the lists in the statement.
+        Only letters a to z, numbers and operators are accepted.
+        """
+        statement = self.normalizeStatement(conditionalStatement)
+        if statement in self.compiledStatements: return self.compiledStatements[statement]
+        
+        try: code = compile(statement, '<conditional statement>', 'eval')
+        except SyntaxError, e:
+            raise ValueError('There is an error in the conditional statement:\n' + `e`)
+        
+        for const in code.co_consts:
+            if type(const) == type(code):
+                raise ValueError('Functions and loops are not allowed in the conditional statement!')
+        
+        for name in code.co_names:
+            if name not in self.letters:
+                raise ValueError('"' + name + '" is not a valid name in the conditional statement!\n' + \
+                                 'Use letters a to z to refer to the input lists. Please fix this issue and try again.')
+        
+        listNum = sorted([self.letters.index(name) for name in set(code.co_names)])
+        
+        # evaluate the statement for all the hours in one list comprehension. values are kept as
+        # they are (e.g. "a and b" returns b) the same as evaluating the statement for each hour
+        if listNum:
+            names = ", ".join([self.letters[num] for num in listNum])
+            source = '[(' + statement + ') for (' + names + ',) in columns]'
+        else:
+            source = '[(' + statement + ')] * len(columns)'
+        code = compile(source, '<conditional statement>', 'eval')
+        
+        if len(self.compiledStatements) >= self.compiledStatementsSize: self.compiledStatements.clear()
+        self.compiledStatements[statement] = code, listNum
+        return code, listNum
+    
+    def evaluate(self, code, listNum, selList, numOfHours = 8760):
+        """
+        Evaluate a compiled statement over the first numOfHours values of the lists and return the pattern.
+        Pattern is as long as the shortest list that is used in the statement (numOfHours at most).
+        """
+        if listNum: columns = zip(*[selList[num][:numOfHours] for num in listNum])
+        else: columns = range(numOfHours)
+        return eval(code, {'__builtins__': {'len': len}}, {'columns': columns})
+    
+    def dataFingerprint(self, selList, listNum, listInfo):
+        """md5 of the headers and the values of the lists that are used in the statement"""
+        md5 = hashlib.md5(`[len(values) for values in selList]`)
+        for num in listNum:
+            md5.update(`listInfo[num]`)
+            try: md5.update(array('d', selList[num]).tostring())
+            except TypeError: md5.update(`selList[num]`)
+        return md5.hexdigest()
+    
+    def titleStatement(self, conditionalStatement, listNum, listInfo):
+        """Replace the letters in the statement with the name of the data to make the title"""
+        titleStatement = '...                         ...                         ...\n' +\
+                         'Conditional Selection Applied:\n'
+        
+        for statemntPart in conditionalStatement.split(' '):
+            statementCopy = statemntPart
+            
+            if statemntPart!='and' and statemntPart!='or':
+                for num in listNum:
+                    statementCopy = statementCopy.replace(self.letters[num], listInfo[num][2], 20000)
+                    if statementCopy.find(self.letters[num])!=-1: break
+                    
+                titleStatement = titleStatement + ' ' + statementCopy
+            else:
+                
+                titleStatement = titleStatement + '\n' + statementCopy
+        
+        return titleStatement
+    
+    def checkConditionalStatement(self, annualHourlyData, conditionalStatement, annualData = True):
+        """
+        Check the statement against the data and return the title and the pattern for each hour.
+        Values of the pattern are the result of the statement for each hour (True/False for comparisons).
+        The pattern is for the first 8760 values of the data and is shorter if the lists used in the
+        statement are shorter. If annualData is False lists can have any period but all of them should
+        have the same period.
+        A ValueError with the warning message is raised if the statement or the data is not valid or
+        if the statement fails for any of the hours.
+        """
+        lb_preparation = Preparation()
+        indexList, listInfo = lb_preparation.separateList(annualHourlyData, lb_preparation.strToBeFound)
+        
+        code, listNum = self.compileStatement(conditionalStatement)
+        
+        # check if all the conditions are actually applicable
+        for num in listNum:
+            if num>len(listInfo) - 1:
+                raise ValueError('A conditional statement is assigned for list number ' + `num + 1` + '  which is not existed!\n' + \
+                                 'Please remove the letter "' + self.letters[num] + '" from the statements to solve this problem!\n' + \
+                                 'Number of lists are ' + `len(listInfo)` + '. Please fix this issue and try again.')
+        
+        selList = []
+        for i in range(len(listInfo)):
+            selList.append(annualHourlyData[indexList[i]+7:indexList[i+1]])
+            if annualData:
+                if listInfo[i][4]!='Hourly' or listInfo[i][5]!=(1,1,1) or  listInfo[i][6]!=(12,31,24) or len(selList[i])!=8760:
+                    raise ValueError('At least one of the input data lists is not a valid ladybug hourly data! Please fix this issue and try again!\n List number = '+ `i+1`)
+            elif listInfo[i][5]!= listInfo[0][5] or  listInfo[i][6]!=listInfo[0][6]:
+                raise ValueError('Length of all the lists should be the same to apply conditional statemnets.' + \
+                                 ' Please fix this issue and try again!\nList number '+ `i+1` + ' is the one that causes the issue.')
+        
+        titleStatement = self.titleStatement(conditionalStatement, listNum, listInfo)
+        
+        # check for the pattern
+        key = self.normalizeStatement(conditionalStatement), self.dataFingerprint(selList, listNum, listInfo)
+        if key in self.patternCache:
+            # move it to the end as the most recently used
+            patternList = self.patternCache.pop(key)
+        else:
+            try: patternList = self.evaluate(code, listNum, selList)
+            except Exception, e:
+                raise ValueError('There is an error in the conditional statement:\n' + `e`)
+        
+        self.patternCache[key] = patternList
+        while len(self.patternCache) > self.patternCacheSize: self.patternCache.popitem(last = False)
+        
+        return titleStatement, list(patternList)
+    
+    def clearCache(self):
+        self.compiledStatements.clear()
+        self.patternCache.clear()
+
+
 class Sunpath(object):
     """
     The sun-path Class is a Python version of RADIANCE sun-path script by Greg Ward. RADIANCE source code can be accessed at:
@@ -1315,19 +2734,25 @@ class Sunpath(object):
         self.timeZone = timeZone
     
     #This part is written by Trygve Wastvedt (Trygve.Wastvedt@gmail.com).
-    def solInitOutput(self, month, day, hour):
-        year = 2014
-        self.time = hour
+    def getJulianDay(self, month, day, hour, year = 2014):
+        """Julian day for a month, day and hour in local standard time"""
+        time = hour
+        timeZone = self.timeZone
         
         a = 1 if (month < 3) else 0
         y = year + 4800 - a
         m = month + 12*a - 3
-        self.julianDay = day + math.floor((153*m + 2)/5) + 59
+        julianDay = day + math.floor((153*m + 2)/5) + 59
         
-        self.julianDay += (self.time - self.timeZone)/24.0  + 365*y + math.floor(y/4) \
+        julianDay += (time - timeZone)/24.0  + 365*y + math.floor(y/4) \
             - math.floor(y/100) + math.floor(y/400) - 32045.5 - 59
-        
-        julianCentury = (self.julianDay - 2451545) / 36525
+        return julianDay
+    
+    def getDeclinationEqOfTime(self, julianDay):
+        """
+        NOAA solar declination (radians) and equation of time (minutes) for a julian day.
+        """
+        julianCentury = (julianDay - 2451545) / 36525
         #degrees
         geomMeanLongSun = (280.46646 + julianCentury * (36000.76983 + julianCentury*0.0003032)) % 360
         #degrees
@@ -1354,7 +2779,7 @@ class Sunpath(object):
         sunRightAscen = math.degrees(math.atan2(math.cos(math.radians(obliqueCorr))* \
             math.sin(math.radians(sunAppLong)), math.cos(math.radians(sunAppLong))))
         #RADIANS
-        self.solDec = math.asin(math.sin(math.radians(obliqueCorr))*math.sin(math.radians(sunAppLong)))
+        solDec = math.asin(math.sin(math.radians(obliqueCorr))*math.sin(math.radians(sunAppLong)))
         
         varY = math.tan(math.radians(obliqueCorr/2))*math.tan(math.radians(obliqueCorr/2))
         #minutes
@@ -1363,20 +2788,282 @@ class Sunpath(object):
             + 4*eccentOrbit*varY*math.sin(math.radians(geomMeanAnomSun))*math.cos(2*math.radians(geomMeanLongSun)) \
             - 0.5*(varY**2)*math.sin(4*math.radians(geomMeanLongSun)) \
             - 1.25*(eccentOrbit**2)*math.sin(2*math.radians(geomMeanAnomSun)))
+        
+        return solDec, eqOfTime
+    
+    def calculateSunPosition(self, month, day, hour, year = 2014):
+        """
+        NOAA solar position for a month, day and hour (local standard time).
+        Returns julian day, declination, equation of time (minutes), solar time (hours), zenith, altitude and azimuth.
+        Angles are in radians.
+        """
+        julianDay = self.getJulianDay(month, day, hour, year)
+        return (julianDay,) + self.calculateSunPositionFromJulianDay(julianDay, hour)
+    
+    def calculateSunPositionFromJulianDay(self, julianDay, hour):
+        """
+        NOAA solar position for a julian day and the hour (local standard time) of that day.
+        Returns declination, equation of time (minutes), solar time (hours), zenith, altitude and azimuth.
+        """
+        solLat = self.solLat; s_longtitude = self.s_longtitude; timeZone = self.timeZone
+        time = hour
+        
+        solDec, eqOfTime = self.getDeclinationEqOfTime(julianDay)
+        
         #hours
-        self.solTime = ((self.time*60 + eqOfTime + 4*math.degrees(self.s_longtitude) - 60*self.timeZone) % 1440)/60
+        solTime = ((time*60 + eqOfTime + 4*math.degrees(s_longtitude) - 60*timeZone) % 1440)/60
         #degrees
-        hourAngle = (self.solTime*15 + 180) if (self.solTime*15 < 0) else (self.solTime*15 - 180)
+        hourAngle = (solTime*15 + 180) if (solTime*15 < 0) else (solTime*15 - 180)
         #RADIANS
-        self.zenith = math.acos(math.sin(self.solLat)*math.sin(self.solDec) \
-            + math.cos(self.solLat)*math.cos(self.solDec)*math.cos(math.radians(hourAngle)))
-        self.solAlt = (math.pi/2) - self.zenith
+        zenith = math.acos(math.sin(solLat)*math.sin(solDec) \
+            + math.cos(solLat)*math.cos(solDec)*math.cos(math.radians(hourAngle)))
+        solAlt = (math.pi/2) - zenith
         
-        self.solAz = ((math.acos(((math.sin(self.solLat)*math.cos(self.zenith)) \
-            - math.sin(self.solDec))/(math.cos(self.solLat)*math.sin(self.zenith))) + math.pi) % (2*math.pi)) \
+        solAz = ((math.acos(((math.sin(solLat)*math.cos(zenith)) \
+            - math.sin(solDec))/(math.cos(solLat)*math.sin(zenith))) + math.pi) % (2*math.pi)) \
             if (hourAngle > 0) else \
-                ((3*math.pi - math.acos(((math.sin(self.solLat)*math.cos(self.zenith)) \
-                - math.sin(self.solDec))/(math.cos(self.solLat)*math.sin(self.zenith)))) % (2*math.pi))
+                ((3*math.pi - math.acos(((math.sin(solLat)*math.cos(zenith)) \
+                - math.sin(solDec))/(math.cos(solLat)*math.sin(zenith)))) % (2*math.pi))
+        
+        return solDec, eqOfTime, solTime, zenith, solAlt, solAz
+    
+    def solInitOutput(self, month, day, hour):
+        self.time = hour
+        self.julianDay, self.solDec, eqOfTime, self.solTime, self.zenith, self.solAlt, self.solAz = \
+            self.calculateSunPosition(month, day, hour)
+    
+    def calculateSunPositions(self, HOYs = None, datetimes = None):
+        """
+        Sun positions for a list of HOYs (any time-step) or datetime objects in one call.
+        HOYs are converted to dates the same way as hour2Date(HOY, True) so the results are exactly
+        the same as calling solInitOutput for each hour. Sun vectors are calculated directly from the
+        angles instead of rotating Rhino points and match sunReverseVectorCalc within 1e-12.
+        Returns a dictionary of arrays: "altitude", "azimuth" and "declination" in radians,
+        "equationOfTime" in minutes, "solarTime" in hours and "vectorX", "vectorY", "vectorZ"
+        for the unit vector from the center to the sun that is rotated based on north.
+        
+        Usage:
+            lb_sunpath.initTheClass(latitude, northAngle, cenPt, scale, longitude, timeZone)
+            sunPositions = lb_sunpath.calculateSunPositions(range(1, 8761))
+            sunUpHours = [HOY for HOY, alt in zip(range(1, 8761), sunPositions["altitude"]) if alt >= 0]
+        """
+        if datetimes is not None:
+            dates = [(dt.month, dt.day, dt.hour + dt.minute / 60.0 + dt.second / 3600.0) for dt in datetimes]
+        else:
+            lb_preparation = Preparation()
+            dates = []
+            for HOY in HOYs:
+                d, m, h = lb_preparation.hour2Date(HOY, True)
+                dates.append((m + 1, d, h))
+        
+        keys = ("altitude", "azimuth", "declination", "equationOfTime", "solarTime", "vectorX", "vectorY", "vectorZ")
+        results = dict([(key, array('d')) for key in keys])
+        altitudes, azimuths, declinations = results["altitude"], results["azimuth"], results["declination"]
+        eqOfTimes, solarTimes = results["equationOfTime"], results["solarTime"]
+        vectorXs, vectorYs, vectorZs = results["vectorX"], results["vectorY"], results["vectorZ"]
+        angle2North = self.angle2North
+        cos, sin = math.cos, math.sin
+        
+        for month, day, hour in dates:
+            julianDay, solDec, eqOfTime, solTime, zenith, solAlt, solAz = self.calculateSunPosition(month, day, hour)
+            altitudes.append(solAlt); azimuths.append(solAz); declinations.append(solDec)
+            eqOfTimes.append(eqOfTime); solarTimes.append(solTime)
+            # rotate (0, 1, 0) by altitude around x axis and by -(azimuth - north) around z axis
+            vectorXs.append(cos(solAlt) * sin(solAz - angle2North))
+            vectorYs.append(cos(solAlt) * cos(solAz - angle2North))
+            vectorZs.append(sin(solAlt))
+        
+        return results
+    
+    def iterSunPositions(self, HOYs = None, datetimes = None, chunkSize = 10080, singlePrecision = False, \
+                         fields = ("altitude", "azimuth", "vectorX", "vectorY", "vectorZ")):
+        """
+        High resolution sun positions for long lists of HOYs or datetime objects (e.g. every minute
+        of the year for shadow animations). Positions are yielded in chunks of chunkSize as dictionaries
+        of arrays for the requested fields so the whole list is never in the memory at once.
+        Sun vectors are calculated (NOAA) at the start, middle and end of each hour and each component
+        is interpolated with a quadratic curve in between, which is within 0.01 degrees of the position
+        for the exact time. Altitude and azimuth are calculated from the interpolated vectors.
+        If singlePrecision is True arrays are float32 ('f') instead of double ('d').
+        Angles are in radians and vectors are from the center to the sun and rotated based on north.
+        
+        Usage:
+            lb_sunpath.initTheClass(latitude, northAngle, cenPt, scale, longitude, timeZone)
+            minutes = (minute / 60.0 for minute in xrange(1, 525601))
+            for sunPositions in lb_sunpath.iterSunPositions(minutes, singlePrecision = True):
+                altitudes = sunPositions["altitude"]
+        """
+        if datetimes is not None:
+            getJD = Preparation().getJD
+            HOYs = ((getJD(dt.month, dt.day) - 1) * 24 + dt.hour + dt.minute / 60.0 + dt.second / 3600.0 \
+                    for dt in datetimes)
+        HOYs = iter(HOYs)
+        typecode = 'f' if singlePrecision else 'd'
+        
+        # HOY h of the year is (h / 24) days after the start of the year
+        julianDay0 = self.getJulianDay(1, 1, 0)
+        sinLat, cosLat = math.sin(self.solLat), math.cos(self.solLat)
+        timeOffset = 4 * math.degrees(self.s_longtitude) - 60 * self.timeZone
+        sinNorth, cosNorth = math.sin(self.angle2North), math.cos(self.angle2North)
+        sin, cos, radians = math.sin, math.cos, math.radians
+        
+        # declination and equation of time for each hour. only used by this call so it is not shared between threads
+        hourlyEphemeris = {}
+        def ephemeris(HOY):
+            """Declination and equation of time. Calculated for each hour and linearly interpolated in between"""
+            hour = int(HOY); fraction = HOY - hour
+            for node in (hour, hour + 1):
+                if node not in hourlyEphemeris:
+                    hourlyEphemeris[node] = self.getDeclinationEqOfTime(julianDay0 + node / 24.0)
+            solDec0, eqOfTime0 = hourlyEphemeris[hour]
+            if fraction == 0: return solDec0, eqOfTime0
+            solDec1, eqOfTime1 = hourlyEphemeris[hour + 1]
+            return solDec0 + fraction * (solDec1 - solDec0), eqOfTime0 + fraction * (eqOfTime1 - eqOfTime0)
+        
+        def sunVector(HOY):
+            """Sun vector for a HOY rotated based on north"""
+            solDec, eqOfTime = ephemeris(HOY)
+            solTime = (((HOY % 24) * 60 + eqOfTime + timeOffset) % 1440) / 60
+            hourAngle = radians(solTime * 15 - 180)
+            east = -cos(solDec) * sin(hourAngle)
+            north = cosLat * sin(solDec) - sinLat * cos(solDec) * cos(hourAngle)
+            up = sinLat * sin(solDec) + cosLat * cos(solDec) * cos(hourAngle)
+            return east * cosNorth - north * sinNorth, north * cosNorth + east * sinNorth, up
+        
+        # quadratic coefficients of each vector component for each hour. calculated once for each
+        # hour that is used: value = c0 + fraction * (c1 + fraction * c2)
+        coefficients = [[None] * 8761 for axis in range(3)]
+        hourlyVectors = {}
+        def setCoefficients(hour):
+            for HOY in (hour, hour + 1):
+                if HOY not in hourlyVectors: hourlyVectors[HOY] = sunVector(HOY)
+            for axis, p0, pm, p1 in zip(range(3), hourlyVectors[hour], sunVector(hour + 0.5), hourlyVectors[hour + 1]):
+                coefficients[axis][hour] = p0, 4 * pm - 3 * p0 - p1, 2 * p0 - 4 * pm + 2 * p1
+        
+        angle2North, twoPi = self.angle2North, 2 * math.pi
+        
+        while True:
+            chunk = list(islice(HOYs, chunkSize))
+            if not chunk: break
+            # HOY 0 is the same as the last hour of the year
+            if min(chunk) <= 0 or max(chunk) > 8760:
+                chunk = [HOY if 0 < HOY <= 8760 else (HOY % 8760 or 8760) for HOY in chunk]
+            if chunk == sorted(chunk):
+                # evaluate each hour separately so its coefficients are only looked up once
+                vectorXs, vectorYs, vectorZs = vectors = [], [], []
+                start = 0
+                while start < len(chunk):
+                    hour = int(chunk[start])
+                    end = bisect_left(chunk, hour + 1, start)
+                    if coefficients[0][hour] is None: setCoefficients(hour)
+                    hourFractions = [HOY - hour for HOY in chunk[start:end]]
+                    for values, axisCoefficients in zip(vectors, coefficients):
+                        c0, c1, c2 = axisCoefficients[hour]
+                        values.extend([c0 + fraction * (c1 + fraction * c2) for fraction in hourFractions])
+                    start = end
+            else:
+                hours = map(int, chunk)
+                fractions = map(operator.sub, chunk, hours)
+                for hour in set(hours):
+                    if coefficients[0][hour] is None: setCoefficients(hour)
+                vectorXs, vectorYs, vectorZs = [[c0 + fraction * (c1 + fraction * c2) \
+                    for (c0, c1, c2), fraction in izip(map(axisCoefficients.__getitem__, hours), fractions)] \
+                    for axisCoefficients in coefficients]
+            
+            results = {}
+            if "vectorX" in fields: results["vectorX"] = array(typecode, vectorXs)
+            if "vectorY" in fields: results["vectorY"] = array(typecode, vectorYs)
+            if "vectorZ" in fields: results["vectorZ"] = array(typecode, vectorZs)
+            if "altitude" in fields:
+                # interpolated vectors aren't exactly unit vectors. atan2 is also accurate close to the zenith
+                results["altitude"] = array(typecode, map(math.atan2, vectorZs, map(math.hypot, vectorXs, vectorYs)))
+            if "azimuth" in fields:
+                results["azimuth"] = array(typecode, [(azimuth + angle2North) % twoPi for azimuth in map(math.atan2, vectorXs, vectorYs)])
+            
+            yield results
+    
+    def sunVectors(self, sunPositions, reverse = True, indices = None):
+        """
+        Rhino vectors from the results of calculateSunPositions.
+        If reverse is True vectors are from the center to the sun (sunReverseVectorCalc) otherwise
+        they are from the sun to the center (sunPosPt).
+        """
+        if indices is None: indices = range(len(sunPositions["vectorX"]))
+        factor = 1 if reverse else -1
+        xs, ys, zs = sunPositions["vectorX"], sunPositions["vectorY"], sunPositions["vectorZ"]
+        return [rc.Geometry.Vector3d(factor * xs[i], factor * ys[i], factor * zs[i]) for i in indices]
+    
+    def calculateSunriseSunset(self, days = None, leapYear = False, depression = 0.833):
+        """
+        Analytic sunrise, sunset, solar noon and day length for days of the year (1-365 or 1-366).
+        Hours are in local standard time. Declination and equation of time are calculated once for
+        each day at the solar noon. The sun is up when its center is higher than -depression degrees
+        (0.833 is the standard sunrise with refraction; use 0 to match solAlt >= 0).
+        Sunrise and sunset are None when the sun doesn't rise or set and day length is 0 or 24.
+        Returns a dictionary of lists for "days", "sunrise", "sunset", "solarNoon" and "dayLength".
+        
+        Usage:
+            lb_sunpath.initTheClass(latitude, longtitude = longitude, timeZone = timeZone)
+            sunEvents = lb_sunpath.calculateSunriseSunset()
+            print sunEvents["sunrise"][171] # sunrise for June 21
+        """
+        table = Preparation().calendarTable(leapYear = leapYear)
+        dayMonths, dayDays = table["dayMonths"], table["dayDays"]
+        if days is None: days = range(1, len(dayMonths))
+        year = 2016 if leapYear else 2014
+        
+        longitude = math.degrees(self.s_longtitude)
+        cosZenith = math.cos(math.radians(90 + depression))
+        cosLat = math.cos(self.solLat); tanLat = math.tan(self.solLat)
+        
+        results = {"days": list(days), "sunrise": [], "sunset": [], "solarNoon": [], "dayLength": []}
+        for doy in days:
+            month, day = dayMonths[doy], dayDays[doy]
+            # start from noon and calculate the sun at the solar noon
+            solarNoon = 12
+            for iteration in range(2):
+                solDec, eqOfTime = self.getDeclinationEqOfTime(self.getJulianDay(month, day, solarNoon, year))
+                solarNoon = (720 - 4 * longitude - eqOfTime + self.timeZone * 60) / 60.0
+            
+            if cosLat == 0: cosHourAngle = 1 if tanLat * math.tan(solDec) < 0 else -1
+            else: cosHourAngle = cosZenith / (cosLat * math.cos(solDec)) - tanLat * math.tan(solDec)
+            
+            if cosHourAngle >= 1:
+                # polar night
+                sunrise = sunset = None; dayLength = 0
+            elif cosHourAngle <= -1:
+                # midnight sun
+                sunrise = sunset = None; dayLength = 24
+            else:
+                halfDay = math.degrees(math.acos(cosHourAngle)) / 15
+                sunrise = solarNoon - halfDay; sunset = solarNoon + halfDay; dayLength = 2 * halfDay
+            
+            results["sunrise"].append(sunrise)
+            results["sunset"].append(sunset)
+            results["solarNoon"].append(solarNoon)
+            results["dayLength"].append(dayLength)
+        
+        return results
+    
+    def sunUpMask(self, HOYs, depression = 0.833):
+        """
+        True/False for each HOY if the sun is up based on calculateSunriseSunset.
+        Sunrise and sunset are calculated once for each day instead of the position for each hour.
+        """
+        sunEvents = self.calculateSunriseSunset(depression = depression)
+        sunrises, dayLengths = sunEvents["sunrise"], sunEvents["dayLength"]
+        lb_preparation = Preparation()
+        numOfDays = lb_preparation.numOfDays
+        
+        mask = []
+        for HOY in HOYs:
+            d, m, h = lb_preparation.hour2Date(HOY, True)
+            dayIndex = numOfDays[m] + d - 1
+            dayLength = dayLengths[dayIndex]
+            if dayLength == 0 or dayLength == 24: mask.append(dayLength == 24)
+            # sunrise can be before midnight for time zones far from the site
+            else: mask.append((h - sunrises[dayIndex]) % 24 <= dayLength)
+        return mask
     
     def sunReverseVectorCalc(self):
         basePoint = rc.Geometry.Point3d.Add(rc.Geometry.Point3d.Origin,rc.Geometry.Vector3f(0,1,0))
@@ -1505,6 +3192,135 @@ class Sunpath(object):
         return lines
 
 
+class SunPositionCache(object):
+    """
+    Memoized annual sun positions for each site.
+    Sun positions for a (latitude, longitude, time zone, north angle, time-step) are calculated once
+    and shared between all the components. Results are tuples so they can't be changed by the
+    components that use them. The least recently used sites are removed from memory once there are
+    more than maxSites. If persist is True positions are also saved under Ladybug's default folder
+    so they are available after restarting Rhino.
+    
+    Usage:
+        lb_sunPositionCache = sc.sticky["ladybug_SunPositionCache"]()
+        sunPositions = lb_sunPositionCache.getSunPositions(latitude, longitude, timeZone, northAngle)
+        # index i is for HOY (i + 1) / timeStep
+        altitudes = sunPositions["altitude"]
+    """
+    version = 1
+    fields = ("altitude", "azimuth", "declination", "equationOfTime", "solarTime", "vectorX", "vectorY", "vectorZ")
+    
+    # sun positions of each site (least recently used first)
+    sites = OrderedDict()
+    maxSites = 8
+    
+    def __init__(self, persist = False, cacheFolder = None):
+        self.persist = persist
+        if not cacheFolder and persist: cacheFolder = os.path.join(sc.sticky["Ladybug_DefaultFolder"], "sunPositionCache")
+        self.cacheFolder = cacheFolder
+    
+    def siteKey(self, latitude, longitude, timeZone, northAngle = 0, timeStep = 1):
+        return (round(float(latitude), 6), round(float(longitude), 6), round(float(timeZone), 6), \
+                round(float(northAngle), 9), int(timeStep))
+    
+    def cacheFile(self, key):
+        return os.path.join(self.cacheFolder, hashlib.md5(`key`).hexdigest() + ".lbs")
+    
+    def calculate(self, key):
+        latitude, longitude, timeZone, northAngle, timeStep = key
+        sunpath = Sunpath()
+        sunpath.initTheClass(latitude, northAngle, rc.Geometry.Point3d.Origin, 1, longitude, timeZone)
+        HOYs = [count / float(timeStep) for count in range(1, 8760 * timeStep + 1)]
+        return sunpath.calculateSunPositions(HOYs)
+    
+    def load(self, key):
+        """Return the saved sun positions of a site or None if they are not saved"""
+        cacheFile = self.cacheFile(key)
+        if not os.path.isfile(cacheFile): return None
+        try:
+            with open(cacheFile, "rb") as lbsfile:
+                info = json.loads(lbsfile.readline())
+                if info["version"] != self.version or tuple(info["key"]) != key: return None
+                sunPositions = {}
+                for field in info["fields"]:
+                    values = array('d')
+                    values.fromfile(lbsfile, info["numOfValues"])
+                    if info["byteorder"] != sys.byteorder: values.byteswap()
+                    sunPositions[field] = values
+            return sunPositions
+        except:
+            return None
+    
+    def save(self, key, sunPositions):
+        if not os.path.isdir(self.cacheFolder): os.makedirs(self.cacheFolder)
+        info = {"version": self.version,
+                "key": list(key),
+                "fields": list(self.fields),
+                "numOfValues": len(sunPositions[self.fields[0]]),
+                "byteorder": sys.byteorder}
+        cacheFile = self.cacheFile(key)
+        tempFile = cacheFile + ".tmp"
+        with open(tempFile, "wb") as lbsfile:
+            lbsfile.write(json.dumps(info) + "\n")
+            for field in self.fields:
+                array('d', sunPositions[field]).tofile(lbsfile)
+        
+        if os.path.isfile(cacheFile): os.remove(cacheFile)
+        os.rename(tempFile, cacheFile)
+    
+    def getSunPositions(self, latitude, longitude, timeZone, northAngle = 0, timeStep = 1):
+        """
+        Annual sun positions of a site for each time-step. Index i is for HOY (i + 1) / timeStep.
+        Returns a dictionary of tuples with the same keys as Sunpath.calculateSunPositions.
+        """
+        key = self.siteKey(latitude, longitude, timeZone, northAngle, timeStep)
+        if key in self.sites:
+            # move it to the end as the most recently used
+            sunPositions = self.sites.pop(key)
+        else:
+            sunPositions = None
+            if self.persist: sunPositions = self.load(key)
+            if sunPositions is None:
+                sunPositions = self.calculate(key)
+                if self.persist:
+                    try: self.save(key, sunPositions)
+                    except Exception, e: print "Failed to save the sun positions: " + `e`
+            sunPositions = dict([(field, tuple(sunPositions[field])) for field in self.fields])
+        
+        self.sites[key] = sunPositions
+        while len(self.sites) > self.maxSites: self.sites.popitem(last = False)
+        
+        return dict(sunPositions)
+    
+    def getSunPositionsForHOYs(self, HOYs, latitude, longitude, timeZone, northAngle = 0, timeStep = 1):
+        """
+        Sun positions for a list of HOYs from the annual positions of the site.
+        HOYs should be on the time-step. Positions for other HOYs are calculated and aren't cached.
+        Returns a dictionary of lists with the same keys as Sunpath.calculateSunPositions.
+        """
+        numOfSteps = 8760 * int(timeStep)
+        indices = []
+        for HOY in HOYs:
+            step = HOY * timeStep
+            if abs(step - round(step)) > 1e-6 or not 0 <= step <= numOfSteps: break
+            # HOY 0 is the same as the last hour of the year
+            indices.append((int(round(step)) - 1) % numOfSteps)
+        else:
+            sunPositions = self.getSunPositions(latitude, longitude, timeZone, northAngle, timeStep)
+            return dict([(field, [sunPositions[field][i] for i in indices]) for field in self.fields])
+        
+        sunpath = Sunpath()
+        sunpath.initTheClass(float(latitude), northAngle, rc.Geometry.Point3d.Origin, 1, float(longitude), float(timeZone))
+        sunPositions = sunpath.calculateSunPositions(HOYs)
+        return dict([(field, list(sunPositions[field])) for field in self.fields])
+    
+    def clear(self, removeFiles = False):
+        self.sites.clear()
+        if removeFiles and self.cacheFolder and os.path.isdir(self.cacheFolder):
+            for f in os.listdir(self.cacheFolder):
+                if f.endswith(".lbs"): os.remove(os.path.join(self.cacheFolder, f))
+
+
 class Vector:
     
     def __init__(self, items):
@@ -1705,49 +3521,11 @@ class Sky:
             - math.floor(y/100) + math.floor(y/400) - 32045.5 - 59
     
     def setSunPosition(self):
-        julianCentury = (self.julianDay - 2451545) / 36525
-        #degrees
-        geomMeanLongSun = (280.46646 + julianCentury * (36000.76983 + julianCentury*0.0003032)) % 360
-        #degrees
-        geomMeanAnomSun = 357.52911 + julianCentury*(35999.05029 - 0.0001537*julianCentury)
-        eccentOrbit = 0.016708634 - julianCentury*(0.000042037 + 0.0000001267*julianCentury)
-        sunEqOfCtr = math.sin(math.radians(geomMeanAnomSun))*(1.914602 - julianCentury*(0.004817+0.000014*julianCentury)) + \
-            math.sin(math.radians(2*geomMeanAnomSun))*(0.019993-0.000101*julianCentury) + \
-            math.sin(math.radians(3*geomMeanAnomSun))*0.000289
-        #degrees
-        sunTrueLong = geomMeanLongSun + sunEqOfCtr
-        #AUs
-        sunTrueAnom = geomMeanAnomSun + sunEqOfCtr
-        #AUs
-        sunRadVector = (1.000001018*(1 - eccentOrbit**2))/ \
-            (1 + eccentOrbit*math.cos(math.radians(sunTrueLong)))
-        #degrees
-        sunAppLong = sunTrueLong - 0.00569 - 0.00478*math.sin(math.radians(125.04-1934.136*julianCentury))
-        #degrees
-        meanObliqEcliptic = 23 + (26 + ((21.448 - julianCentury*(46.815 + \
-            julianCentury*(0.00059 - julianCentury*0.001813))))/60)/60
-        #degrees
-        obliqueCorr = meanObliqEcliptic + 0.00256*math.cos(math.radians(125.04 - 1934.136*julianCentury))
-        #degrees
-        sunRightAscen = math.degrees(math.atan2(math.cos(math.radians(obliqueCorr))* \
-            math.sin(math.radians(sunAppLong)), math.cos(math.radians(sunAppLong))))
-        #RADIANS
-        self.sun.declination = math.asin(math.sin(math.radians(obliqueCorr))*math.sin(math.radians(sunAppLong)))
-        
-        varY = math.tan(math.radians(obliqueCorr/2))*math.tan(math.radians(obliqueCorr/2))
-        #minutes
-        eqOfTime = 4*math.degrees(varY*math.sin(2*math.radians(geomMeanLongSun)) \
-            - 2*eccentOrbit*math.sin(math.radians(geomMeanAnomSun)) \
-            + 4*eccentOrbit*varY*math.sin(math.radians(geomMeanAnomSun))*math.cos(2*math.radians(geomMeanLongSun)) \
-            - 0.5*(varY**2)*math.sin(4*math.radians(geomMeanLongSun)) \
-            - 1.25*(eccentOrbit**2)*math.sin(2*math.radians(geomMeanAnomSun)))
-        #hours
-        self.sun.time = ((self.time*60 + eqOfTime + 4*self.longitude - 60*self.timeZone) % 1440)/60
-        #degrees
-        hourAngle = (self.sun.time*15 + 180) if (self.sun.time*15 < 0) else (self.sun.time*15 - 180)
-        #RADIANS
-        self.sun.zenith = math.acos(math.sin(math.radians(self.latitude))*math.sin(self.sun.declination) \
-            + math.cos(math.radians(self.latitude))*math.cos(self.sun.declination)*math.cos(math.radians(hourAngle)))
+        # NOAA equations are shared with Sunpath
+        sunpath = Sunpath()
+        sunpath.initTheClass(self.latitude, longtitude = self.longitude, timeZone = self.timeZone)
+        self.sun.declination, eqOfTime, self.sun.time, self.sun.zenith, solAlt, self.sun.azimuth = \
+            sunpath.calculateSunPositionFromJulianDay(self.julianDay, self.time)
         #degrees
         atmosphRefrac = 0 if (self.sun.zenith < 0.087) else \
             (58.1/math.tan(math.pi/2 - self.sun.zenith) \
@@ -1762,12 +3540,6 @@ class Sky:
                     (-20.772/math.tan(math.pi/2 - self.sun.zenith))/3600
         #RADIANS
         self.sun.zenithCorr = self.sun.zenith - math.radians(atmosphRefrac)
-        #RADIANS cw from N
-        self.sun.azimuth = ((math.acos(((math.sin(math.radians(self.latitude))*math.cos(self.sun.zenith)) \
-            - math.sin(self.sun.declination))/(math.cos(math.radians(self.latitude))*math.sin(self.sun.zenith))) + math.pi) % (2*math.pi)) \
-            if (hourAngle > 0) else \
-                ((3*math.pi - math.acos(((math.sin(math.radians(self.latitude))*math.cos(self.sun.zenith)) \
-                - math.sin(self.sun.declination))/(math.cos(math.radians(self.latitude))*math.sin(self.sun.zenith)))) % (2*math.pi))
     
     def calcSkyColor(self, azimuth, zenith):
         gamma = self.gamma(zenith, azimuth)
@@ -1818,6 +3590,718 @@ class Sky:
         return self.colorAvg
 
 
+class SkyMatrix(object):
+    """
+    Perez all-weather sky matrix from direct normal and diffuse horizontal radiation.
+    This is an in-process version of Radiance's gendaymtx -O1 (by Ian Ashdown and Greg Ward) that
+    follows the same steps: sun position from Radiance's sun.c equations, Perez sky clearness and
+    brightness, the categorized Perez luminance distribution normalized to the diffuse horizontal
+    radiation for the sky (-s) and the direct radiation shared between the 4 closest patches for
+    the sun (-d). Values are solar radiance (W/sr/m2) for each patch and hour, patch 0 is the ground.
+    
+    The patch layout and values aren't checked against gendaymtx output yet (see tests/compareSkyMatrix.py)
+    so GenCumulativeSkyMtx always runs gendaymtx.exe and only uses this class instead of it once
+    verifiedAgainstGendaymtx is True.
+    
+    skyDensity 1 is a Tregenza sky (145 patches + ground) and 2 is a Reinhart sky (577 patches + ground).
+    
+    Usage:
+        lb_skyMatrix = SkyMatrix(skyDensity = 1)
+        difMtx, dirMtx = lb_skyMatrix.fromEPW(epw_file)
+        print difMtx[patchNumber][HOY - 1]
+    """
+    # number of patches in each row of a Tregenza sky (without the cap)
+    tregenzaRows = [30, 30, 24, 24, 18, 12, 6]
+    
+    # luminance weighted RGB and steradian conversion of the legacy .mtx reader for each row
+    rgbWeights = (.265074126, .670114631, .064811243)
+    numOfPatchesInEachRow = {1: [30, 30, 24, 24, 18, 12, 6, 1],
+                             2: [60, 60, 60, 60, 48, 48, 48, 48, 36, 36, 24, 24, 12, 12, 1]}
+    strConv = {1: [0.0344199465, 0.0455168385, 0.0445221864, 0.0428934136, 0.0406730411, 0.0473984151, 0.0416418006, 0.0435449227],
+               2: [0.00921483254, 0.00612971396, 0.0121875626, 0.00905126163, 0.0119026242, 0.00974295956, 0.011436609, 0.00974713106, 0.0108025291, 0.0117312774, 0.0125224872, 0.0105335058, 0.0109255262, 0.0111894547, 0.0113221971]}
+    
+    # Perez et al. (1993) coefficients for a, b, c, d and e for each sky clearness category
+    clearnessBins = [1.065, 1.230, 1.500, 1.950, 2.800, 4.500, 6.200]
+    perezCoefficients = [
+        [[1.3525, -0.2576, -0.2690, -1.4366], [-0.7670, 0.0007, 1.2734, -0.1233], [2.8000, 0.6004, 1.2375, 1.0000], [1.8734, 0.6297, 0.9738, 0.2809], [0.0356, -0.1246, -0.5718, 0.9938]],
+        [[-1.2219, -0.7730, 1.4148, 1.1016], [-0.2054, 0.0367, -3.9128, 0.9156], [6.9750, 0.1774, 6.4477, -0.1239], [-1.5798, -0.5081, -1.7812, 0.1080], [0.2624, 0.0672, -0.2190, -0.4285]],
+        [[-1.1000, -0.2515, 0.8952, 0.0156], [0.2782, -0.1812, -4.5000, 1.1766], [24.7219, -13.0812, -37.7000, 34.8438], [-5.0000, 1.5218, 3.9229, -2.6204], [-0.0156, 0.1597, 0.4199, -0.5562]],
+        [[-0.5484, -0.6654, -0.2672, 0.7117], [0.7234, -0.6219, -5.6812, 2.6297], [33.3389, -18.3000, -62.2500, 52.0781], [-3.5000, 0.0016, 1.1477, 0.1062], [0.4659, -0.3296, -0.0876, -0.0329]],
+        [[-0.6000, -0.3566, -2.5000, 2.3250], [0.2937, 0.0496, -5.6812, 1.8415], [21.0000, -4.7656, -21.5906, 7.2492], [-3.5000, -0.1554, 1.4062, 0.3988], [0.0032, 0.0766, -0.0656, -0.1294]],
+        [[-1.0156, -0.3670, 1.0078, 1.4051], [0.2875, -0.5328, -3.8500, 3.3750], [14.0000, -0.9999, -7.1406, 7.5469], [-3.4000, -0.1078, -1.0750, 1.5702], [-0.0672, 0.4016, 0.3017, -0.4844]],
+        [[-1.0000, 0.0211, 0.5025, -0.5119], [-0.3000, 0.1922, 0.7023, -1.6317], [19.0000, -5.0000, 1.2438, -1.9094], [-4.0000, 0.0250, 0.3844, 0.2656], [1.0468, -0.3788, -2.4517, 1.4656]],
+        [[-1.0500, 0.0289, 0.4260, 0.3590], [-0.3250, 0.1156, 0.7781, 0.0025], [31.0625, -14.5000, -46.1148, 55.3750], [-7.2312, 0.4050, 13.3500, 0.6234], [1.5000, -0.6426, 1.8564, 0.5636]]]
+    
+    solarConstant = 1367.0
+    binaryVersion = 1
+    
+    # set to True once the results match the gendaymtx reference results in tests/data
+    verifiedAgainstGendaymtx = False
+    
+    def __init__(self, skyDensity = 1, groundReflectance = 0.2, numOfSuns = 4):
+        self.skyDensity = int(skyDensity)
+        if self.skyDensity not in self.numOfPatchesInEachRow:
+            raise ValueError("skyDensity should be 1 for Tregenza or 2 for Reinhart sky!")
+        self.groundReflectance = groundReflectance
+        self.numOfSuns = numOfSuns
+        self.calculatePatches()
+    
+    @property
+    def numOfPatches(self):
+        """Number of patches including the ground"""
+        return len(self.patchAltitudes)
+    
+    def calculatePatches(self):
+        """Altitude, azimuth (from north to east), solid angle and direction of the center of each patch"""
+        m = self.skyDensity
+        alpha = (math.pi / 2) / (len(self.tregenzaRows) * m + 0.5)
+        # ground
+        altitudes = [-math.pi / 2]; azimuths = [0]; solidAngles = [2 * math.pi]
+        for row in range(len(self.tregenzaRows) * m):
+            numOfPatchesInRow = self.tregenzaRows[row // m] * m
+            solidAngle = 2 * math.pi * (math.sin(alpha * (row + 1)) - math.sin(alpha * row)) / numOfPatchesInRow
+            for patch in range(numOfPatchesInRow):
+                altitudes.append(alpha * (row + .5))
+                azimuths.append(2 * math.pi * patch / numOfPatchesInRow)
+                solidAngles.append(solidAngle)
+        # cap
+        altitudes.append(math.pi / 2); azimuths.append(0); solidAngles.append(2 * math.pi * (1 - math.cos(alpha * .5)))
+        
+        self.patchAltitudes = altitudes
+        self.patchAzimuths = azimuths
+        self.patchSolidAngles = solidAngles
+        self.patchVectors = [(math.cos(alt) * math.sin(az), math.cos(alt) * math.cos(az), math.sin(alt)) \
+                             for alt, az in zip(altitudes, azimuths)]
+        # horizontal projection of the sky patches. it is slightly larger than pi (3.1588 for Tregenza
+        # and 3.1462 for Reinhart sky) since each patch is projected by the altitude of its center
+        self.skyProjectedSolidAngle = sum(vector[2] * solidAngle for vector, solidAngle \
+                                          in zip(self.patchVectors[1:], solidAngles[1:]))
+    
+    def sunPosition(self, julianDay, hour, latitude, longitude, timeZone):
+        """
+        Sun altitude and azimuth (radians) based on Radiance's sun.c.
+        julianDay is the day of the year and hour is the local standard time.
+        Latitude, longitude and time zone are in Ladybug's convention (east is positive).
+        Azimuth is from the south and positive to the west.
+        """
+        siteLatitude = math.radians(latitude)
+        # Radiance's longitude and meridian are positive to the west
+        siteLongitude = -math.radians(longitude)
+        siteMeridian = -math.radians(15 * timeZone)
+        
+        solarDeclination = 0.4093 * math.sin((2 * math.pi / 368) * (julianDay - 81))
+        solarTime = hour + 0.170 * math.sin((4 * math.pi / 373) * (julianDay - 80)) \
+                    - 0.129 * math.sin((2 * math.pi / 355) * (julianDay - 8)) \
+                    + 12 * (siteMeridian - siteLongitude) / math.pi
+        
+        altitude = math.asin(math.sin(siteLatitude) * math.sin(solarDeclination) \
+                   - math.cos(siteLatitude) * math.cos(solarDeclination) * math.cos(solarTime * (math.pi / 12)))
+        azimuth = -math.atan2(math.cos(solarDeclination) * math.sin(solarTime * (math.pi / 12)), \
+                  -math.cos(siteLatitude) * math.sin(solarDeclination) \
+                  - math.sin(siteLatitude) * math.cos(solarDeclination) * math.cos(solarTime * (math.pi / 12)))
+        return altitude, azimuth
+    
+    def perezParameters(self, sunZenith, skyClearness, skyBrightness):
+        """Perez a, b, c, d and e for a sun zenith (radians), sky clearness and sky brightness"""
+        category = bisect_right(self.clearnessBins, skyClearness)
+        if 1 <= category <= 4 and skyBrightness < 0.2: skyBrightness = 0.2
+        
+        parameters = [x1 + x2 * sunZenith + skyBrightness * (x3 + x4 * sunZenith) \
+                      for x1, x2, x3, x4 in self.perezCoefficients[category]]
+        if category == 0:
+            c1, c2, c3, c4 = self.perezCoefficients[0][2]
+            d1, d2, d3, d4 = self.perezCoefficients[0][3]
+            parameters[2] = math.exp((skyBrightness * (c1 + c2 * sunZenith)) ** c3) - c4
+            parameters[3] = -math.exp(skyBrightness * (d1 + d2 * sunZenith)) + d3 + skyBrightness * d4
+        return parameters
+    
+    def skyPatchValues(self, julianDay, sunAltitude, sunAzimuth, directNormal, diffuseHorizontal):
+        """
+        Diffuse and direct radiance of each patch for one hour.
+        Sun azimuth is in Radiance's convention (from the south and positive to the west).
+        """
+        numOfPatches = self.numOfPatches
+        difValues = [0] * numOfPatches
+        dirValues = [0] * numOfPatches
+        if directNormal <= 1e-4 and diffuseHorizontal <= 1e-4: return difValues, dirValues
+        # direct radiation isn't valid when the sun is below the horizon
+        if sunAltitude <= 0: directNormal = 0
+        
+        sunVector = (-math.sin(sunAzimuth) * math.cos(sunAltitude), \
+                     -math.cos(sunAzimuth) * math.cos(sunAltitude), math.sin(sunAltitude))
+        
+        # ground
+        groundFactor = self.groundReflectance / math.pi
+        difValues[0] = diffuseHorizontal * groundFactor
+        dirValues[0] = directNormal * max(0, sunVector[2]) * groundFactor
+        
+        # sky
+        if diffuseHorizontal > 1e-4:
+            # don't let the sun dip below the horizon
+            sunZenith = math.pi / 2 - max(0, sunAltitude)
+            zenithCubed = sunZenith ** 3
+            skyClearness = ((diffuseHorizontal + directNormal) / diffuseHorizontal + 1.041 * zenithCubed) / (1 + 1.041 * zenithCubed)
+            airMass = 1 / (math.cos(sunZenith) + 0.15 * (93.885 - math.degrees(sunZenith)) ** -1.253)
+            dayAngle = (julianDay - 1) * (2 * math.pi / 365)
+            eccentricity = 1.00011 + 0.034221 * math.cos(dayAngle) + 0.00128 * math.sin(dayAngle) \
+                           + 0.000719 * math.cos(2 * dayAngle) + 0.000077 * math.sin(2 * dayAngle)
+            skyBrightness = max(0.01, diffuseHorizontal * airMass / (self.solarConstant * eccentricity))
+            
+            a, b, c, d, e = self.perezParameters(sunZenith, skyClearness, skyBrightness)
+            
+            # relative luminance of each patch
+            exp, acos = math.exp, math.acos
+            horizontalSum = 0
+            for patch in range(1, numOfPatches):
+                x, y, z = self.patchVectors[patch]
+                cosGamma = max(-1, min(1, x * sunVector[0] + y * sunVector[1] + z * sunVector[2]))
+                # Perez model can return negative values for a few extreme skies
+                luminance = max(0, (1 + a * exp(b / z)) * (1 + c * exp(d * acos(cosGamma)) + e * cosGamma * cosGamma))
+                difValues[patch] = luminance
+                horizontalSum += luminance * z * self.patchSolidAngles[patch]
+            
+            if horizontalSum <= 1e-6:
+                # uniform sky
+                difValues[1:] = [1] * (numOfPatches - 1)
+                horizontalSum = self.skyProjectedSolidAngle
+            
+            normFactor = diffuseHorizontal / horizontalSum
+            difValues[1:] = [luminance * normFactor for luminance in difValues[1:]]
+        
+        # sun
+        if directNormal > 1e-4:
+            dotProducts = []
+            for patch in range(1, numOfPatches):
+                x, y, z = self.patchVectors[patch]
+                dotProducts.append((x * sunVector[0] + y * sunVector[1] + z * sunVector[2], patch))
+            dotProducts.sort(reverse = True)
+            closestPatches = dotProducts[:self.numOfSuns]
+            weights = [1 / (1.002 - dotProduct) for dotProduct, patch in closestPatches]
+            totalWeight = sum(weights)
+            for weight, (dotProduct, patch) in zip(weights, closestPatches):
+                dirValues[patch] += weight * directNormal / (totalWeight * self.patchSolidAngles[patch])
+        
+        return difValues, dirValues
+    
+    def calculate(self, directNormal, diffuseHorizontal, latitude, longitude, timeZone):
+        """
+        Sky matrices for hourly direct normal and diffuse horizontal radiation of a year.
+        Returns diffuse and direct matrices as a list of array('d') for each patch where
+        value i is for HOY i + 1.
+        """
+        numOfHours = len(directNormal)
+        difMtx = [array('d', [0.0]) * numOfHours for patch in range(self.numOfPatches)]
+        dirMtx = [array('d', [0.0]) * numOfHours for patch in range(self.numOfPatches)]
+        self.calculateHours(directNormal, diffuseHorizontal, latitude, longitude, timeZone, difMtx, dirMtx, 0, numOfHours)
+        return difMtx, dirMtx
+    
+    def calculateHours(self, directNormal, diffuseHorizontal, latitude, longitude, timeZone, difMtx, dirMtx, startHour, endHour):
+        """
+        Fill hours startHour to endHour - 1 (0-based) of diffuse and direct matrices. See calculate
+        Matrices aren't resized so different hours of the same matrices can be calculated in parallel.
+        """
+        calendar = Preparation().calendarTable()
+        for hourCount in range(startHour, endHour):
+            HOY = hourCount % 8760 + 1
+            julianDay = calendar["doys"][HOY]
+            # values are for the hour before the HOY so the sun is calculated for the middle of the hour
+            sunAltitude, sunAzimuth = self.sunPosition(julianDay, calendar["hours"][HOY] - 0.5, latitude, longitude, timeZone)
+            difValues, dirValues = self.skyPatchValues(julianDay, sunAltitude, sunAzimuth, \
+                                                       directNormal[hourCount], diffuseHorizontal[hourCount])
+            for patch in range(self.numOfPatches):
+                difMtx[patch][hourCount] = difValues[patch]
+                dirMtx[patch][hourCount] = dirValues[patch]
+    
+    def readWeatherData(self, epw_file):
+        """
+        Direct normal and diffuse horizontal radiation of the first 8760 hours of an epw file and its
+        latitude, longitude and time zone. Returns the arguments of calculate in the same order.
+        """
+        header, columns = EPWCache().readColumns(epw_file, [14, 15])
+        locName, lat, lngt, timeZone, elev, locationString = Preparation().epwLocationFromHeader(header[0])
+        return columns[14][:8760], columns[15][:8760], float(lat), float(lngt), float(timeZone)
+    
+    def fromEPW(self, epw_file):
+        """Sky matrices for the first 8760 hours of an epw file. See calculate"""
+        return self.calculate(*self.readWeatherData(epw_file))
+    
+    def patchRows(self):
+        """Row of each patch in the legacy .mtx reader which is used to find the steradian conversion"""
+        numOfPatchesInEachRow = self.numOfPatchesInEachRow[self.skyDensity]
+        rowNumbers = []
+        rowNumber = len(numOfPatchesInEachRow) - 1
+        for patchNumber in range(self.numOfPatches):
+            for rowCount in range(len(numOfPatchesInEachRow)):
+                if patchNumber <= sum(numOfPatchesInEachRow[:rowCount]):
+                    rowNumber = rowCount
+                    break
+            rowNumbers.append(rowNumber)
+        return rowNumbers
+    
+    def resultsDict(self, difMtx, dirMtx):
+        """
+        Convert radiance matrices to the dictionary of GenCumulativeSkyMtx results as
+        {patchNumber: {HOY: [diffuse, direct]}} in Wh/m2 using the same conversion as the .mtx reader.
+        """
+        strConv = self.strConv[self.skyDensity]
+        radValuesDict = {}
+        for patchNumber, rowNumber in enumerate(self.patchRows()):
+            factor = strConv[rowNumber]
+            radValuesDict[patchNumber] = dict([(hourCount + 1, [difValue * factor, dirValue * factor]) \
+                for hourCount, (difValue, dirValue) in enumerate(zip(difMtx[patchNumber], dirMtx[patchNumber]))])
+        return radValuesDict
+    
+    def saveBinary(self, difMtx, dirMtx, skyFile, location = None):
+        """
+        Save diffuse and direct matrices as a binary sky file (.lbsky).
+        Layout: one line of json info (version, sky density, number of patches and hours, location and
+        byte order) followed by float32 values for patch x hour x (diffuse, direct). Data starts right
+        after the info line so the file can also be memory-mapped.
+        """
+        numOfPatches, numOfHours = len(difMtx), len(difMtx[0])
+        info = {"version": self.binaryVersion,
+                "skyDensity": self.skyDensity,
+                "numOfPatches": numOfPatches,
+                "numOfHours": numOfHours,
+                "units": "W/sr/m2",
+                "location": location,
+                "byteorder": sys.byteorder}
+        
+        data = array('f', [0.0]) * (numOfPatches * numOfHours * 2)
+        for patch in range(numOfPatches):
+            start = patch * numOfHours * 2
+            data[start:start + 2 * numOfHours:2] = array('f', difMtx[patch])
+            data[start + 1:start + 2 * numOfHours:2] = array('f', dirMtx[patch])
+        
+        tempFile = skyFile + ".tmp"
+        with open(tempFile, "wb") as skyf:
+            skyf.write(json.dumps(info) + "\n")
+            data.tofile(skyf)
+        if os.path.isfile(skyFile): os.remove(skyFile)
+        os.rename(tempFile, skyFile)
+    
+    def loadBinary(self, skyFile):
+        """
+        Read a binary sky file. Returns the info and a single array('f') of patch x hour x (diffuse, direct).
+        Value of a patch and hour is data[(patch * numOfHours + hour) * 2 + component] where component
+        is 0 for diffuse and 1 for direct.
+        """
+        with open(skyFile, "rb") as skyf:
+            infoLine = skyf.readline()
+            info = json.loads(infoLine)
+            if info["version"] != self.binaryVersion:
+                raise ValueError("%s is not a valid sky file for this version of Ladybug!" % skyFile)
+            data = array('f')
+            data.fromfile(skyf, info["numOfPatches"] * info["numOfHours"] * 2)
+        if info["byteorder"] != sys.byteorder: data.byteswap()
+        info["dataStart"] = len(infoLine)
+        return info, data
+    
+    def splitBinaryData(self, info, data):
+        """Split the array of a binary sky file to diffuse and direct matrices of each patch"""
+        numOfHours = info["numOfHours"]
+        difMtx = []; dirMtx = []
+        for patch in range(info["numOfPatches"]):
+            start = patch * numOfHours * 2
+            difMtx.append(data[start:start + 2 * numOfHours:2])
+            dirMtx.append(data[start + 1:start + 2 * numOfHours:2])
+        return difMtx, dirMtx
+    
+    def readMTX(self, mtxFile):
+        """
+        Read a gendaymtx ascii file with or without the header.
+        Returns a list of array('f') for each patch and the list of hours that failed to read.
+        """
+        wR, wG, wB = self.rgbWeights
+        numOfHours = 8760
+        failedHours = set()
+        mtx = []
+        with open(mtxFile, "r") as mtxf:
+            lines = iter(mtxf)
+            firstLine = next(lines, "")
+            if firstLine.startswith("#?RADIANCE"):
+                # header ends with an empty line
+                for line in lines:
+                    if line.startswith("NCOLS="): numOfHours = int(line[6:])
+                    if not line.strip(): break
+            else:
+                lines = chain([firstLine], lines)
+            
+            for patch in range(self.numOfPatches):
+                values = array('f', [0.0]) * numOfHours
+                for hour, line in enumerate(islice(lines, numOfHours)):
+                    try:
+                        R, G, B = line.split()
+                        values[hour] = wR * float(R) + wG * float(G) + wB * float(B)
+                    except ValueError:
+                        failedHours.add(hour)
+                mtx.append(values)
+                # empty line between patches
+                next(lines, None)
+        
+        return mtx, sorted(failedHours)
+    
+    def convertMTX(self, difMtxFile, dirMtxFile, skyFile, location = None):
+        """
+        Convert the diffuse (-s) and direct (-d) gendaymtx ascii files to a binary sky file.
+        Returns the list of hours (0-based) that failed to read. Values for those hours are 0.
+        """
+        difMtx, failedDif = self.readMTX(difMtxFile)
+        dirMtx, failedDir = self.readMTX(dirMtxFile)
+        self.saveBinary(difMtx, dirMtx, skyFile, location)
+        return sorted(set(failedDif + failedDir))
+
+
+class SkyMatrixCache(object):
+    """
+    Shared cache for sky matrices generated by SkyMatrix.
+    A sky is saved as a binary sky file (.lbsky) under Ladybug's default folder. The file name is a hash of
+    the content of the epw file, sky density, the generator (SkyMatrix or gendaymtx) and its options (number
+    of suns for the direct radiation and ground reflectance) so an unchanged weather file is never recalculated even if it
+    is moved or renamed, and a changed weather file with the same name is always recalculated. The least
+    recently used files are removed once the size of the cache folder passes maxSize.
+    
+    Usage:
+        lb_skyMatrixCache = sc.sticky["ladybug_SkyMatrixCache"]()
+        difMtx, dirMtx = lb_skyMatrixCache.getSkyMatrices(epw_file, sc.sticky["ladybug_SkyMatrix"](1))
+    """
+    def __init__(self, cacheFolder = None, maxSize = 500 * 1024 * 1024):
+        if not cacheFolder: cacheFolder = os.path.join(sc.sticky["Ladybug_DefaultFolder"], "skyMatrixCache")
+        self.cacheFolder = cacheFolder
+        self.maxSize = maxSize
+    
+    def epwHash(self, epw_file):
+        """Content hash of the epw file. The hash in epw cache is used if the file is already parsed"""
+        lb_epwCache = EPWCache()
+        info = lb_epwCache.validInfo(epw_file)
+        if info is not None: return info["hash"]
+        return lb_epwCache.contentHash(epw_file)
+    
+    def skyKey(self, epwHash, skyMatrix, generator = "ladybug"):
+        return {"epwHash": epwHash,
+                "generator": generator,
+                "version": skyMatrix.binaryVersion,
+                "skyDensity": skyMatrix.skyDensity,
+                "numOfSuns": skyMatrix.numOfSuns,
+                "groundReflectance": round(float(skyMatrix.groundReflectance), 6)}
+    
+    def cacheFile(self, key):
+        keyStr = json.dumps(key, sort_keys = True)
+        return os.path.join(self.cacheFolder, hashlib.md5(keyStr).hexdigest() + ".lbsky")
+    
+    def load(self, key, skyMatrix):
+        """Return the saved diffuse and direct matrices for the key or None if they are not saved"""
+        cacheFile = self.cacheFile(key)
+        if not os.path.isfile(cacheFile): return None
+        try:
+            info, data = skyMatrix.loadBinary(cacheFile)
+            if info["skyDensity"] != skyMatrix.skyDensity or info["numOfPatches"] != skyMatrix.numOfPatches: return None
+            skyMatrices = skyMatrix.splitBinaryData(info, data)
+        except:
+            return None
+        
+        # keep track of the recently used files for eviction
+        try: os.utime(cacheFile, None)
+        except: pass
+        
+        return skyMatrices
+    
+    def save(self, key, skyMatrix, difMtx, dirMtx, location = None):
+        if not os.path.isdir(self.cacheFolder): os.makedirs(self.cacheFolder)
+        skyMatrix.saveBinary(difMtx, dirMtx, self.cacheFile(key), location)
+        self.evict()
+    
+    def evict(self):
+        """Remove the least recently used sky files until the folder is smaller than maxSize"""
+        cacheFiles = []
+        for f in os.listdir(self.cacheFolder):
+            if not f.endswith(".lbsky"): continue
+            # files can be removed by another thread in the meantime
+            try: fileStat = os.stat(os.path.join(self.cacheFolder, f))
+            except OSError: continue
+            cacheFiles.append((fileStat.st_mtime, fileStat.st_size, os.path.join(self.cacheFolder, f)))
+        cacheFiles.sort()
+        totalSize = sum([size for mtime, size, cacheFile in cacheFiles])
+        
+        # never remove the most recent file
+        while totalSize > self.maxSize and len(cacheFiles) > 1:
+            mtime, size, cacheFile = cacheFiles.pop(0)
+            totalSize -= size
+            try: os.remove(cacheFile)
+            except: pass
+    
+    def clear(self):
+        if not os.path.isdir(self.cacheFolder): return
+        for f in os.listdir(self.cacheFolder):
+            if f.endswith(".lbsky"): os.remove(os.path.join(self.cacheFolder, f))
+    
+    def isCached(self, epw_file, skyMatrix, generator = "ladybug"):
+        return os.path.isfile(self.cacheFile(self.skyKey(self.epwHash(epw_file), skyMatrix, generator)))
+    
+    def getSkyMatrices(self, epw_file, skyMatrix = None, location = None, generator = "ladybug"):
+        """
+        Diffuse and direct sky matrices of an epw file. See SkyMatrix.calculate
+        Matrices are read from the cache if they are already generated for the same inputs.
+        Skies of other generators (e.g. "gendaymtx") are only read from the cache and None
+        is returned if they are not there.
+        """
+        if skyMatrix is None: skyMatrix = SkyMatrix()
+        key = self.skyKey(self.epwHash(epw_file), skyMatrix, generator)
+        skyMatrices = self.load(key, skyMatrix)
+        if skyMatrices is not None or generator != "ladybug": return skyMatrices
+        
+        difMtx, dirMtx = skyMatrix.fromEPW(epw_file)
+        try: self.save(key, skyMatrix, difMtx, dirMtx, location)
+        except Exception, e:
+            # cache is optional. just let the user know
+            print "Failed to write the sky matrix cache: " + `e`
+        return difMtx, dirMtx
+    
+    def addSkyMatrices(self, epw_file, skyMatrix, difMtx, dirMtx, location = None, generator = "gendaymtx"):
+        """
+        Add matrices that are generated somewhere else (e.g. converted gendaymtx results) to the cache.
+        They are saved under their generator so they never replace the skies of SkyMatrix or the other way.
+        """
+        self.save(self.skyKey(self.epwHash(epw_file), skyMatrix, generator), skyMatrix, difMtx, dirMtx, location)
+
+
+class SkyMatrixScheduler(object):
+    """
+    Generate sky matrices of several weather files and sky types on a worker pool.
+    Each weather file is read once and its radiation arrays are shared between all the skies of that
+    file. Every sky is split to jobs of chunkSize hours and each job calculates diffuse and direct values
+    of its hours together, so a single sky keeps all the workers busy as well. Skies that are already
+    in SkyMatrixCache are loaded and the new ones are added to the cache.
+    progressCallback is called with (number of finished jobs, number of jobs) after each job. It is called
+    from the worker threads but never by two threads at the same time.
+    
+    Usage:
+        scheduler = SkyMatrixScheduler()
+        scheduler.addSky(epw_file, 1)
+        scheduler.addSky(epw_file, 2)
+        skyMatrices = scheduler.run() # [(difMtx, dirMtx), ...] in the same order as addSky
+    """
+    def __init__(self, parallel = True, chunkSize = 730, useCache = True, progressCallback = None):
+        self.parallel = parallel
+        self.chunkSize = chunkSize
+        self.useCache = useCache
+        self.progressCallback = progressCallback
+        self.skies = []
+        # parsed weather data of each epw file
+        self.weatherData = {}
+        self.failedSkies = []
+        self.numOfJobs = 0
+        self.finishedJobs = 0
+        self.lock = threading.Lock()
+    
+    def addSky(self, epw_file, skyDensity = 1, groundReflectance = 0.2, numOfSuns = 4, location = None):
+        """Add a sky to be generated. Returns the index of the sky in the results"""
+        self.skies.append({"epwFile": epw_file,
+                           "skyMatrix": SkyMatrix(skyDensity, groundReflectance, numOfSuns),
+                           "location": location})
+        return len(self.skies) - 1
+    
+    def epwKey(self, epw_file):
+        return os.path.normcase(os.path.abspath(epw_file))
+    
+    def runParallel(self, items, function):
+        if self.parallel: tasks.Parallel.ForEach(items, function)
+        else:
+            for item in items: function(item)
+    
+    def reportProgress(self):
+        with self.lock:
+            self.finishedJobs += 1
+            if self.progressCallback is not None:
+                try: self.progressCallback(self.finishedJobs, self.numOfJobs)
+                except: pass
+    
+    def run(self):
+        """Generate all the skies. Results for skies that failed are None and the errors are in failedSkies"""
+        results = [None] * len(self.skies)
+        self.failedSkies = []
+        lb_skyMatrixCache = SkyMatrixCache() if self.useCache else None
+        epwFiles = OrderedDict([(self.epwKey(sky["epwFile"]), sky["epwFile"]) for sky in self.skies])
+        epwKeys = epwFiles.keys()
+        errors = {}
+        
+        # each thread only writes to its own index
+        epwHashes = [None] * len(epwKeys)
+        def hashFileByIndex(i):
+            try: epwHashes[i] = lb_skyMatrixCache.epwHash(epwFiles[epwKeys[i]])
+            except Exception, e: epwHashes[i] = e
+        
+        if lb_skyMatrixCache is not None:
+            self.runParallel(range(len(epwKeys)), hashFileByIndex)
+            for epwKey, epwHash in zip(epwKeys, epwHashes):
+                if isinstance(epwHash, Exception): errors[epwKey] = epwHash
+            epwHashes = dict(zip(epwKeys, epwHashes))
+        
+        # load the skies that are already calculated
+        missingSkies = []
+        for skyCount, sky in enumerate(self.skies):
+            epwKey = self.epwKey(sky["epwFile"])
+            if epwKey in errors: continue
+            if lb_skyMatrixCache is not None:
+                sky["key"] = lb_skyMatrixCache.skyKey(epwHashes[epwKey], sky["skyMatrix"])
+                results[skyCount] = lb_skyMatrixCache.load(sky["key"], sky["skyMatrix"])
+                if results[skyCount] is not None: continue
+            missingSkies.append(skyCount)
+        
+        # read each weather file once
+        missingKeys = []
+        for skyCount in missingSkies:
+            epwKey = self.epwKey(self.skies[skyCount]["epwFile"])
+            if epwKey not in self.weatherData and epwKey not in missingKeys: missingKeys.append(epwKey)
+        
+        weatherData = [None] * len(missingKeys)
+        def readFileByIndex(i):
+            try: weatherData[i] = SkyMatrix().readWeatherData(epwFiles[missingKeys[i]])
+            except Exception, e: weatherData[i] = e
+        
+        self.runParallel(range(len(missingKeys)), readFileByIndex)
+        for epwKey, data in zip(missingKeys, weatherData):
+            if isinstance(data, Exception): errors[epwKey] = data
+            else: self.weatherData[epwKey] = data
+        
+        jobs = []
+        for skyCount in missingSkies:
+            sky = self.skies[skyCount]
+            if self.epwKey(sky["epwFile"]) in errors: continue
+            numOfHours = len(self.weatherData[self.epwKey(sky["epwFile"])][0])
+            numOfPatches = sky["skyMatrix"].numOfPatches
+            results[skyCount] = ([array('d', [0.0]) * numOfHours for patch in range(numOfPatches)],
+                                 [array('d', [0.0]) * numOfHours for patch in range(numOfPatches)])
+            for startHour in range(0, numOfHours, self.chunkSize):
+                jobs.append((skyCount, startHour, min(startHour + self.chunkSize, numOfHours)))
+        
+        self.numOfJobs = len(jobs)
+        self.finishedJobs = 0
+        jobErrors = [None] * len(jobs)
+        
+        def calculateJobByIndex(i):
+            skyCount, startHour, endHour = jobs[i]
+            sky = self.skies[skyCount]
+            try:
+                directNormal, diffuseHorizontal, lat, lngt, timeZone = self.weatherData[self.epwKey(sky["epwFile"])]
+                difMtx, dirMtx = results[skyCount]
+                sky["skyMatrix"].calculateHours(directNormal, diffuseHorizontal, lat, lngt, timeZone, \
+                                                difMtx, dirMtx, startHour, endHour)
+            except Exception, e:
+                jobErrors[i] = e
+            self.reportProgress()
+        
+        self.runParallel(range(len(jobs)), calculateJobByIndex)
+        skyErrors = dict([(jobs[i][0], error) for i, error in enumerate(jobErrors) if error is not None])
+        
+        for skyCount, sky in enumerate(self.skies):
+            epwKey = self.epwKey(sky["epwFile"])
+            error = errors.get(epwKey, skyErrors.get(skyCount))
+            if error is not None:
+                results[skyCount] = None
+                self.failedSkies.append((sky["epwFile"], `error`))
+            elif skyCount in missingSkies and lb_skyMatrixCache is not None:
+                try: lb_skyMatrixCache.save(sky["key"], sky["skyMatrix"], results[skyCount][0], results[skyCount][1], sky["location"])
+                except Exception, e: print "Failed to write the sky matrix cache: " + `e`
+        
+        return results
+
+
+class SkyResultsCollection(object):
+    """
+    Results of GenCumulativeSkyMtx as dense arrays.
+    Radiance of each patch is kept in one array per patch and component (diffuse and direct) and
+    converted to Wh/m2 with the same steradian conversion as SkyMatrix.resultsDict. Cumulative sums
+    along the hours are calculated the first time they are needed so the total radiation of any
+    period is a subtraction for each patch instead of a loop over the hours.
+    
+    Usage:
+        skyResults = SkyResultsCollection(1, difMtx, dirMtx, locationName, lat, lngt, timeZone)
+        HOYS = Preparation().analysisPeriodIndices(analysisPeriod)
+        values = skyResults.sumHours(HOYS) # [[diffuse, direct], ...] in Wh/m2 for each sky patch
+    """
+    def __init__(self, skyDensity, difMtx, dirMtx, locationName, lat, lngt, timeZone):
+        self.skyDensity = skyDensity
+        self.difMtx = difMtx
+        self.dirMtx = dirMtx
+        self.location = locationName
+        self.lat = lat
+        self.lngt = lngt
+        self.timeZone = timeZone
+        
+        lb_skyMatrix = SkyMatrix(skyDensity)
+        strConv = lb_skyMatrix.strConv[skyDensity]
+        self.factors = [strConv[rowNumber] for rowNumber in lb_skyMatrix.patchRows()]
+        self.difSums = None
+        self.dirSums = None
+        self.legacyDict = None
+    
+    @property
+    def numOfPatches(self):
+        """Number of patches including the ground"""
+        return len(self.difMtx)
+    
+    @property
+    def numOfHours(self):
+        return len(self.difMtx[0])
+    
+    @property
+    def d(self):
+        """Results as {patchNumber: {HOY: [diffuse, direct]}} for the components that use the dictionary"""
+        if self.legacyDict is None:
+            self.legacyDict = SkyMatrix(self.skyDensity).resultsDict(self.difMtx, self.dirMtx)
+        return self.legacyDict
+    
+    def calculateCumulativeSums(self):
+        """Cumulative sums of each patch where sums[patch][i] is the total of the first i hours"""
+        if self.difSums is not None: return
+        difSums = []; dirSums = []
+        for difValues, dirValues in zip(self.difMtx, self.dirMtx):
+            for values, sums in ((difValues, difSums), (dirValues, dirSums)):
+                cumulativeSums = array('d', [0.0]) * (len(values) + 1)
+                total = 0
+                for count, value in enumerate(values):
+                    total += value
+                    cumulativeSums[count + 1] = total
+                sums.append(cumulativeSums)
+        self.difSums, self.dirSums = difSums, dirSums
+    
+    def hourlyValues(self, HOY):
+        """Diffuse and direct radiation (Wh/m2) of each sky patch for an hour of the year"""
+        index = (int(HOY) - 1) % self.numOfHours
+        return [[self.difMtx[patch][index] * self.factors[patch], self.dirMtx[patch][index] * self.factors[patch]] \
+                for patch in range(1, self.numOfPatches)]
+    
+    def sumPeriod(self, startIndex, endIndex):
+        """Total diffuse and direct radiation (Wh/m2) of each sky patch for hours startIndex to endIndex - 1 (0-based)"""
+        return self.sumRanges([(startIndex, endIndex)])
+    
+    def sumRanges(self, ranges):
+        """Total diffuse and direct radiation (Wh/m2) of each sky patch for a list of (startIndex, endIndex) ranges"""
+        self.calculateCumulativeSums()
+        values = []
+        for patch in range(1, self.numOfPatches):
+            difSums, dirSums = self.difSums[patch], self.dirSums[patch]
+            difValue = dirValue = 0
+            for startIndex, endIndex in ranges:
+                difValue += difSums[endIndex] - difSums[startIndex]
+                dirValue += dirSums[endIndex] - dirSums[startIndex]
+            values.append([difValue * self.factors[patch], dirValue * self.factors[patch]])
+        return values
+    
+    def sumHours(self, indices):
+        """
+        Total diffuse and direct radiation (Wh/m2) of each sky patch for a list of 0-based hour indices
+        (e.g. Preparation.analysisPeriodIndices). Indices are grouped to continuous ranges first so the
+        cost depends on the number of ranges and not the number of hours.
+        """
+        ranges = []
+        for index in indices:
+            if ranges and ranges[-1][1] == index: ranges[-1][1] = index + 1
+            else: ranges.append([index, index + 1])
+        return self.sumRanges(ranges)
+
+
 class MeshPreparation(object):
     
     def joinMesh(self, meshList):
@@ -4345,12 +6829,30 @@ if letItFly:
     #if not sc.sticky.has_key("ladybug_release"):
     sc.sticky["ladybug_release"] = versionCheck()       
     sc.sticky["ladybug_Preparation"] = Preparation
+    sc.sticky["ladybug_EPWReader"] = EPWReader
+    sc.sticky["ladybug_EPWCache"] = EPWCache
+    sc.sticky["ladybug_EPWFile"] = EPWFile
+    sc.sticky["ladybug_EPWCollection"] = EPWCollection
+    sc.sticky["ladybug_LBHeader"] = LBHeader
+    sc.sticky["ladybug_DataCollection"] = DataCollection
+    sc.sticky["ladybug_DataAggregation"] = DataAggregation
+    sc.sticky["ladybug_DegreeDays"] = DegreeDays
+    sc.sticky["ladybug_ConditionalStatement"] = ConditionalStatement
+    sc.sticky["ladybug_RunningStatistics"] = RunningStatistics
+    sc.sticky["ladybug_TDigest"] = TDigest
+    sc.sticky["ladybug_Histogram"] = Histogram
+    sc.sticky["ladybug_Statistics"] = Statistics
     sc.sticky["ladybug_Mesh"] = MeshPreparation
     sc.sticky["ladybug_RunAnalysis"] = RunAnalysisInsideGH
     sc.sticky["ladybug_Export2Radiance"] = ExportAnalysis2Radiance
     sc.sticky["ladybug_ResultVisualization"] = ResultVisualization
     sc.sticky["ladybug_SunPath"] = Sunpath
+    sc.sticky["ladybug_SunPositionCache"] = SunPositionCache
     sc.sticky["ladybug_SkyColor"] = Sky
+    sc.sticky["ladybug_SkyMatrix"] = SkyMatrix
+    sc.sticky["ladybug_SkyMatrixCache"] = SkyMatrixCache
+    sc.sticky["ladybug_SkyMatrixScheduler"] = SkyMatrixScheduler
+    sc.sticky["ladybug_SkyResultsCollection"] = SkyResultsCollection
     sc.sticky["ladybug_Vector"] = Vector
     sc.sticky["ladybug_ComfortModels"] = ComfortModels
     sc.sticky["ladybug_WindSpeed"] = WindSpeed
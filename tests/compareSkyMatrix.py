@@ -0,0 +1,143 @@
+"""
+Compare the in-process sky of SkyMatrix with Radiance's gendaymtx.
+
+Reference results are saved in tests/data. skyMatrix.wea has the weather data of one day and
+gendaymtx_<skyDensity>_dif.mtx and gendaymtx_<skyDensity>_dir.mtx are the results of:
+    gendaymtx -m <skyDensity> -s -O1 skyMatrix.wea > gendaymtx_<skyDensity>_dif.mtx
+    gendaymtx -m <skyDensity> -d -O1 skyMatrix.wea > gendaymtx_<skyDensity>_dir.mtx
+
+Usage:
+    # write the .wea file for a day of an epw file and run gendaymtx (Radiance should be installed)
+    python compareSkyMatrix.py --create weather.epw 6 21 [path to gendaymtx]
+    # print the difference between SkyMatrix and gendaymtx for each sky density
+    python compareSkyMatrix.py
+"""
+import os
+import sys
+import subprocess
+from loadLadybug import sticky
+
+dataFolder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+skyDensities = (1, 2)
+
+
+def weaPath(folder = dataFolder):
+    return os.path.join(folder, "skyMatrix.wea")
+
+
+def mtxFiles(skyDensity, folder = dataFolder):
+    """Diffuse and direct reference files for a sky density"""
+    return [os.path.join(folder, "gendaymtx_%d_%s.mtx" % (skyDensity, component)) for component in ("dif", "dir")]
+
+
+def hasReference(folder = dataFolder):
+    return os.path.isfile(weaPath(folder)) and all(os.path.isfile(mtxFile) \
+           for skyDensity in skyDensities for mtxFile in mtxFiles(skyDensity, folder))
+
+
+def writeWea(epwFile, month, day, weaFile):
+    """Write the .wea file of a day of an epw file in the same format as GenCumulativeSkyMtx"""
+    lb_preparation = sticky["ladybug_Preparation"]()
+    locName, lat, lngt, timeZone, elev, locationStr = lb_preparation.epwLocation(epwFile)
+    firstHour = (lb_preparation.getJD(month, day) - 1) * 24
+
+    with open(epwFile, "r") as epwf:
+        lines = epwf.readlines()[8 + firstHour:8 + firstHour + 24]
+
+    if not os.path.isdir(os.path.dirname(weaFile)): os.makedirs(os.path.dirname(weaFile))
+    with open(weaFile, "w") as weaf:
+        weaf.write("place " + locName + "\n" + \
+                   "latitude " + lat + "\n" + \
+                   "longitude " + `-float(lngt)` + "\n" + \
+                   "time_zone " + `-float(timeZone) * 15` + "\n" + \
+                   "site_elevation " + elev + "\n" + \
+                   "weather_data_file_units 1\n")
+        for hour, line in enumerate(lines):
+            fields = line.split(',')
+            # wea time is at the middle of the hour
+            weaf.write("%d %d %s %s %s\n" % (month, day, `hour + 0.5`, fields[14].strip(), fields[15].strip()))
+
+
+def readWea(weaFile):
+    """Latitude, longitude and time zone in Ladybug's convention and (month, day, hour, dirNormal, difHorizontal) of each line"""
+    header = {}; hours = []
+    with open(weaFile, "r") as weaf:
+        for line in weaf:
+            fields = line.split()
+            if not fields: continue
+            try: hours.append((int(fields[0]), int(fields[1]), float(fields[2]), float(fields[3]), float(fields[4])))
+            except ValueError: header[fields[0]] = " ".join(fields[1:])
+    # wea longitude and time zone are positive to the west
+    return float(header["latitude"]), -float(header["longitude"]), -float(header["time_zone"]) / 15, hours
+
+
+def calculate(skyDensity, weaFile):
+    """Diffuse and direct radiance of SkyMatrix for each patch and each hour of the .wea file"""
+    lb_preparation = sticky["ladybug_Preparation"]()
+    lb_skyMatrix = sticky["ladybug_SkyMatrix"](skyDensity)
+    latitude, longitude, timeZone, hours = readWea(weaFile)
+
+    difMtx = [[] for patch in range(lb_skyMatrix.numOfPatches)]
+    dirMtx = [[] for patch in range(lb_skyMatrix.numOfPatches)]
+    for month, day, hour, dirNormal, difHorizontal in hours:
+        julianDay = lb_preparation.getJD(month, day)
+        sunAltitude, sunAzimuth = lb_skyMatrix.sunPosition(julianDay, hour, latitude, longitude, timeZone)
+        difValues, dirValues = lb_skyMatrix.skyPatchValues(julianDay, sunAltitude, sunAzimuth, dirNormal, difHorizontal)
+        for patch in range(lb_skyMatrix.numOfPatches):
+            difMtx[patch].append(difValues[patch])
+            dirMtx[patch].append(dirValues[patch])
+    return difMtx, dirMtx
+
+
+def horizontalIrradiance(skyDensity, mtx):
+    """Horizontal irradiance of the sky patches (without the ground) for each hour of a matrix"""
+    lb_skyMatrix = sticky["ladybug_SkyMatrix"](skyDensity)
+    numOfHours = len(mtx[0])
+    return [sum(mtx[patch][hour] * lb_skyMatrix.patchVectors[patch][2] * lb_skyMatrix.patchSolidAngles[patch] \
+                for patch in range(1, lb_skyMatrix.numOfPatches)) for hour in range(numOfHours)]
+
+
+def compare(skyDensity, folder = dataFolder):
+    """
+    Difference between SkyMatrix and gendaymtx for diffuse and direct matrices of a sky density.
+    Returns a dictionary of "dif" and "dir" where each item has the largest difference of horizontal
+    irradiance for an hour and the largest difference of a patch for an hour. Both are relative
+    to the largest value of the reference.
+    """
+    lb_skyMatrix = sticky["ladybug_SkyMatrix"](skyDensity)
+    results = {}
+    for component, mtx, mtxFile in zip(("dif", "dir"), calculate(skyDensity, weaPath(folder)), mtxFiles(skyDensity, folder)):
+        reference, failedHours = lb_skyMatrix.readMTX(mtxFile)
+        if failedHours: raise ValueError("Failed to read hours %s of %s" % (`failedHours`, mtxFile))
+
+        irradiance, referenceIrradiance = horizontalIrradiance(skyDensity, mtx), horizontalIrradiance(skyDensity, reference)
+        maxIrradiance = max(max(referenceIrradiance), 1e-6)
+        maxValue = max(max(max(values) for values in reference), 1e-6)
+
+        results[component] = {
+            "irradiance": max(abs(a - b) for a, b in zip(irradiance, referenceIrradiance)) / maxIrradiance,
+            "patch": max(abs(a - b) for values, referenceValues in zip(mtx, reference) \
+                         for a, b in zip(values, referenceValues)) / maxValue}
+    return results
+
+
+def createReference(epwFile, month, day, gendaymtx = "gendaymtx", folder = dataFolder):
+    writeWea(epwFile, month, day, weaPath(folder))
+    for skyDensity in skyDensities:
+        for flag, mtxFile in zip(("-s", "-d"), mtxFiles(skyDensity, folder)):
+            with open(mtxFile, "w") as mtxf:
+                subprocess.check_call([gendaymtx, "-m", str(skyDensity), flag, "-O1", weaPath(folder)], stdout = mtxf)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == "--create":
+        createReference(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]), *sys.argv[5:6])
+
+    if not hasReference():
+        print "gendaymtx reference results are not available in " + dataFolder
+        sys.exit(1)
+
+    for skyDensity in skyDensities:
+        for component, differences in sorted(compare(skyDensity).items()):
+            print "skyDensity %d %s: horizontal irradiance %.2f%%, patch %.2f%%" % \
+                  (skyDensity, component, 100 * differences["irradiance"], 100 * differences["patch"])
@@ -0,0 +1,88 @@
+"""
+Load the classes of ladybug_ladybug.py outside Rhino/Grasshopper for the unit tests.
+
+Rhino, Grasshopper and .NET modules are replaced by placeholders that accept any attribute
+and call so the file can run the same way it runs in the Ladybug_Ladybug component. The
+classes are read back from scriptcontext.sticky just like the components do.
+
+Usage:
+    from loadLadybug import sticky
+    lb_preparation = sticky["ladybug_Preparation"]()
+
+Run the tests with python 2.7:
+    python -m unittest discover tests
+"""
+import os
+import sys
+import types
+import tempfile
+import __builtin__
+
+
+class HostObject(object):
+    """Placeholder for any Rhino, Grasshopper or .NET object"""
+    def __init__(self, *args, **kwargs): pass
+    def __getattr__(self, name):
+        if name.startswith('__'): raise AttributeError(name)
+        return HostObject()
+    def __call__(self, *args, **kwargs): return HostObject()
+    def __iter__(self): return iter([])
+
+
+class HostModule(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith('__'): raise AttributeError(name)
+        return HostObject()
+
+
+class GHVersion(object):
+    def ToString(self): return "0.6.0.3"
+
+
+class GHComponent(HostObject):
+    Message = 'VER 0.0.58\nDEC_16_2014'
+
+
+class GHEnv(object):
+    Version = GHVersion()
+    Component = GHComponent()
+
+
+def frange(start, end, step = 1.0):
+    values = []; value = start
+    while value <= end + 1e-9:
+        values.append(value); value += step
+    return values
+
+
+def load():
+    hostModules = ['rhinoscriptsyntax', 'Rhino', 'Rhino.Geometry', 'clr', 'Grasshopper',
+                   'Grasshopper.Kernel', 'Grasshopper.Kernel.Data', 'Grasshopper.Kernel.Types',
+                   'System', 'System.Threading', 'System.Threading.Tasks']
+    for name in hostModules:
+        if name not in sys.modules: sys.modules[name] = HostModule(name)
+    sys.modules['rhinoscriptsyntax'].frange = frange
+
+    if 'scriptcontext' not in sys.modules:
+        sc = types.ModuleType('scriptcontext')
+        sc.sticky = {"Ladybug_DefaultFolder": tempfile.mkdtemp(prefix = "ladybug_") + os.sep}
+        sys.modules['scriptcontext'] = sc
+
+    __builtin__.ghenv = GHEnv()
+    os.environ.setdefault("USERNAME", "ladybug")
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src", "ladybug_ladybug.py")
+    source = open(path).read()
+
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        exec compile(source, path, 'exec') in {'__name__': 'ladybug_ladybug'}
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    return sys.modules['scriptcontext'].sticky
+
+
+sticky = load()
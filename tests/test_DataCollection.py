@@ -0,0 +1,38 @@
+import unittest
+from loadLadybug import sticky
+
+DataCollection = sticky["ladybug_DataCollection"]
+
+
+class DataCollectionTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self.values = [float(i) for i in range(10)]
+        self.dataCollection = DataCollection(self.values)
+    
+    def test_slice(self):
+        self.assertEqual(list(self.dataCollection[2:5]), self.values[2:5])
+        self.assertEqual(list(self.dataCollection[-3:]), self.values[-3:])
+        self.assertEqual(list(self.dataCollection[::3]), self.values[::3])
+    
+    def test_reverseSlice(self):
+        self.assertEqual(list(self.dataCollection[::-1]), self.values[::-1])
+        self.assertEqual(list(self.dataCollection[::-2]), self.values[::-2])
+        self.assertEqual(list(self.dataCollection[7:2:-1]), self.values[7:2:-1])
+        self.assertEqual(list(self.dataCollection[2:7:-1]), self.values[2:7:-1])
+    
+    def test_sliceOfView(self):
+        view = self.dataCollection[3:8]
+        self.assertEqual(list(view[::-1]), self.values[3:8][::-1])
+        self.assertEqual(list(view[1:4][::-1]), self.values[3:8][1:4][::-1])
+        self.assertEqual(list(view[-2::-2]), self.values[3:8][-2::-2])
+    
+    def test_index(self):
+        view = self.dataCollection[3:8]
+        self.assertEqual(view[0], 3.0)
+        self.assertEqual(view[-1], 7.0)
+        self.assertRaises(IndexError, view.__getitem__, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
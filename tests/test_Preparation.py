@@ -0,0 +1,59 @@
+import unittest
+from loadLadybug import sticky
+
+Preparation = sticky["ladybug_Preparation"]
+
+
+class SeparateListTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self.lb_preparation = Preparation()
+        self.key = Preparation.strToBeFound
+    
+    def header(self, frequency, startsAt, endsAt):
+        return [self.key, 'somewhere', 'Dry Bulb Temperature', 'C', frequency, startsAt, endsAt]
+    
+    def test_singleSeries(self):
+        dataList = self.header('Hourly', (1, 1, 1), (12, 31, 24)) + [1.0] * 8760
+        indexList, listInfo = self.lb_preparation.separateList(dataList, self.key)
+        self.assertEqual(indexList, [0, 8767])
+        self.assertEqual(listInfo, [dataList[:7]])
+    
+    def test_unevenSeries(self):
+        hourly = self.header('Hourly', (1, 1, 1), (12, 31, 24)) + [1.0] * 8760
+        monthly = self.header('Monthly', (1, 1, 1), (12, 31, 24)) + [2.0] * 12
+        daily = self.header('Daily', (1, 1, 1), (1, 31, 24)) + [3.0] * 31
+        partial = self.header('Hourly', (12, 30, 9), (1, 2, 17)) + [4.0] * 36
+        dataList = monthly + hourly + partial + daily
+        indexList, listInfo = self.lb_preparation.separateList(dataList, self.key)
+        self.assertEqual(indexList, [0, 19, 8786, 8829, 8867])
+        self.assertEqual([header[4] for header in listInfo], ['Monthly', 'Hourly', 'Hourly', 'Daily'])
+    
+    def test_shorterSeries(self):
+        # first series has 10 values instead of 31 and the jump lands on the third header
+        dataList = self.header('Daily', (1, 1, 1), (1, 31, 24)) + [1.0] * 10 + \
+                   self.header('someTimeStep', (1, 1, 1), (12, 31, 24)) + [2.0] * 14 + \
+                   self.header('Daily', (1, 1, 1), (1, 31, 24)) + [3.0] * 31
+        indexList, listInfo = self.lb_preparation.separateList(dataList, self.key)
+        self.assertEqual(indexList, [0, 17, 38, 76])
+    
+    def test_longerSeries(self):
+        dataList = self.header('Monthly', (1, 1, 1), (12, 31, 24)) + [1.0] * 20 + \
+                   self.header('Monthly', (1, 1, 1), (12, 31, 24)) + [2.0] * 12
+        indexList, listInfo = self.lb_preparation.separateList(dataList, self.key)
+        self.assertEqual(indexList, [0, 27, 46])
+    
+    def test_unknownFrequency(self):
+        dataList = self.header('someTimeStep', (1, 1, 1), (12, 31, 24)) + [1.0] * 5 + \
+                   self.header('Hourly', (1, 1, 1), (1, 1, 24)) + [2.0] * 24
+        indexList, listInfo = self.lb_preparation.separateList(dataList, self.key)
+        self.assertEqual(indexList, [0, 12, 43])
+    
+    def test_noHeader(self):
+        indexList, listInfo = self.lb_preparation.separateList([1.0, 2.0, 3.0], self.key)
+        self.assertEqual(indexList, [-7, 3])
+        self.assertEqual(listInfo[0][0], self.key)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import shutil
+import tempfile
+import unittest
+import compareSkyMatrix
+from loadLadybug import sticky
+
+SkyMatrix = sticky["ladybug_SkyMatrix"]
+
+
+class SkyMatrixTestCase(unittest.TestCase):
+    
+    def test_uniformSky(self):
+        for skyDensity in compareSkyMatrix.skyDensities:
+            skyMatrix = SkyMatrix(skyDensity)
+            # a Perez sky with no luminance falls back to a uniform sky
+            skyMatrix.perezParameters = lambda sunZenith, skyClearness, skyBrightness: [-1, 0, 0, 0, 0]
+            difValues, dirValues = skyMatrix.skyPatchValues(172, 0.5, 0, 0, 100)
+            self.assertEqual(len(set(difValues[1:])), 1)
+            self.assertAlmostEqual(compareSkyMatrix.horizontalIrradiance(skyDensity, [[value] for value in difValues])[0], 100)
+    
+    def test_diffuseHorizontal(self):
+        for skyDensity in compareSkyMatrix.skyDensities:
+            difValues, dirValues = SkyMatrix(skyDensity).skyPatchValues(172, 0.5, 0, 500, 100)
+            self.assertAlmostEqual(compareSkyMatrix.horizontalIrradiance(skyDensity, [[value] for value in difValues])[0], 100)
+    
+    def test_compareSkyMatrix(self):
+        # results of SkyMatrix that are written as gendaymtx files should be the same
+        folder = tempfile.mkdtemp()
+        try:
+            with open(compareSkyMatrix.weaPath(folder), "w") as weaf:
+                weaf.write("place Boston\nlatitude 42.37\nlongitude 71.03\ntime_zone 75\n" + \
+                           "site_elevation 6\nweather_data_file_units 1\n")
+                for hour in range(24):
+                    dirNormal = max(0, 800 - 120 * abs(hour - 12))
+                    weaf.write("6 21 %s %d %d\n" % (`hour + 0.5`, dirNormal, dirNormal / 5))
+            
+            for skyDensity in compareSkyMatrix.skyDensities:
+                mtxs = compareSkyMatrix.calculate(skyDensity, compareSkyMatrix.weaPath(folder))
+                for mtx, mtxFile in zip(mtxs, compareSkyMatrix.mtxFiles(skyDensity, folder)):
+                    with open(mtxFile, "w") as mtxf:
+                        mtxf.write("#?RADIANCE\nNCOLS=24\nNCOMP=3\nFORMAT=ascii\n\n")
+                        for values in mtx:
+                            mtxf.write("".join("%.9e %.9e %.9e\n" % (value, value, value) for value in values) + "\n")
+                
+                for differences in compareSkyMatrix.compare(skyDensity, folder).values():
+                    self.assertAlmostEqual(differences["irradiance"], 0, places = 5)
+                    self.assertAlmostEqual(differences["patch"], 0, places = 5)
+        finally:
+            shutil.rmtree(folder)
+    
+    @unittest.skipUnless(compareSkyMatrix.hasReference(), "gendaymtx reference results are not available. See compareSkyMatrix.py")
+    def test_gendaymtx(self):
+        for skyDensity in compareSkyMatrix.skyDensities:
+            for differences in compareSkyMatrix.compare(skyDensity).values():
+                self.assertLess(differences["irradiance"], 0.02)
+                self.assertLess(differences["patch"], 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import math
+import unittest
+from loadLadybug import sticky
+
+Sunpath = sticky["ladybug_SunPath"]
+
+
+class SunpathTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self.sunpath = Sunpath()
+        self.sunpath.initTheClass(42.37, 0, longtitude = -71.03, timeZone = -5)
+    
+    def test_docstring(self):
+        self.assertTrue(Sunpath.__doc__ is not None and "RADIANCE" in Sunpath.__doc__)
+    
+    def test_iterSunPositions(self):
+        HOYs = [1 + i * 0.25 for i in range(4 * 24 * 20)] + [4000.5, 8759.75, 8760]
+        positions = {"altitude": [], "azimuth": []}
+        for chunk in self.sunpath.iterSunPositions(HOYs, chunkSize = 500, fields = ("altitude", "azimuth")):
+            for key in positions: positions[key].extend(chunk[key])
+        
+        lb_preparation = sticky["ladybug_Preparation"]()
+        for HOY, altitude, azimuth in zip(HOYs, positions["altitude"], positions["azimuth"]):
+            day, month, hour = lb_preparation.hour2Date(HOY, True)
+            expected = self.sunpath.calculateSunPosition(month + 1, day, hour)
+            self.assertAlmostEqual(altitude, expected[5], delta = math.radians(0.01))
+            # azimuth is only compared for the sun above the horizon and away from the zenith
+            if 0 < expected[5] < math.radians(89):
+                azimuthDifference = (azimuth - expected[6] + math.pi) % (2 * math.pi) - math.pi
+                self.assertAlmostEqual(azimuthDifference, 0, delta = math.radians(0.01))
+
+
+if __name__ == '__main__':
+    unittest.main()